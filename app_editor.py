@@ -8,10 +8,13 @@ from docx.shared import Pt, Cm, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
-from openai import OpenAI
 
 # Import FastFormat for advanced text formatting
-from modules.fastformat_utils import apply_fastformat, get_ptbr_options
+from modules.fastformat_utils import IncrementalFastFormatter, apply_fastformat, get_ptbr_options
+from modules.config import load_config
+from modules.extractors import extract_docx_text
+from modules.llm_cache import LLMResponseCache
+from modules.llm_client import LLMClient, LLMError, client_options, shared_client
 
 # --- CONFIGURAÇÃO DA PÁGINA E ESTADO ---
 st.set_page_config(page_title="Adapta ONE - Editor Profissional", page_icon="✒️", layout="wide")
@@ -40,24 +43,55 @@ def carregar_ferramenta_gramatical():
         st.error(f"Falha ao carregar o revisor gramatical: {e}")
         return None
 
+@st.cache_resource
+def carregar_configuracao():
+    return load_config()
+
+@st.cache_resource
+def carregar_cache_ia():
+    # Respostas da IA em disco, compartilhadas entre sessões
+    config = carregar_configuracao()
+    if not config.llm_cache:
+        return None
+    return LLMResponseCache(config.cache_dir, max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+                            max_age_days=config.llm_cache_max_age_days)
+
+def obter_formatador_incremental(options, texto: str = "") -> IncrementalFastFormatter:
+    # Um formatador (com cache de parágrafos) por conjunto de opções, mantido na sessão.
+    # O limite acompanha o documento: espaço para a versão atual e a anterior.
+    formatadores = st.session_state.setdefault('fastformat_formatadores', {})
+    if options not in formatadores:
+        formatadores[options] = IncrementalFastFormatter(options)
+    formatador = formatadores[options]
+    formatador.max_entries = max(formatador.max_entries, 2 * (texto.count("\n\n") + 1))
+    return formatador
+
 def aplicar_correcoes_automaticas(texto: str, ferramenta) -> str:
     if not ferramenta: return texto
     return ferramenta.correct(texto)
 
-def gerar_sugestoes_estilo_ia(texto: str, client: OpenAI):
+def gerar_sugestoes_estilo_ia(texto: str, client: LLMClient):
     prompt = f"Analise o texto como um editor sênior. Forneça 3-5 sugestões concisas para melhorar estilo, clareza e impacto. Comece cada uma com 'Sugestão:'."
+    conteudo = f"{prompt}\n---{texto[:15000]}"
+    cache = carregar_cache_ia()
     try:
-        response = client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": f"{prompt}\n---{texto[:15000]}"}], temperature=0.5)
-        sugestoes = response.choices[0].message.content.split('Sugestão:')
+        resposta = cache.get("gpt-4o-mini", 0.5, "", conteudo) if cache else None
+        if resposta is None:
+            resposta = client.chat(conteudo, model="gpt-4o-mini", temperature=0.5, purpose="editor")
+            if cache: cache.put("gpt-4o-mini", 0.5, "", conteudo, resposta)
+        sugestoes = resposta.split('Sugestão:')
         return [s.strip() for s in sugestoes if s.strip()]
-    except Exception as e:
+    except (LLMError, OSError) as e:
         st.error(f"Erro ao chamar a IA para análise de estilo: {e}")
         return ["Não foi possível gerar sugestões."]
 
 def gerar_manuscrito_profissional_docx(titulo: str, autor: str, contato: str, texto_manuscrito: str, use_fastformat: bool = True):
     # Apply FastFormat for professional typography (replaces smartypants)
     if use_fastformat:
-        texto_limpo = apply_fastformat(texto_manuscrito, get_ptbr_options())
+        # Mesmo critério do DocumentFormatter: processos só com parallel_processing ativo
+        config = carregar_configuracao()
+        mode = "parallel" if config.parallel_processing else "compiled"
+        texto_limpo = apply_fastformat(texto_manuscrito, get_ptbr_options(), mode=mode, max_workers=config.max_workers)
     else:
         # Basic cleanup
         texto_limpo = re.sub(r'^\s*-\s+', '— ', texto_manuscrito, flags=re.MULTILINE)
@@ -102,8 +136,7 @@ def processar_arquivo_carregado():
             if uploaded_file.name.endswith('.txt'):
                 text = io.StringIO(uploaded_file.getvalue().decode("utf-8")).read()
             else:
-                doc = Document(io.BytesIO(uploaded_file.read()))
-                text = "\n\n".join([p.text for p in doc.paragraphs if p.text.strip()])
+                text = extract_docx_text(io.BytesIO(uploaded_file.read()), headings=False)
             st.session_state.text_content = text
             st.session_state.file_processed = True
             st.session_state.sugestoes_estilo = None
@@ -135,10 +168,11 @@ with st.sidebar:
     api_key = st.text_input("Sua API Key (Opcional)", type="password", help="Necessária apenas para as sugestões de estilo.")
     if api_key:
         try:
-            client = OpenAI(api_key=api_key); client.models.list()
+            # Cliente do processo: todas as sessões dividem a mesma cota por minuto
+            client = shared_client(**{**client_options(carregar_configuracao()), "api_key": api_key}); client.verify()
             st.session_state.api_key_valida = True; st.session_state.openai_client = client
             st.success("API Key válida!")
-        except Exception:
+        except LLMError:
             st.error("API Key inválida."); st.session_state.api_key_valida = False
 
 # --- ABAS DE FLUXO DE TRABALHO ---
@@ -210,9 +244,15 @@ with tab2:
         with col2:
             st.subheader("👁️ Visualizar Resultado")
             
+            listar_alteracoes = st.checkbox(
+                "Listar alterações por regra",
+                value=False,
+                help="Registra cada trecho alterado pelo FastFormat (offset, antes, depois, regra)"
+            )
+            
             if st.button("🔍 Prévia da Formatação", type="primary", use_container_width=True):
                 with st.spinner("Aplicando FastFormat..."):
-                    from modules.fastformat_utils import apply_fastformat, get_ptbr_options, get_academic_options
+                    from modules.fastformat_utils import get_ptbr_options, get_academic_options, describe_edits
                     from fastformat import FastFormatOptions
                     
                     # Determine options based on preset
@@ -230,11 +270,33 @@ with tab2:
                             smart_ptbr_punctuation=True
                         )
                     
-                    texto_formatado = apply_fastformat(st.session_state.text_content, options)
+                    formatador = obter_formatador_incremental(options, st.session_state.text_content)
+                    if listar_alteracoes:
+                        # Mesma passada incremental: parágrafos em cache trazem suas alterações
+                        alteracoes = formatador.format_with_edits(st.session_state.text_content)
+                        texto_formatado = alteracoes.text
+                    else:
+                        texto_formatado = formatador.format(st.session_state.text_content)
                     st.session_state['fastformat_preview'] = texto_formatado
+                    st.session_state['fastformat_cache_stats'] = formatador.stats
+                    
+                    if listar_alteracoes:
+                        st.session_state['fastformat_alteracoes'] = {
+                            "por_regra": alteracoes.rule_counts,
+                            "total": len(alteracoes.edits),
+                            "trechos": describe_edits(st.session_state.text_content, alteracoes.edits, limit=200),
+                        }
+                    else:
+                        st.session_state.pop('fastformat_alteracoes', None)
             
             if 'fastformat_preview' in st.session_state:
                 st.success("✅ Prévia gerada! Role para baixo para ver o resultado.")
+                stats = st.session_state.get('fastformat_cache_stats')
+                if stats:
+                    st.caption(
+                        f"Cache de parágrafos: {stats['hits']} reaproveitados, {stats['misses']} formatados, "
+                        f"{stats['entries']}/{stats['max_entries']} entradas (taxa de acerto {stats['hit_rate']:.0%})"
+                    )
         
         # Show preview if available
         if 'fastformat_preview' in st.session_state:
@@ -264,18 +326,32 @@ with tab2:
                     label_visibility="collapsed"
                 )
             
+            alteracoes = st.session_state.get('fastformat_alteracoes')
+            if alteracoes:
+                with st.expander(f"🔎 O que o FastFormat mudou ({alteracoes['total']} trechos)"):
+                    st.markdown("**Alterações por regra:**")
+                    st.table([{"Regra": regra, "Alterações": total} for regra, total in alteracoes['por_regra'].items()])
+                    st.markdown(f"**Primeiros {len(alteracoes['trechos'])} trechos:**")
+                    st.dataframe(
+                        [{"Linha": t["line"], "Coluna": t["column"], "Regra": t["rule"], "Antes": repr(t["old"]), "Depois": repr(t["new"])}
+                         for t in alteracoes['trechos']],
+                        use_container_width=True
+                    )
+            
             # Action buttons
             col_action1, col_action2 = st.columns(2)
             with col_action1:
                 if st.button("✅ Aplicar ao Texto", type="primary", use_container_width=True):
                     st.session_state['pending_text_update'] = st.session_state['fastformat_preview']
                     del st.session_state['fastformat_preview']
+                    st.session_state.pop('fastformat_alteracoes', None)
                     st.success("✅ Formatação aplicada ao texto principal!")
                     st.rerun()
             
             with col_action2:
                 if st.button("❌ Descartar", use_container_width=True):
                     del st.session_state['fastformat_preview']
+                    st.session_state.pop('fastformat_alteracoes', None)
                     st.rerun()
 
 with tab3:
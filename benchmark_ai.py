@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos caminhos com IA contra o servidor substituto local.
+
+Sobe o LLMStandIn (modules/llm_standin.py) com a latência, a taxa de
+erros e a vazão de tokens pedidas e roda o pipeline sobre um manuscrito
+sintético (mesmo gerador do benchmark_fastformat): análise, aprimoramento
+com IA, revisão e, se as dependências de produção estiverem instaladas,
+blurb, sinopse e fundo da capa com IA. Cada combinação de concorrência e
+agrupamento roda com o cache de respostas vazio e, em seguida, cheio.
+Nenhuma chave nem acesso à rede é necessário.
+
+Uso:
+    python benchmark_ai.py
+    python benchmark_ai.py --workers 1,4,16 --latency 0.3 --error-rate 0.05
+    python benchmark_ai.py --size 200KB --pack on --rpm 500 --output bench_ai.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmark_fastformat import GENRES, _git_commit, format_size, generate_corpus, parse_size
+from modules.analyzer import ManuscriptAnalyzer
+from modules.config import Config
+from modules.enhancer import ContentEnhancer
+from modules.llm_client import shared_client
+from modules.llm_standin import LLMStandIn, StandInSettings
+from modules.reviewer import EditorialReviewer
+
+DEFAULT_WORKERS = "1,4,16"
+
+METADATA = {
+    "title": "Leitura e Escrita na Era Digital",
+    "author": "Autora de Teste",
+    "description": "um estudo sobre a produção editorial contemporânea",
+    "target_audience": "editores e pesquisadores",
+}
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def _timed(stages: Dict, name: str, run):
+    start = time.perf_counter()
+    result = run()
+    stages[name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def _production_stages(config: Config, metadata: Dict, stages: Dict) -> Dict:
+    """Blurb, sinopse e fundo da capa com IA; pulados se faltarem dependências."""
+    skipped = {}
+    options = {"openai_api_key": config.openai_api_key, "openai_base_url": config.openai_base_url}
+    try:
+        from modules.production.materials_generator import MaterialsGenerator
+        from modules.production.cover_designer import CoverDesigner
+    except ImportError as e:
+        for name in ("materials", "cover"):
+            skipped[name] = f"dependência ausente: {e.name}"
+        return skipped
+
+    materials = MaterialsGenerator({**options, "use_ai": True, "llm_cache": config.llm_cache,
+                                    "cache_dir": config.cache_dir})
+    _timed(stages, "materials", lambda: (materials.generate_blurb(metadata),
+                                         materials.generate_synopsis(metadata, "medium")))
+    designer = CoverDesigner({**options, "use_ai_images": True})
+    _timed(stages, "cover", lambda: designer._generate_background_ai(metadata, (1024, 1024)))
+    return skipped
+
+
+def run_pipeline(config: Config, manuscript_path: str, metadata: Dict) -> Dict:
+    """
+    Roda análise, aprimoramento, revisão e materiais com a configuração dada.
+
+    Returns:
+        Tempos por etapa (segundos), etapas puladas e estatísticas do aprimoramento
+    """
+    stages: Dict[str, float] = {}
+    analysis = _timed(stages, "analysis", lambda: ManuscriptAnalyzer(config).analyze(manuscript_path))
+    if "error" in analysis:
+        raise RuntimeError(f"Erro na análise: {analysis['error']}")
+    enhancer = ContentEnhancer(config)
+    enhanced = _timed(stages, "enhancement", lambda: enhancer.enhance(analysis["content"], {}, metadata))
+    _timed(stages, "review", lambda: EditorialReviewer(config).review(enhanced, {}, metadata))
+    skipped = _production_stages(config, metadata, stages)
+    return {"stages": stages, "skipped": skipped, "enhancement": enhanced["statistics"]}
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+def measure(standin: LLMStandIn, manuscript_path: str, cache_dir: str, workers: int, pack: bool,
+            cache_pass: str, rpm: int, max_tokens: int, metadata: Dict) -> Dict:
+    """Uma rodada do pipeline: tempos, uso do cliente e o que o servidor recebeu."""
+    # Cada rodada usa uma chave própria: o cliente compartilhado (cota e
+    # contadores) é um por chave, e o servidor aceita qualquer uma
+    api_key = f"standin-w{workers}-{'pack' if pack else 'single'}-{cache_pass}"
+    config = Config(openai_api_key=api_key, openai_base_url=standin.base_url, max_workers=workers,
+                    openai_pack_paragraphs=pack, openai_requests_per_minute=rpm,
+                    openai_max_tokens=max_tokens, cache_dir=cache_dir)
+    standin.reset_stats()
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        run = run_pipeline(config, manuscript_path, metadata)
+    seconds = time.perf_counter() - start
+
+    usage = shared_client(api_key, standin.base_url).usage.summary()
+    usage.pop("by_purpose")
+    return {
+        "workers": workers,
+        "pack": pack,
+        "cache": cache_pass,
+        "seconds": round(seconds, 4),
+        "stages": run["stages"],
+        "skipped": run["skipped"],
+        "ai_changes": run["enhancement"]["ai_changes"],
+        "ai_cache": run["enhancement"]["ai_cache"],
+        "client": usage,
+        "server": standin.stats(),
+    }
+
+
+def run_benchmark(size: int, genre: str, workers: List[int], packs: List[bool], settings: StandInSettings,
+                  warm: bool = True, rpm: int = 0, max_tokens: int = 3000, seed: int = 42,
+                  verbose: bool = True) -> Dict:
+    """
+    Executa o benchmark completo e devolve o relatório (serializável em JSON).
+    """
+    results = []
+    passes = ["cold", "warm"] if warm else ["cold"]
+    with tempfile.TemporaryDirectory() as tmp, LLMStandIn(settings) as standin:
+        manuscript_path = os.path.join(tmp, "manuscrito.md")
+        text = f"# {METADATA['title']}\n\n" + generate_corpus(size, genre, seed)
+        Path(manuscript_path).write_text(text, encoding="utf-8")
+        metadata = {**METADATA, "genre": genre}
+
+        for worker_count in workers:
+            for pack in packs:
+                # Cache novo por combinação: a rodada "warm" reaproveita só o da "cold"
+                cache_dir = tempfile.mkdtemp(dir=tmp, prefix="cache-")
+                for cache_pass in passes:
+                    entry = measure(standin, manuscript_path, cache_dir, worker_count, pack, cache_pass,
+                                    rpm, max_tokens, metadata)
+                    results.append(entry)
+                    if verbose:
+                        client, server = entry["client"], entry["server"]
+                        print(f"  workers {worker_count:3d}  {'lotes' if pack else 'simples':7s} {cache_pass:4s} "
+                              f"{entry['seconds']:8.2f} s  aprimoramento {entry['stages']['enhancement']:7.2f} s  "
+                              f"{server['requests']:5d} req  {server['errors']:4d} erros  "
+                              f"pico {server['peak_concurrency']:3d}  latência média {client['latency_avg']:.3f} s")
+
+    return {
+        "benchmark": "ai",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "genre": genre,
+        "size": format_size(size),
+        "input_bytes": len(text.encode("utf-8")),
+        "standin": vars(settings),
+        "requests_per_minute": rpm,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos com IA contra um servidor substituto local")
+    parser.add_argument("--size", default="50KB", help="Tamanho do manuscrito sintético (padrão: 50KB)")
+    parser.add_argument("--genre", default="academic", choices=GENRES, help="fiction, academic")
+    parser.add_argument("--workers", default=DEFAULT_WORKERS,
+                        help=f"Valores de max_workers separados por vírgula (padrão: {DEFAULT_WORKERS})")
+    parser.add_argument("--pack", default="on,off", help="Agrupamento de parágrafos: on, off ou on,off")
+    parser.add_argument("--no-warm", action="store_true", help="Não repete cada combinação com o cache cheio")
+    parser.add_argument("--rpm", type=int, default=0, help="openai_requests_per_minute (padrão: 0 = sem limite)")
+    parser.add_argument("--max-tokens", type=int, default=Config.openai_max_tokens, help="openai_max_tokens")
+    parser.add_argument("--latency", type=float, default=0.1, help="Latência do servidor, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Atraso aleatório adicional máximo, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das requisições que falham (0 a 1)")
+    parser.add_argument("--error-status", type=int, default=429, help="Código HTTP das falhas (padrão: 429)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Vazão de geração por resposta (0 = instantâneo)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do texto e dos sorteios do servidor")
+    parser.add_argument("--output", "-o", default="benchmark_ai.json", help="Arquivo JSON de saída ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    workers = [int(w) for w in args.workers.split(",") if w.strip()]
+    pack_values = {"on": True, "off": False}
+    packs = [p.strip() for p in args.pack.split(",") if p.strip()]
+    unknown = [p for p in packs if p not in pack_values]
+    if unknown:
+        parser.error(f"valor de --pack desconhecido: {', '.join(unknown)} (use on, off)")
+    if not 0 <= args.error_rate < 1:
+        parser.error("--error-rate deve estar entre 0 e 1 (exclusive)")
+
+    settings = StandInSettings(args.latency, args.jitter, args.error_rate, args.error_status,
+                               args.tokens_per_second, args.seed)
+    to_stdout = args.output == "-"
+    if not to_stdout:
+        print("⏱️  Benchmark dos caminhos com IA (servidor substituto local)")
+    report = run_benchmark(parse_size(args.size), args.genre, workers, [pack_values[p] for p in packs], settings,
+                           warm=not args.no_warm, rpm=args.rpm, max_tokens=args.max_tokens, seed=args.seed,
+                           verbose=not to_stdout)
+
+    if to_stdout:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ Resultados salvos em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
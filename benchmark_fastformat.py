@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark do FastFormat com corpora sintéticos em PT-BR.
+
+Gera textos de ficção e acadêmicos determinísticos (semente fixa) com
+diálogos, aspas, intervalos numéricos, marcadores e reticências, e mede o
+apply_fastformat em cada preset (PT-BR, acadêmico e padrão) e modo.
+O resultado (MB/s e pico de memória) é gravado em JSON para comparar
+versões.
+
+Uso:
+    python benchmark_fastformat.py
+    python benchmark_fastformat.py --sizes 10KB,1MB,100MB --modes classic,compiled
+    python benchmark_fastformat.py --genres fiction --output bench.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastformat import (FASTFORMAT_MODES, FastFormatOptions, FastFormatProfiler, apply_fastformat,
+                        get_fastformat_default_options)
+from modules.fastformat_utils import get_academic_options, get_ptbr_options
+
+GENRES = ("fiction", "academic")
+
+PRESETS = {
+    "ptbr": get_ptbr_options,
+    "academic": get_academic_options,
+    "default": get_fastformat_default_options,
+}
+
+DEFAULT_SIZES = "10KB,100KB,1MB,10MB"
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+# ---------------------------------------------------------------------------
+# Gerador de corpus
+# ---------------------------------------------------------------------------
+# O texto é montado a partir de um banco de frases sorteado uma única vez
+# por semente; assim até 100 MB saem em poucos segundos e o mesmo tamanho
+# e semente sempre produzem o mesmo texto.
+
+_NAMES = ["Ana", "Beatriz", "Carlos", "Daniel", "Helena", "João", "Lúcia", "Marcos", "Rita", "Tomás"]
+_SUBJECTS = ["a casa", "o rio", "a cidade", "o vento", "a janela", "o velho", "a estrada", "o silêncio",
+             "a chuva", "o mar", "a noite", "o relógio"]
+_VERBS = ["guardava", "escondia", "atravessava", "iluminava", "esperava", "lembrava", "cobria", "seguia"]
+_OBJECTS = ["as cartas antigas", "o caminho de volta", "um segredo de família", "a luz da tarde",
+            "o cheiro de café", "as vozes do porão", "a última promessa", "o barulho da feira"]
+_SPEECH = ["Você não entende", "Eu já disse que não", "Onde você estava", "Fique aqui comigo",
+           "Ninguém precisa saber", "Amanhã a gente conversa", "Isso não é justo", "Eu volto logo"]
+_TAGS = ["disse ela", "respondeu ele", "murmurou", "perguntou baixinho", "gritou da porta"]
+
+_TOPICS = ["a formação de leitores", "o mercado editorial", "a tradução literária", "a revisão de textos",
+           "a tipografia digital", "o ensino de redação", "a leitura em telas", "a produção de e-books"]
+_ACADEMIC_VERBS = ["analisa", "discute", "compara", "investiga", "descreve", "avalia"]
+_AUTHORS = ["SILVA", "SOUZA", "OLIVEIRA", "PEREIRA", "COSTA", "ALMEIDA", "FERREIRA", "RODRIGUES"]
+_SECTIONS = ["Introdução", "Referencial Teórico", "Metodologia", "Resultados", "Discussão", "Conclusão"]
+
+
+def _dialogue_line(rng: random.Random) -> str:
+    # Fala com hífen (vira travessão) e às vezes reticências
+    speech = rng.choice(_SPEECH)
+    end = rng.choice(["...", "?", "!", "."])
+    if rng.random() < 0.5:
+        return f"- {speech}{end}"
+    return f"- {speech}{end} - {rng.choice(_TAGS)}."
+
+
+def _fiction_sentence(rng: random.Random) -> str:
+    kind = rng.random()
+    name = rng.choice(_NAMES)
+    if kind < 0.20:
+        return f'{name} leu em voz alta: "{rng.choice(_SPEECH)}" e fechou o livro.'
+    if kind < 0.35:
+        start = rng.randint(1, 90)
+        return f"Entre {start}-{start + rng.randint(2, 30)} anos depois, {rng.choice(_SUBJECTS)} ainda {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+    if kind < 0.50:
+        return f"{name} hesitou... {rng.choice(_SUBJECTS).capitalize()} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}  ."
+    if kind < 0.60:
+        return f"Era a casa d'água ( perto da ponte ) onde {name} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+    return f"{rng.choice(_SUBJECTS).capitalize()} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}, e {name} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+
+
+def _academic_sentence(rng: random.Random) -> str:
+    kind = rng.random()
+    author = rng.choice(_AUTHORS)
+    year = rng.randint(1985, 2024)
+    topic = rng.choice(_TOPICS)
+    if kind < 0.25:
+        page = rng.randint(5, 300)
+        return f"Segundo {author} ({year}, p. {page}-{page + rng.randint(1, 12)}), {topic} exige atenção ao contexto."
+    if kind < 0.40:
+        return f'O termo "{topic}" aparece em {rng.randint(3, 90)} dos textos analisados ( ver Tabela {rng.randint(1, 9)} ).'
+    if kind < 0.55:
+        start = rng.randint(1950, 2010)
+        return f"No período de {start}-{start + rng.randint(5, 14)}, {topic} passou por mudanças significativas [{author}, {year}]."
+    if kind < 0.65:
+        return f"Este estudo {rng.choice(_ACADEMIC_VERBS)} {topic}, entre outros aspectos..."
+    return f"O capítulo {rng.choice(_ACADEMIC_VERBS)} {topic} a partir de {rng.choice(_TOPICS)} ; os dados confirmam a hipótese ."
+
+
+def _fiction_block(rng: random.Random, pool: List[str]) -> str:
+    kind = rng.random()
+    if kind < 0.03:
+        return f"# Capítulo {rng.randint(1, 60)}"
+    if kind < 0.08:
+        return "\n".join(f"* {rng.choice(_OBJECTS)}" for _ in range(rng.randint(2, 4)))
+    if kind < 0.40:
+        # Cada fala é um parágrafo
+        return _dialogue_line(rng)
+    return "  ".join(rng.choice(pool) for _ in range(rng.randint(2, 7)))
+
+
+def _academic_block(rng: random.Random, pool: List[str]) -> str:
+    kind = rng.random()
+    if kind < 0.06:
+        return f"## {rng.randint(1, 9)}. {rng.choice(_SECTIONS)}"
+    if kind < 0.16:
+        return "\n".join(f"- {rng.choice(_TOPICS)}" for _ in range(rng.randint(2, 5)))
+    return " ".join(rng.choice(pool) for _ in range(rng.randint(3, 8)))
+
+
+def generate_corpus(size: int, genre: str = "fiction", seed: int = 42) -> str:
+    """
+    Gera um texto sintético em PT-BR com pelo menos `size` bytes (UTF-8).
+
+    Args:
+        size: Tamanho mínimo em bytes
+        genre: "fiction" ou "academic"
+        seed: Semente do gerador (mesma semente e tamanho = mesmo texto)
+
+    Returns:
+        Texto com parágrafos separados por linhas em branco
+    """
+    if genre not in GENRES:
+        raise ValueError(f"Gênero desconhecido: {genre!r} (use um de {GENRES})")
+
+    rng = random.Random(f"{genre}:{seed}")
+    sentence, block = (_fiction_sentence, _fiction_block) if genre == "fiction" else (_academic_sentence, _academic_block)
+    pool = [sentence(rng) for _ in range(2000)]
+
+    blocks = []
+    total = 0
+    while total < size:
+        text = block(rng, pool)
+        blocks.append(text)
+        total += len(text.encode("utf-8")) + 2
+    return "\n\n".join(blocks) + "\n"
+
+
+def parse_size(value: str) -> int:
+    """Converte "10KB", "1MB", "100MB" (múltiplos de 1024) em bytes."""
+    value = value.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * _UNITS[unit])
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= _UNITS[unit]:
+            return f"{size / _UNITS[unit]:g}{unit}"
+    return f"{size}B"
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+def _repeats_for(size: int) -> int:
+    # Mais repetições nos textos pequenos, onde o tempo de uma chamada é ruído
+    if size <= 100 * 1024:
+        return 10
+    if size <= 10 * 1024 ** 2:
+        return 3
+    return 1
+
+
+def measure(text: str, options: FastFormatOptions, mode: str, repeats: int,
+            memory: bool = True, max_workers: Optional[int] = None, profile_rules: bool = False) -> Dict:
+    """
+    Mede apply_fastformat(text, options, mode): melhor tempo entre
+    `repeats` execuções e, numa execução à parte com tracemalloc, o pico
+    de memória alocada. Com profile_rules, uma execução extra registra o
+    custo de cada regra (FastFormatProfiler).
+    """
+    size = len(text.encode("utf-8"))
+    timings = []
+    output = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = apply_fastformat(text, options, mode=mode, max_workers=max_workers)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    result = {
+        "mode": mode,
+        "repeats": repeats,
+        "seconds": round(best, 6),
+        "seconds_mean": round(sum(timings) / len(timings), 6),
+        "mb_per_s": round(size / _UNITS["MB"] / best, 3) if best > 0 else None,
+        "output_bytes": len(output.encode("utf-8")),
+        "output_hash": hashlib.blake2b(output.encode("utf-8"), digest_size=8).hexdigest(),
+        "peak_memory_mb": None,
+    }
+
+    if memory:
+        tracemalloc.start()
+        try:
+            apply_fastformat(text, options, mode=mode, max_workers=max_workers)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_memory_mb"] = round(peak / _UNITS["MB"], 3)
+
+    if profile_rules:
+        with FastFormatProfiler() as profiler:
+            apply_fastformat(text, options, mode=mode, max_workers=max_workers)
+        result["rules"] = profiler.summary()["rules"]
+
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_benchmark(sizes: List[int], genres: List[str], presets: List[str], modes: List[str],
+                  seed: int = 42, repeats: Optional[int] = None, memory: bool = True,
+                  max_workers: Optional[int] = None, profile_rules: bool = False, verbose: bool = True) -> Dict:
+    """
+    Executa o benchmark completo e devolve o relatório (serializável em JSON).
+    """
+    results = []
+    for genre in genres:
+        for size in sizes:
+            text = generate_corpus(size, genre, seed)
+            input_bytes = len(text.encode("utf-8"))
+            for preset in presets:
+                options = PRESETS[preset]()
+                for mode in modes:
+                    entry = {
+                        "genre": genre,
+                        "size": format_size(size),
+                        "input_bytes": input_bytes,
+                        "preset": preset,
+                    }
+                    entry.update(measure(text, options, mode, repeats or _repeats_for(size),
+                                         memory=memory, max_workers=max_workers, profile_rules=profile_rules))
+                    results.append(entry)
+                    if verbose:
+                        memory_info = f", pico {entry['peak_memory_mb']:.1f} MB" if entry["peak_memory_mb"] is not None else ""
+                        print(f"  {genre:9s} {entry['size']:>6s} {preset:9s} {mode:9s} "
+                              f"{entry['seconds'] * 1000:10.1f} ms  {entry['mb_per_s']:8.2f} MB/s{memory_info}")
+
+    return {
+        "benchmark": "fastformat",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do FastFormat com corpora sintéticos em PT-BR")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Tamanhos separados por vírgula, ex.: 10KB,1MB,100MB (padrão: {DEFAULT_SIZES})")
+    parser.add_argument("--genres", default=",".join(GENRES), help="fiction, academic")
+    parser.add_argument("--presets", default=",".join(PRESETS), help="ptbr, academic, default")
+    parser.add_argument("--modes", default="classic,compiled", help=f"Modos do apply_fastformat: {', '.join(FASTFORMAT_MODES)}")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador de texto")
+    parser.add_argument("--repeats", type=int, help="Repetições por medição (padrão: conforme o tamanho)")
+    parser.add_argument("--max-workers", type=int, help="Processos no modo parallel")
+    parser.add_argument("--no-memory", action="store_true", help="Não mede o pico de memória (tracemalloc)")
+    parser.add_argument("--profile-rules", action="store_true", help="Inclui tempo, matches e bytes alterados por regra")
+    parser.add_argument("--output", "-o", default="benchmark_fastformat.json", help="Arquivo JSON de saída ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    genres = [g.strip() for g in args.genres.split(",") if g.strip()]
+    presets = [p.strip() for p in args.presets.split(",") if p.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for name, values, allowed in (("gênero", genres, GENRES), ("preset", presets, tuple(PRESETS)),
+                                  ("modo", modes, FASTFORMAT_MODES)):
+        unknown = [v for v in values if v not in allowed]
+        if unknown:
+            parser.error(f"{name} desconhecido: {', '.join(unknown)} (use {', '.join(allowed)})")
+
+    to_stdout = args.output == "-"
+    if not to_stdout:
+        print("⏱️  Benchmark do FastFormat")
+    report = run_benchmark(sizes, genres, presets, modes, seed=args.seed, repeats=args.repeats,
+                           memory=not args.no_memory, max_workers=args.max_workers,
+                           profile_rules=args.profile_rules, verbose=not to_stdout)
+
+    if to_stdout:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ Resultados salvos em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,34 @@
 # fastformat.py
 # -*- coding: utf-8 -*-
-from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Any
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from typing import Optional, Dict, List, Any, Callable, Iterable, Iterator, Pattern, Tuple
+from collections import OrderedDict
+from itertools import accumulate, chain
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import bisect
+import heapq
+import hashlib
+import json
+import os
 import re
+import shutil
+import sys
+import tempfile
+import time
 import difflib
 
-@dataclass
+FASTFORMAT_MODES = ("classic", "compiled", "parallel")
+
+# Programas compilados guardados por conjunto de opções
+FASTFORMAT_CACHE_SIZE = 64
+
+@dataclass(frozen=True)
 class FastFormatOptions:
+    # Imutável e hashável: serve de chave do cache de programas compilados.
+    # Para variar um preset use dataclasses.replace(options, campo=valor).
+
     # Espaços e quebras
     normalize_whitespace: bool = True               # espaços duplicados -> simples
     trim_line_spaces: bool = True                   # remove espaços à direita/esquerda de cada linha
@@ -29,20 +51,47 @@ def get_fastformat_default_options() -> FastFormatOptions:
     return FastFormatOptions()
 
 
+# Padrões compilados uma vez no import, compartilhados pelo pipeline
+# clássico e pelo motor compilado (o cache interno do re é pequeno e
+# disputado pelos outros módulos que usam regex no mesmo processo)
+_RE_DOTS = re.compile(r'\.{3,}')
+_RE_CHAR_BEFORE_ELLIPSIS = re.compile(r'([^\s])…')
+_RE_CHAR_AFTER_ELLIPSIS = re.compile(r'…([^\s])')
+_RE_SPACED_ELLIPSIS = re.compile(r'\s…\s')
+_RE_OPEN_DOUBLE_QUOTE = re.compile(r'(^|[\s(\[{<])(")')
+_RE_CLOSE_DOUBLE_QUOTE = re.compile(r'(")([\s).\]}>]|$)')
+_RE_CONTRACTION = re.compile(r"(\w)'(\w)")
+_RE_LEADING_APOSTROPHE = re.compile(r"(\s|^)'(\w)")
+_RE_OPEN_SINGLE_QUOTE = re.compile(r"(^|[\s(\[{<])(')(\s)")
+_RE_DIALOGUE_HYPHEN = re.compile(r'^[ \t]*[-]{1,2}[ \t]+', re.MULTILINE)
+_RE_DIALOGUE_EMDASH = re.compile(r'^[ \t]*[—]{1,2}[ \t]+', re.MULTILINE)
+_RE_RANGE_HYPHEN = re.compile(r'(\d+)\s*[-]{1,2}\s*(\d+)')
+_RE_RANGE_DASH = re.compile(r'(\d+)\s*[–—]{1,2}\s*(\d+)')
+_RE_BULLET = re.compile(r'^[ \t]*[-*][ \t]+', re.MULTILINE)
+_RE_SPACE_BEFORE_PUNCT = re.compile(r'\s+([,.;:?!])')
+_RE_SPACE_AFTER_PUNCT = re.compile(r'([,.;:?!])([^\s,.?!])')
+_RE_OPEN_PAREN = re.compile(r'\s*\(\s*')
+_RE_CLOSE_PAREN = re.compile(r'\s*\)\s*')
+_RE_OPEN_BRACKET = re.compile(r'\s*\[\s*')
+_RE_CLOSE_BRACKET = re.compile(r'\s*\]\s*')
+_RE_MULTI_SPACE = re.compile(r' {2,}')
+_RE_BLANK_LINES = re.compile(r'\n{3,}')
+
+
 def _to_curly_quotes(text: str, pt_br_style: bool = True) -> str:
     # Aspas duplas
     # Abertura em pt-BR (com base em contexto)
-    text = re.sub(r'(^|[\s(\[{<])(")', r'\1“', text)
+    text = _RE_OPEN_DOUBLE_QUOTE.sub(r'\1“', text)
     # Fechamento em pt-BR
-    text = re.sub(r'(")([\s).\]}>]|$)', r'”\2', text) # Ajustado para fechar aspas duplas de forma mais robusta
+    text = _RE_CLOSE_DOUBLE_QUOTE.sub(r'”\2', text) # Ajustado para fechar aspas duplas de forma mais robusta
 
     # Aspas simples (apostrofo vs aspas)
-    text = re.sub(r"(\w)'(\w)", r"\1’\2", text) # Contração
-    text = re.sub(r"(^|[\s(\[{<])(')(\s)", r"\1‘\3", text) # Abertura simples
+    text = _RE_CONTRACTION.sub(r"\1’\2", text) # Contração
+    text = _RE_OPEN_SINGLE_QUOTE.sub(r"\1‘\3", text) # Abertura simples
     text = text.replace("'", "’") # Resto vira fechamento simples
 
     # Correção para apostrofo inicial em palavras (ex: 's algo)
-    text = re.sub(r"(\s|^)'(\w)", r"\1‘\2", text)
+    text = _RE_LEADING_APOSTROPHE.sub(r"\1‘\2", text)
     
     # Garantir que aspas restantes sejam fechadas como '”' ou '’'
     text = text.replace('"', '”')
@@ -60,11 +109,11 @@ def _to_straight_quotes(text: str) -> str:
 
 def _normalize_ellipsis(text: str) -> str:
     # Substitui múltiplas ocorrências de '.' por '…'
-    text = re.sub(r'\.{3,}', '…', text)
+    text = _RE_DOTS.sub('…', text)
     # Garante um espaço antes e depois, a menos que esteja no fim de frase ou precedido por espaço
-    text = re.sub(r'([^\s])…', r'\1 …', text) # Ex: palavra…palavra -> palavra …palavra
-    text = re.sub(r'…([^\s])', r'… \1', text) # Ex: palavra…palavra -> palavra… palavra
-    text = re.sub(r'\s…\s', ' … ', text) # Normaliza espaços ao redor
+    text = _RE_CHAR_BEFORE_ELLIPSIS.sub(r'\1 …', text) # Ex: palavra…palavra -> palavra …palavra
+    text = _RE_CHAR_AFTER_ELLIPSIS.sub(r'… \1', text) # Ex: palavra…palavra -> palavra… palavra
+    text = _RE_SPACED_ELLIPSIS.sub(' … ', text) # Normaliza espaços ao redor
     return text
 
 def _denormalize_ellipsis(text: str) -> str:
@@ -77,9 +126,9 @@ def _normalize_dialogue_dash(text: str, mode: str) -> str:
     for ln in lines:
         # Apenas afeta o início da linha ou após um parágrafo vazio para diálogos
         if mode == "emdash":
-            ln = re.sub(r'^[ \t]*[-]{1,2}[ \t]+', '— ', ln)
+            ln = _RE_DIALOGUE_HYPHEN.sub('— ', ln)
         else: # hyphen
-            ln = re.sub(r'^[ \t]*[—]{1,2}[ \t]+', '- ', ln)
+            ln = _RE_DIALOGUE_EMDASH.sub('- ', ln)
         out.append(ln)
     return "\n".join(out)
 
@@ -87,22 +136,22 @@ def _normalize_number_ranges(text: str, dash_type: str) -> str:
     # "10-20", "10 - 20" -> "10–20" se endash
     if dash_type == "endash":
         # Encontra padrões como "1-2", "1 - 2", "1 -- 2" e converte para "1–2"
-        return re.sub(r'(\d+)\s*[-]{1,2}\s*(\d+)', r'\1–\2', text)
+        return _RE_RANGE_HYPHEN.sub(r'\1–\2', text)
     else: # hyphen
         # Converte qualquer en/em-dash em contexto de range para hífen
-        return re.sub(r'(\d+)\s*[–—]{1,2}\s*(\d+)', r'\1-\2', text)
+        return _RE_RANGE_DASH.sub(r'\1-\2', text)
 
 def _normalize_bullets(text: str) -> str:
     lines = text.splitlines()
     out = []
     for ln in lines:
-        ln = re.sub(r'^[ \t]*[-*][ \t]+', '• ', ln)
+        ln = _RE_BULLET.sub('• ', ln)
         out.append(ln)
     return "\n".join(out)
 
 def _normalize_spaces_and_newlines(text: str, trim_lines: bool, collapse_blanks: bool, ensure_final: bool) -> str:
     # Remove múltiplos espaços para um único espaço
-    text = re.sub(r' {2,}', ' ', text)
+    text = _RE_MULTI_SPACE.sub(' ', text)
 
     lines = text.splitlines()
     norm_lines = []
@@ -114,7 +163,7 @@ def _normalize_spaces_and_newlines(text: str, trim_lines: bool, collapse_blanks:
 
     if collapse_blanks:
         # Reduz múltiplas linhas vazias para no máximo uma linha vazia
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _RE_BLANK_LINES.sub('\n\n', text)
     
     if ensure_final and not text.endswith("\n") and text.strip():
         text += "\n"
@@ -123,51 +172,633 @@ def _normalize_spaces_and_newlines(text: str, trim_lines: bool, collapse_blanks:
 
 def _smart_ptbr_punctuation(text: str) -> str:
     # Remove espaço antes de pontuação de fechamento (geralmente não usado em PT-BR)
-    text = re.sub(r'\s+([,.;:?!])', r'\1', text)
+    text = _RE_SPACE_BEFORE_PUNCT.sub(r'\1', text)
     # Garante um espaço após pontuação de fechamento, se seguido por caractere que não seja pontuação
-    text = re.sub(r'([,.;:?!])([^\s,.?!])', r'\1 \2', text)
+    text = _RE_SPACE_AFTER_PUNCT.sub(r'\1 \2', text)
     # Normaliza espaços ao redor de parênteses/colchetes
-    text = re.sub(r'\s*\(\s*', ' (', text)
-    text = re.sub(r'\s*\)\s*', ') ', text)
-    text = re.sub(r'\s*\[\s*', ' [', text)
-    text = re.sub(r'\s*\]\s*', '] ', text)
+    text = _RE_OPEN_PAREN.sub(' (', text)
+    text = _RE_CLOSE_PAREN.sub(') ', text)
+    text = _RE_OPEN_BRACKET.sub(' [', text)
+    text = _RE_CLOSE_BRACKET.sub('] ', text)
     # Remove espaço duplicado que possa ter surgido
-    text = re.sub(r' {2,}', ' ', text)
+    text = _RE_MULTI_SPACE.sub(' ', text)
     return text.strip()
 
 
-def apply_fastformat(text: str, options: FastFormatOptions) -> str:
-    if not isinstance(text, str):
-        return text # Garante que estamos trabalhando com string
-    
-    current_text = text
+# ---------------------------------------------------------------------------
+# Motor compilado
+# ---------------------------------------------------------------------------
+# O pipeline clássico acima roda ~20 re.sub em sequência e dois ciclos
+# splitlines/join, cada um varrendo e copiando o livro inteiro. O motor
+# compilado transforma as opções em um programa de passos pré-compilados
+# que produz exatamente a mesma saída, mas:
+#   - elimina passos mortos (ex.: o fechamento de aspas por regex é coberto
+#     pelo replace final; após trocar todo "'" nada mais casa com "'");
+#   - pula cada passo cujo caractere-gatilho não aparece no texto (um teste
+#     `in` é uma varredura em C, sem cópia);
+#   - troca os laços Python por linha/caractere por regex MULTILINE,
+#     str.translate e str.replace;
+#   - normaliza as quebras de linha uma única vez: depois do passo de
+#     travessões o texto só tem "\n", então cada splitlines/join seguinte
+#     equivale a remover um único "\n" final.
+
+# Quebras reconhecidas por str.splitlines() além de "\n"
+_OTHER_LINE_BREAKS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_RE_OTHER_LINE_BREAKS = re.compile(r'\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# Equivalentes que começam por literal (o sre só acelera a busca nesses
+# casos) e sondas que detectam quando um passo seria identidade.
+_RE_DOTS_FAST = re.compile(r'\.\.\.+')
+# Sem "……" nenhum caractere anterior foi consumido por um match anterior
+_RE_CHAR_BEFORE_ELLIPSIS_FAST = re.compile(r'…(?<=\S…)')
+# Só altera o texto se algum "…" encosta em espaço que não seja ' '
+_PROBE_SPACED_ELLIPSIS = re.compile(r'…(?:(?<=[^\S ]…)|(?=[^\S ]))')
+# A classe de abertura nunca contém '"', então nada é consumido a mais
+_RE_OPEN_DOUBLE_QUOTE_FAST = re.compile(r'"(?<![^\s(\[{<]")')
+# Sem "' '" o espaço consumido após uma aspa nunca abre a seguinte
+_PROBE_QUOTE_SPACE_QUOTE = re.compile(r"'\s'")
+_RE_OPEN_SINGLE_QUOTE_FAST = re.compile(r"'(?<![^\s(\[{<]')(?=\s)")
+_PROBE_RANGE_HYPHEN = re.compile(r'-(?<=[\d\s]-)')
+_PROBE_RANGE_DASH = re.compile(r'[–—](?<=[\d\s][–—])')
+_PROBE_SPACE_BEFORE_PUNCT = re.compile(r'[,.;:?!](?<=\s[,.;:?!])')
+
+_STRAIGHT_QUOTES_TABLE = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+# Padrões usados só no registro de alterações, para os passos cuja versão
+# rápida não é um re.sub (replace, translate, strip, splitlines/join)
+_RE_ELLIPSIS_CHAR = re.compile('…')
+_RE_DOUBLE_QUOTE = re.compile('"')
+_RE_SINGLE_QUOTE = re.compile("'")
+_RE_CURLY_QUOTE = re.compile('[“”‘’]')
+_RE_LINE_BREAK = re.compile(r'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+_RE_FINAL_NEWLINE = re.compile(r'\n\Z')
+_RE_LINE_EDGE_SPACES = re.compile(r'^[^\S\n]+|[^\S\n]+$', re.MULTILINE)
+_RE_TEXT_EDGE_SPACES = re.compile(r'\A\s+|\s+\Z')
+
+
+def _join_lines(text: str) -> str:
+    # Equivale a "\n".join(text.splitlines())
+    if any(ch in text for ch in _OTHER_LINE_BREAKS):
+        text = _RE_OTHER_LINE_BREAKS.sub('\n', text)
+    if text.endswith('\n'):
+        text = text[:-1]
+    return text
+
+
+def _drop_final_newline(text: str) -> str:
+    # splitlines/join sobre texto que já só tem "\n"
+    return text[:-1] if text.endswith('\n') else text
+
+
+def _trim_lines(text: str) -> str:
+    # Pressupõe linhas já normalizadas (só "\n", sem "\n" final)
+    return "\n".join([ln.strip() for ln in text.split("\n")])
+
+
+def _ensure_final_newline(text: str) -> str:
+    if not text.endswith("\n") and text and not text.isspace():
+        text += "\n"
+    return text
+
+
+def _spaced_spans(text: str, mark: str) -> Iterator[Tuple[int, int]]:
+    # Mesmos trechos que re.finditer(r'\s*' + re.escape(mark) + r'\s*', text),
+    # buscando o caractere literal em vez de tentar \s* em cada posição.
+    pos = 0
+    n = len(text)
+    i = text.find(mark)
+    while i != -1:
+        start = i
+        while start > pos and text[start - 1].isspace():
+            start -= 1
+        end = i + 1
+        while end < n and text[end].isspace():
+            end += 1
+        yield start, end
+        pos = end
+        i = text.find(mark, end)
+
+
+def _replace_spaced(text: str, mark: str, repl: str) -> str:
+    out = []
+    pos = 0
+    for start, end in _spaced_spans(text, mark):
+        out.append(text[pos:start])
+        out.append(repl)
+        pos = end
+    if not out:
+        return text
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _spaced_edits(text: str, mark: str, repl: str) -> List[Tuple[int, int, str]]:
+    return [_trim_edit(text, start, end, repl) for start, end in _spaced_spans(text, mark)
+            if text[start:end] != repl]
+
+
+def _compile_template(repl: str) -> Callable[[Any], str]:
+    # Expande "\1 …" sem reanalisar o modelo a cada match (match.expand o faz)
+    parts = re.split(r'\\(\d)', repl)
+    if len(parts) == 1:
+        return lambda m: repl
+    literals = parts[0::2]
+    groups = [int(g) for g in parts[1::2]]
+
+    def expand(match) -> str:
+        out = [literals[0]]
+        for group, literal in zip(groups, literals[1:]):
+            out.append(match.group(group) or '')
+            out.append(literal)
+        return "".join(out)
+    return expand
+
+
+def _sub_edits(pattern: Pattern, repl: Any, text: str) -> List[Tuple[int, int, str]]:
+    """Alterações (início, fim, novo) que pattern.sub(repl, text) faz, sem as identidades."""
+    expand = repl if callable(repl) else _compile_template(repl)
+    out = []
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        new = expand(match)
+        if text[start:end] != new:
+            out.append(_trim_edit(text, start, end, new))
+    return out
+
+
+def _ensure_final_newline_edits(text: str) -> List[Tuple[int, int, str]]:
+    return [(len(text), len(text), "\n")] if _ensure_final_newline(text) is not text else []
+
+
+def _when(probe: Pattern, run: Callable[[str], str]) -> Callable[[str], str]:
+    return lambda t: run(t) if probe.search(t) else t
+
+
+def _join_lines_repl(match) -> str:
+    # A última quebra some, as demais viram "\n"
+    return '' if match.end() == len(match.string) else '\n'
+
+
+@dataclass(frozen=True)
+class _Step:
+    rule: str                                   # regra clássica de origem
+    pattern: Optional[Pattern] = None           # semântica de referência
+    repl: Any = None                            # pattern.sub(repl, text)
+    guards: Tuple[str, ...] = ()                # pula o passo se nenhum ocorrer
+    fast: Optional[Callable[[str], str]] = None # substitui pattern.sub
+    record: Optional[Callable[[str], List[Tuple[int, int, str]]]] = None  # substitui _sub_edits
+
+    def run(self, text: str) -> str:
+        if self.guards and not any(g in text for g in self.guards):
+            return text
+        if self.fast is not None:
+            return self.fast(text)
+        return self.pattern.sub(self.repl, text)
+
+    def edits(self, text: str) -> List[Tuple[int, int, str]]:
+        """Alterações (início, fim, novo) que run(text) faz, sem as identidades."""
+        if self.record is not None:
+            return self.record(text)
+        return _sub_edits(self.pattern, self.repl, text)
+
+
+# ---------------------------------------------------------------------------
+# Markdown (preserve_markdown)
+# ---------------------------------------------------------------------------
+# O documento é lido uma vez e dividido em trechos protegidos e prosa.
+# Blocos (cercas de código, títulos, linhas horizontais, tabelas,
+# definições de links) e trechos inline (código, links, URLs, marcadores
+# de lista) viram um único caractere de uso privado; as regras rodam só
+# sobre esse texto reduzido e os trechos originais voltam no lugar de cada
+# marcador, intactos. Nenhuma regra cria, apaga ou move o marcador: ele não
+# é espaço, pontuação, aspa nem dígito. Os marcadores de lista entram na
+# proteção porque as regras de travessão e de bullets os trocariam.
+#
+# As cercas de código são os únicos trechos protegidos que podem conter
+# linhas em branco; a fragmentação por parágrafos não corta dentro delas.
+
+_MD_FENCE = r'''
+    ^[ ]{0,3}(?:(?P<bt>`{3,})[^`\n]*|(?P<tl>~{3,})[^\n]*)$
+    (?:\n(?:[^\n]*\n)*?[ ]{0,3}(?(bt)(?P=bt)`*|(?P=tl)~*)[ \t]*(?=\r?$)   # até a cerca de fechamento
+      |(?s:.*?)(?=\r?\n?\Z))                                              # ou até o fim do texto
+'''
+_MD_NOT_FENCE = r'(?![ ]{0,3}(?:```|~~~))'
+_MD_TABLE_DELIMITER = (r'[ ]{0,3}(?:\|[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*'
+                       r'|:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)+)\|?[ \t]*(?=\r?$)')
+
+_RE_MD_FENCE = re.compile(_MD_FENCE, re.MULTILINE | re.VERBOSE)
+_RE_MD_BLOCK = re.compile(_MD_FENCE + r'''
+    |^[ ]{0,3}\#{1,6}(?:[ \t][^\n]*?)?(?=\r?$)                            # título ATX
+    |^[ ]{0,3}(?:(?:\*[ \t]*){3,}|(?:-[ \t]*){3,}|(?:_[ \t]*){3,})(?=\r?$) # linha horizontal
+    |^[ ]{0,3}\[[^\]\n]+\]:[^\n]*?(?=\r?$)                                # definição de link
+    |^[^\n]*\|[^\n]*\n''' + _MD_TABLE_DELIMITER + r'''                  # tabela: cabeçalho e
+     (?:\n''' + _MD_NOT_FENCE + r'''[^\n]*\|[^\n]*?(?=\r?$))*             # linhas com "|"
+    |^(?=[^\n]*\S)[^\n]*\n[ ]{0,3}(?:=+|-+)[ \t]*(?=\r?$)                 # título setext
+''', re.MULTILINE | re.VERBOSE)
+# Uma linha só pode abrir bloco se ela ou a seguinte começar assim
+_RE_MD_BLOCK_CANDIDATE = re.compile(r'\n[ ]{0,3}[`~#*_\[|:=-]')
+_RE_MD_INLINE = re.compile(r'''(?=[`!\[<hw])(?:                     # prefixo para o sre
+     (?<!`)(`+)(?!`)[^\n]*?[^`\n]\1(?!`)                                # código inline
+    |!?\[[^\]\n]*\](?:\([^()\s]*(?:\([^()\s]*\)[^()\s]*)*(?:[ \t]+"[^"\n]*")?\)
+                     |\[[^\]\n]*\])                                     # link ou imagem
+    |<(?:https?|ftp|mailto):[^<>\s]+>                                   # autolink
+    |(?:https?://|www\.)[^\s<>()\[\]]*[^\s<>()\[\].,;:?!'"…]             # URL solta
+)''', re.VERBOSE)
+_RE_MD_LIST_MARKER = re.compile(r'[ \t]*[-*+](?=[ \t])')
+_RE_MD_LIST_ITEM = re.compile(r'\n([ \t]*[-*+])(?=[ \t])')
+_RE_MD_FENCE_OPEN = re.compile(r'[ ]{0,3}(?:(`{3,})[^`\n]*|(~{3,})[^\n]*)$')
+_RE_MD_FENCE_CLOSE = re.compile(r'[ ]{0,3}(`{3,}|~{3,})[ \t]*\r?$')
+
+
+def _next_fence(line: str, fence: Optional[str]) -> Optional[str]:
+    """Cerca de código aberta depois de `line` (linha a linha, como _RE_MD_FENCE)."""
+    if fence is None:
+        match = _RE_MD_FENCE_OPEN.match(line)
+        return (match.group(1) or match.group(2)) if match else None
+    match = _RE_MD_FENCE_CLOSE.match(line)
+    if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+        return None
+    return fence
+
+
+def _iter_markdown_blocks(text: str) -> Iterator[Any]:
+    """
+    Equivalente a _RE_MD_BLOCK.finditer(text), mas só tenta casar nas
+    linhas candidatas (o padrão não tem prefixo literal para o sre).
+    """
+    pos = 0
+    candidates = (m.start() + 1 for m in _RE_MD_BLOCK_CANDIDATE.finditer(text))
+    for line in chain((0,), candidates):
+        if line < pos:
+            continue
+        # Tabelas e títulos setext começam na linha anterior à candidata
+        prev = text.rfind('\n', 0, line - 1) + 1 if line else line
+        for start in ((prev, line) if prev != line else (line,)):
+            if start < pos:
+                continue
+            match = _RE_MD_BLOCK.match(text, start)
+            if match:
+                yield match
+                pos = match.end()
+
+
+def _iter_markdown_inline(text: str, pos: int, end: int) -> Iterator[Tuple[int, int]]:
+    # Trechos inline protegidos de text[pos:end], em ordem
+    markers = [m.span(1) for m in _RE_MD_LIST_ITEM.finditer(text, pos, end)]
+    if pos == 0:
+        match = _RE_MD_LIST_MARKER.match(text, 0, end)
+        if match:
+            markers.insert(0, match.span())
+    spans = (m.span() for m in _RE_MD_INLINE.finditer(text, pos, end))
+    return heapq.merge(spans, markers) if markers else spans
+
+
+def _pick_placeholder(text: str) -> str:
+    # Primeiro caractere de uso privado que não aparece no texto
+    for code in range(0xE000, 0xF900):
+        char = chr(code)
+        if char not in text:
+            return char
+    raise ValueError("Texto usa todos os caracteres de uso privado; preserve_markdown indisponível")
+
+
+class _MarkdownMask:
+    """Texto com os trechos markdown protegidos trocados por um marcador."""
+
+    def __init__(self, text: str):
+        self.placeholder = _pick_placeholder(text)
+        self.protected: List[str] = []
+        self.starts: List[int] = []      # início de cada trecho no original
+        pieces: List[str] = []
+        pos = 0
+        for block in _iter_markdown_blocks(text):
+            self._mask_inline(text, pos, block.start(), pieces)
+            self._protect(text, block.start(), block.end(), pieces)
+            pos = block.end()
+        self._mask_inline(text, pos, len(text), pieces)
+        self.text = "".join(pieces)
+
+        # Posição de cada marcador no texto mascarado
+        self.positions: List[int] = []
+        shift = 0
+        for start, protected in zip(self.starts, self.protected):
+            self.positions.append(start - shift)
+            shift += len(protected) - 1
+
+    def _protect(self, text: str, start: int, end: int, pieces: List[str]):
+        self.protected.append(text[start:end])
+        self.starts.append(start)
+        pieces.append(self.placeholder)
+
+    def _mask_inline(self, text: str, pos: int, end: int, pieces: List[str]):
+        for start, stop in _iter_markdown_inline(text, pos, end):
+            pieces.append(text[pos:start])
+            self._protect(text, start, stop, pieces)
+            pos = stop
+        pieces.append(text[pos:end])
+
+    def restore(self, text: str) -> str:
+        parts = text.split(self.placeholder)
+        if len(parts) != len(self.protected) + 1:
+            raise RuntimeError("Marcador de trecho markdown perdido durante a formatação")
+        out = [parts[0]]
+        for protected, part in zip(self.protected, parts[1:]):
+            out.append(protected)
+            out.append(part)
+        return "".join(out)
+
+    def to_original(self, offset: int) -> int:
+        """Converte um offset do texto mascarado (fora dos marcadores) para o original."""
+        k = bisect.bisect_left(self.positions, offset)
+        if k == 0:
+            return offset
+        return offset - self.positions[k - 1] - 1 + self.starts[k - 1] + len(self.protected[k - 1])
+
+
+def _mask_markdown(text: str) -> Optional[_MarkdownMask]:
+    """_MarkdownMask do texto, ou None se não houver nada a proteger."""
+    mask = _MarkdownMask(text)
+    return mask if mask.protected else None
+
+
+# ---------------------------------------------------------------------------
+# Perfil por regra
+# ---------------------------------------------------------------------------
+# Ganchos chamados uma vez por regra a cada formatação, com
+# (regra, segundos, matches, bytes alterados). Sem ganchos registrados o
+# custo é um teste de lista vazia por chamada.
+
+_PROFILE_HOOKS: List[Callable[[str, float, int, int], None]] = []
+
+
+def add_fastformat_hook(hook: Callable[[str, float, int, int], None]):
+    """Registra um gancho hook(regra, segundos, matches, bytes_alterados)."""
+    _PROFILE_HOOKS.append(hook)
+
+
+def remove_fastformat_hook(hook: Callable[[str, float, int, int], None]):
+    if hook in _PROFILE_HOOKS:
+        _PROFILE_HOOKS.remove(hook)
+
+
+def _add_edit_stats(record: list, text: str, edits: List[Tuple[int, int, str]]):
+    # matches: trocas efetivas; bytes: o maior lado (UTF-8) de cada troca
+    record[1] += len(edits)
+    record[2] += sum(max(len(text[start:end].encode('utf-8', 'surrogatepass')),
+                         len(new.encode('utf-8', 'surrogatepass')))
+                     for start, end, new in edits)
+
+
+def _emit_profile(records: Dict[str, list]):
+    for rule, (seconds, matches, changed) in records.items():
+        for hook in list(_PROFILE_HOOKS):
+            hook(rule, seconds, matches, changed)
+
+
+def _merge_profile(total: Dict[str, list], records: Dict[str, list]):
+    for rule, values in records.items():
+        record = total.setdefault(rule, [0.0, 0, 0])
+        for i, value in enumerate(values):
+            record[i] += value
+
+
+class FastFormatProgram:
+    """Programa de regras pré-compilado para um FastFormatOptions."""
+
+    def __init__(self, steps: List[_Step], preserve_markdown: bool = False):
+        self.steps = tuple(steps)
+        self.preserve_markdown = preserve_markdown
+
+    @property
+    def rules(self) -> List[str]:
+        seen = []
+        for step in self.steps:
+            if step.rule not in seen:
+                seen.append(step.rule)
+        return seen
+
+    def apply(self, text: str) -> str:
+        if _PROFILE_HOOKS:
+            text, records = self.profile(text)
+            _emit_profile(records)
+            return text
+        mask = _mask_markdown(text) if self.preserve_markdown else None
+        if mask is not None:
+            text = mask.text
+        for step in self.steps:
+            text = step.run(text)
+        return mask.restore(text) if mask is not None else text
+
+    def profile(self, text: str) -> Tuple[str, Dict[str, list]]:
+        """Como apply(), medindo cada regra: {regra: [segundos, matches, bytes alterados]}."""
+        records: Dict[str, list] = {}
+        mask = _mask_markdown(text) if self.preserve_markdown else None
+        if mask is not None:
+            text = mask.text
+        for step in self.steps:
+            start = time.perf_counter()
+            result = step.run(text)
+            record = records.setdefault(step.rule, [0.0, 0, 0])
+            record[0] += time.perf_counter() - start
+            if result is not text and result != text:
+                # Contagem fora do tempo medido
+                _add_edit_stats(record, text, step.edits(text))
+            text = result
+        return (mask.restore(text) if mask is not None else text), records
+
+    def rule_changes(self, rule: str, text: str) -> Tuple[int, int]:
+        """(matches, bytes alterados) que os passos da regra fazem em `text`."""
+        record = [0.0, 0, 0]
+        for step in self.steps:
+            if step.rule != rule:
+                continue
+            result = step.run(text)
+            if result is not text and result != text:
+                _add_edit_stats(record, text, step.edits(text))
+            text = result
+        return record[1], record[2]
+
+    def apply_with_edits(self, text: str) -> "FastFormatChanges":
+        """Como apply(), registrando cada alteração em coordenadas do texto original."""
+        original = text
+        mask = _mask_markdown(text) if self.preserve_markdown else None
+        if mask is not None:
+            text = mask.text
+        source = text
+        composed: List[list] = []
+        rule_counts: Dict[str, int] = {}
+        for step in self.steps:
+            result = step.run(text)
+            if result is not text and result != text:
+                # Só os passos que mudaram algo pagam o finditer de referência
+                edits = step.edits(text)
+                rule_counts[step.rule] = rule_counts.get(step.rule, 0) + len(edits)
+                composed = _compose_edits(composed, edits, text, step.rule)
+            text = result
+        edits = [
+            FastFormatEdit(start, source[start:end], new, "+".join(rules))
+            for start, end, new, rules in composed
+            if source[start:end] != new
+        ]
+        if mask is not None:
+            # Nenhuma alteração contém um marcador: basta deslocar os offsets
+            edits = [replace(edit, offset=mask.to_original(edit.offset)) for edit in edits]
+            text = mask.restore(text)
+        return FastFormatChanges(original, text, edits, rule_counts)
+
+
+@lru_cache(maxsize=FASTFORMAT_CACHE_SIZE)
+def compile_fastformat(options: FastFormatOptions) -> FastFormatProgram:
+    """
+    Compila as opções em um FastFormatProgram equivalente byte a byte a
+    apply_fastformat(text, options, mode="classic").
+
+    O resultado fica em cache por opções (o programa é imutável): chamadas
+    repetidas com opções iguais não refazem nenhuma preparação.
+    """
+    steps: List[_Step] = []
+    add = steps.append
 
     if options.normalize_ellipsis:
-        current_text = _normalize_ellipsis(current_text)
+        rule = "normalize_ellipsis"
+        add(_Step(rule, _RE_DOTS, '…', ('...',),
+                  fast=lambda t: _RE_DOTS_FAST.sub('…', t),
+                  record=lambda t: _sub_edits(_RE_DOTS_FAST, '…', t)))
+        add(_Step(rule, _RE_CHAR_BEFORE_ELLIPSIS, r'\1 …', ('…',),
+                  fast=lambda t: (_RE_CHAR_BEFORE_ELLIPSIS_FAST.sub(' …', t) if '……' not in t
+                                  else _RE_CHAR_BEFORE_ELLIPSIS.sub(r'\1 …', t)),
+                  record=lambda t: (_sub_edits(_RE_CHAR_BEFORE_ELLIPSIS_FAST, ' …', t) if '……' not in t
+                                    else _sub_edits(_RE_CHAR_BEFORE_ELLIPSIS, r'\1 …', t))))
+        add(_Step(rule, _RE_CHAR_AFTER_ELLIPSIS, r'… \1', ('…',)))
+        add(_Step(rule, _RE_SPACED_ELLIPSIS, ' … ', ('…',),
+                  fast=_when(_PROBE_SPACED_ELLIPSIS, lambda t: _RE_SPACED_ELLIPSIS.sub(' … ', t))))
     else:
-        current_text = _denormalize_ellipsis(current_text) # Desfaz se a opção for desligada
+        add(_Step("denormalize_ellipsis", _RE_ELLIPSIS_CHAR, '...', ('…',), fast=lambda t: t.replace('…', '...')))
 
     if options.quotes_style == "curly":
-        current_text = _to_curly_quotes(current_text)
+        rule = "to_curly_quotes"
+        add(_Step(rule, _RE_OPEN_DOUBLE_QUOTE, r'\1“', ('"',),
+                  fast=lambda t: _RE_OPEN_DOUBLE_QUOTE_FAST.sub('“', t),
+                  record=lambda t: _sub_edits(_RE_OPEN_DOUBLE_QUOTE_FAST, '“', t)))
+        add(_Step(rule, _RE_DOUBLE_QUOTE, '”', ('"',), fast=lambda t: t.replace('"', '”')))
+        add(_Step(rule, _RE_OPEN_SINGLE_QUOTE, r"\1‘\3", ("'",),
+                  fast=lambda t: (_RE_OPEN_SINGLE_QUOTE_FAST.sub('‘', t) if not _PROBE_QUOTE_SPACE_QUOTE.search(t)
+                                  else _RE_OPEN_SINGLE_QUOTE.sub(r"\1‘\3", t)),
+                  record=lambda t: (_sub_edits(_RE_OPEN_SINGLE_QUOTE_FAST, '‘', t) if not _PROBE_QUOTE_SPACE_QUOTE.search(t)
+                                    else _sub_edits(_RE_OPEN_SINGLE_QUOTE, r"\1‘\3", t))))
+        add(_Step(rule, _RE_SINGLE_QUOTE, '’', ("'",), fast=lambda t: t.replace("'", "’")))
+    else:
+        add(_Step("to_straight_quotes", _RE_CURLY_QUOTE, lambda m: m.group(0).translate(_STRAIGHT_QUOTES_TABLE),
+                  ("“", "”", "‘", "’"), fast=lambda t: t.translate(_STRAIGHT_QUOTES_TABLE)))
+
+    rule = "normalize_dialogue_dash"
+    add(_Step(rule, _RE_LINE_BREAK, _join_lines_repl, fast=_join_lines))
+    if options.dialogue_dash == "emdash":
+        add(_Step(rule, _RE_DIALOGUE_HYPHEN, '— ', ('-',)))
     else:
-        current_text = _to_straight_quotes(current_text)
+        add(_Step(rule, _RE_DIALOGUE_EMDASH, '- ', ('—',)))
 
-    current_text = _normalize_dialogue_dash(current_text, options.dialogue_dash)
-    current_text = _normalize_number_ranges(current_text, options.number_range_dash)
+    rule = "normalize_number_ranges"
+    if options.number_range_dash == "endash":
+        add(_Step(rule, _RE_RANGE_HYPHEN, r'\1–\2', ('-',),
+                  fast=_when(_PROBE_RANGE_HYPHEN, lambda t: _RE_RANGE_HYPHEN.sub(r'\1–\2', t))))
+    else:
+        add(_Step(rule, _RE_RANGE_DASH, r'\1-\2', ('–', '—'),
+                  fast=_when(_PROBE_RANGE_DASH, lambda t: _RE_RANGE_DASH.sub(r'\1-\2', t))))
 
     if options.normalize_bullets:
-        current_text = _normalize_bullets(current_text)
+        rule = "normalize_bullets"
+        add(_Step(rule, _RE_FINAL_NEWLINE, '', fast=_drop_final_newline))
+        add(_Step(rule, _RE_BULLET, '• ', ('-', '*')))
 
     if options.smart_ptbr_punctuation:
-        current_text = _smart_ptbr_punctuation(current_text)
+        rule = "smart_ptbr_punctuation"
+        add(_Step(rule, _RE_SPACE_BEFORE_PUNCT, r'\1',
+                  fast=_when(_PROBE_SPACE_BEFORE_PUNCT, lambda t: _RE_SPACE_BEFORE_PUNCT.sub(r'\1', t))))
+        add(_Step(rule, _RE_SPACE_AFTER_PUNCT, r'\1 \2'))
+        for pattern, mark, repl in ((_RE_OPEN_PAREN, '(', ' ('), (_RE_CLOSE_PAREN, ')', ') '),
+                                    (_RE_OPEN_BRACKET, '[', ' ['), (_RE_CLOSE_BRACKET, ']', '] ')):
+            add(_Step(rule, pattern, repl, (mark,),
+                      fast=lambda t, mark=mark, repl=repl: _replace_spaced(t, mark, repl),
+                      record=lambda t, mark=mark, repl=repl: _spaced_edits(t, mark, repl)))
+        add(_Step(rule, _RE_MULTI_SPACE, ' ', ('  ',)))
+        add(_Step(rule, _RE_TEXT_EDGE_SPACES, '', fast=str.strip))
 
     if options.normalize_whitespace:
-        current_text = _normalize_spaces_and_newlines(
-            current_text,
+        rule = "normalize_spaces_and_newlines"
+        if not options.smart_ptbr_punctuation:
+            # Com a pontuação PT-BR ligada não sobram espaços duplos
+            add(_Step(rule, _RE_MULTI_SPACE, ' ', ('  ',)))
+        add(_Step(rule, _RE_FINAL_NEWLINE, '', fast=_drop_final_newline))
+        if options.trim_line_spaces:
+            add(_Step(rule, _RE_LINE_EDGE_SPACES, '', fast=_trim_lines))
+        if options.collapse_blank_lines:
+            add(_Step(rule, _RE_BLANK_LINES, '\n\n', ('\n\n\n',)))
+        if options.ensure_final_newline:
+            add(_Step(rule, fast=_ensure_final_newline, record=_ensure_final_newline_edits))
+
+    return FastFormatProgram(steps, preserve_markdown=options.preserve_markdown)
+
+
+@lru_cache(maxsize=FASTFORMAT_CACHE_SIZE)
+def _classic_stages(options: FastFormatOptions) -> Tuple[Tuple[str, Callable[[str], str]], ...]:
+    """Etapas do pipeline clássico, na ordem, com o nome da regra."""
+    stages: List[Tuple[str, Callable[[str], str]]] = []
+
+    if options.normalize_ellipsis:
+        stages.append(("normalize_ellipsis", _normalize_ellipsis))
+    else:
+        stages.append(("denormalize_ellipsis", _denormalize_ellipsis)) # Desfaz se a opção for desligada
+
+    if options.quotes_style == "curly":
+        stages.append(("to_curly_quotes", _to_curly_quotes))
+    else:
+        stages.append(("to_straight_quotes", _to_straight_quotes))
+
+    stages.append(("normalize_dialogue_dash", lambda t: _normalize_dialogue_dash(t, options.dialogue_dash)))
+    stages.append(("normalize_number_ranges", lambda t: _normalize_number_ranges(t, options.number_range_dash)))
+
+    if options.normalize_bullets:
+        stages.append(("normalize_bullets", _normalize_bullets))
+
+    if options.smart_ptbr_punctuation:
+        stages.append(("smart_ptbr_punctuation", _smart_ptbr_punctuation))
+
+    if options.normalize_whitespace:
+        stages.append(("normalize_spaces_and_newlines", lambda t: _normalize_spaces_and_newlines(
+            t,
             trim_lines=options.trim_line_spaces,
             collapse_blanks=options.collapse_blank_lines,
             ensure_final=options.ensure_final_newline
-        )
+        )))
+
+    return tuple(stages)
+
+
+def apply_fastformat(text: str, options: FastFormatOptions, mode: str = "classic",
+                     max_workers: Optional[int] = None) -> str:
+    if not isinstance(text, str):
+        return text # Garante que estamos trabalhando com string
+
+    if mode == "compiled":
+        return compile_fastformat(options).apply(text)
+    if mode == "parallel":
+        return apply_fastformat_parallel(text, options, max_workers=max_workers)
+    if mode != "classic":
+        raise ValueError(f"Modo FastFormat desconhecido: {mode!r} (use um de {FASTFORMAT_MODES})")
+
+    # Com preserve_markdown as regras só veem a prosa
+    mask = _mask_markdown(text) if options.preserve_markdown else None
+    current_text = mask.text if mask is not None else text
+
+    if _PROFILE_HOOKS:
+        current_text = _apply_classic_profiled(current_text, options)
+    else:
+        for _, stage in _classic_stages(options):
+            current_text = stage(current_text)
+
+    if mask is not None:
+        current_text = mask.restore(current_text)
     
     if options.safe_mode:
         # Implementar regras de segurança adicionais aqui, se necessário.
@@ -177,8 +808,933 @@ def apply_fastformat(text: str, options: FastFormatOptions) -> str:
     return current_text
 
 
+def _apply_classic_profiled(text: str, options: FastFormatOptions) -> str:
+    # Mede as funções clássicas; matches e bytes vêm dos passos compilados
+    # equivalentes, fora do tempo medido
+    program = compile_fastformat(options)
+    records: Dict[str, list] = {}
+    for rule, stage in _classic_stages(options):
+        start = time.perf_counter()
+        result = stage(text)
+        elapsed = time.perf_counter() - start
+        matches, changed = program.rule_changes(rule, text) if result != text else (0, 0)
+        records[rule] = [elapsed, matches, changed]
+        text = result
+    _emit_profile(records)
+    return text
+
+
+class FastFormatProfiler:
+    """
+    Acumula tempo, matches e bytes alterados por regra em todas as
+    formatações feitas enquanto está ativo (qualquer modo).
+
+    Uso:
+        with FastFormatProfiler() as profiler:
+            apply_fastformat(texto, opcoes)
+        print(profiler.to_json())
+
+    Também pode ser registrado como gancho: add_fastformat_hook(profiler).
+    No modo parallel o tempo é a soma do tempo gasto pelos processos.
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, Dict[str, Any]] = {}
+
+    def __call__(self, rule: str, seconds: float, matches: int, bytes_changed: int):
+        stats = self.rules.setdefault(rule, {"calls": 0, "seconds": 0.0, "matches": 0, "bytes_changed": 0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["matches"] += matches
+        stats["bytes_changed"] += bytes_changed
+
+    def __enter__(self) -> "FastFormatProfiler":
+        add_fastformat_hook(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        remove_fastformat_hook(self)
+        return False
+
+    def reset(self):
+        self.rules.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        """Estatísticas por regra, da mais cara para a mais barata."""
+        total = sum(stats["seconds"] for stats in self.rules.values())
+        rules = {}
+        for rule, stats in sorted(self.rules.items(), key=lambda item: item[1]["seconds"], reverse=True):
+            rules[rule] = dict(stats, seconds=round(stats["seconds"], 6),
+                               share=round(stats["seconds"] / total, 4) if total else 0.0)
+        return {"total_seconds": round(total, 6), "rules": rules}
+
+    def to_json(self, path: Optional[str] = None, indent: int = 2) -> str:
+        data = json.dumps(self.summary(), ensure_ascii=False, indent=indent)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return data
+
+
+# ---------------------------------------------------------------------------
+# Fragmentação por parágrafos
+# ---------------------------------------------------------------------------
+# Quase todas as regras são locais a um parágrafo, mas várias usam \s e
+# atravessam linhas em branco: "\s*\(\s*" junta um parágrafo que começa com
+# "(" ao anterior, "\s+([,.;:?!])" faz o mesmo com pontuação, "\s…\s" e os
+# intervalos numéricos também. Por isso só cortamos o texto numa fronteira
+# segura: uma sequência de 2+ quebras ("\n" ou "\r\n") entre dois caracteres
+# visíveis que nenhuma regra consegue ligar. Formatar cada fragmento isolado
+# e juntar com o separador normalizado dá exatamente o resultado do texto
+# inteiro (o fragmento que não é o último só não ganha a quebra final).
+
+_RE_SHARD_BOUNDARY = re.compile(r'(?<=\S)(?:\r?\n){2,}(?=\S)')
+_RE_SHARD_BOUNDARY_PREFIX = re.compile(r'\n\r?\n')
+_RE_NEWLINE_RUN = re.compile(r'(?:\r?\n)*')
+_UNSAFE_SHARD_TAIL = "'…()[]"
+_UNSAFE_SHARD_HEAD = ",.;:?!…()[]"
+_RANGE_DASHES = "-–—"
+
+
+def _is_safe_boundary(tail: str, head: str) -> bool:
+    # tail: fim do parágrafo anterior; head: primeiro caractere do seguinte
+    last = tail[-1]
+    if last in _UNSAFE_SHARD_TAIL or head in _UNSAFE_SHARD_HEAD or tail.endswith('...'):
+        return False
+    if (last.isdigit() or last in _RANGE_DASHES) and (head.isdigit() or head in _RANGE_DASHES):
+        return False
+    return True
+
+
+def _iter_shard_boundaries(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Equivalente a _RE_SHARD_BOUNDARY.finditer(text), mas a busca parte do
+    literal '\n\r?\n' (o lookbehind inicial impede o sre de usar prefixo).
+    """
+    pos = 0
+    while True:
+        match = _RE_SHARD_BOUNDARY_PREFIX.search(text, pos)
+        if match is None:
+            return
+        run_start = match.start()
+        if run_start and text[run_start - 1] == '\r':
+            run_start -= 1
+        run_end = _RE_NEWLINE_RUN.match(text, match.end()).end()
+        pos = run_end
+        if (run_start and not text[run_start - 1].isspace()
+                and run_end < len(text) and not text[run_end].isspace()):
+            yield run_start, run_end
+
+
+def split_fastformat_shards(text: str, min_size: int = 0,
+                            preserve_markdown: bool = False) -> List[Tuple[str, int]]:
+    """
+    Divide o texto em fragmentos formatáveis de forma independente.
+
+    Args:
+        text: Texto completo
+        min_size: Agrupa parágrafos até o fragmento ter pelo menos esse
+            número de caracteres (0 = um fragmento por parágrafo)
+        preserve_markdown: Não corta dentro de cercas de código (``` ou ~~~)
+
+    Returns:
+        Lista de (fragmento, quebras): `quebras` é o número de quebras de
+        linha que separam o fragmento do seguinte (0 no último).
+    """
+    shards = []
+    start = 0
+    fences = [m.span() for m in _RE_MD_FENCE.finditer(text)] if preserve_markdown else []
+    fence = 0
+    for run_start, run_end in _iter_shard_boundaries(text):
+        while fence < len(fences) and fences[fence][1] <= run_start:
+            fence += 1
+        if fence < len(fences) and fences[fence][0] < run_start:
+            continue
+        if run_start - start < min_size:
+            continue
+        if not _is_safe_boundary(text[max(start, run_start - 3):run_start], text[run_end]):
+            continue
+        shards.append((text[start:run_start], text.count('\n', run_start, run_end)))
+        start = run_end
+    shards.append((text[start:], 0))
+    return shards
+
+
+class ShardFormatter:
+    """Formata fragmentos produzidos por split_fastformat_shards."""
+
+    def __init__(self, options: FastFormatOptions):
+        self.options = options
+        self.last_program = compile_fastformat(options)
+        self.inner_program = compile_fastformat(replace(options, ensure_final_newline=False))
+        self.collapse = options.normalize_whitespace and options.collapse_blank_lines
+        self.preserve_markdown = options.preserve_markdown
+
+    def format(self, shard: str, last: bool) -> str:
+        program = self.last_program if last else self.inner_program
+        return program.apply(shard)
+
+    def separator(self, breaks: int) -> str:
+        if self.collapse and breaks >= 3:
+            return "\n\n"
+        return "\n" * breaks
+
+
+def _iter_lines(source: Iterable[str]) -> Iterator[str]:
+    # Reparte pedaços arbitrários em linhas terminadas em "\n"
+    partial = []
+    for chunk in source:
+        start = 0
+        while True:
+            i = chunk.find("\n", start)
+            if i == -1:
+                break
+            partial.append(chunk[start:i + 1])
+            yield "".join(partial)
+            partial = []
+            start = i + 1
+        if start < len(chunk):
+            partial.append(chunk[start:])
+    if partial:
+        yield "".join(partial)
+
+
+def iter_fastformat(source: Iterable[str], options: FastFormatOptions,
+                    chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Formata um texto lido aos poucos, parágrafo a parágrafo.
+
+    Args:
+        source: Arquivo aberto em modo texto ou iterável de pedaços (str).
+            Uma str isolada é tratada como um único pedaço.
+        options: Opções do FastFormat
+        chunk_size: Tamanho aproximado (caracteres) de cada bloco de
+            parágrafos formatado de uma vez
+
+    Yields:
+        Pedaços formatados; "".join(...) é idêntico a apply_fastformat()
+        sobre o texto completo. A memória fica limitada a ~chunk_size mais
+        o maior parágrafo, independentemente do tamanho da entrada.
+    """
+    if isinstance(source, str):
+        source = [source]
+    formatter = ShardFormatter(options)
+    shard: List[str] = []   # linhas do bloco atual
+    size = 0
+    blank: List[str] = []   # linhas vazias pendentes após o bloco
+    fence = None            # cerca de código aberta (preserve_markdown)
+
+    for line in _iter_lines(source):
+        if shard and (line == "\n" or line == "\r\n"):
+            blank.append(line)
+            continue
+        if blank:
+            prev = shard[-1]
+            body = prev[:-2] if prev.endswith("\r\n") else prev[:-1]
+            if size >= chunk_size and fence is None and body and not body[-1].isspace() \
+                    and not line[0].isspace() and _is_safe_boundary(body[-3:], line[0]):
+                shard[-1] = body
+                yield formatter.format("".join(shard), last=False) + formatter.separator(len(blank) + 1)
+                shard = []
+                size = 0
+            else:
+                shard.extend(blank)
+            blank = []
+        shard.append(line)
+        size += len(line)
+        if formatter.preserve_markdown:
+            fence = _next_fence(line, fence)
+
+    rest = formatter.format("".join(shard + blank), last=True)
+    if rest:
+        yield rest
+
+
+# Processo de trabalho: cada worker compila o programa uma única vez
+_worker_formatter: Optional[ShardFormatter] = None
+
+
+def _init_parallel_worker(options: FastFormatOptions):
+    global _worker_formatter
+    _worker_formatter = ShardFormatter(options)
+    # Ganchos herdados do processo pai (fork) não valem no worker
+    _PROFILE_HOOKS.clear()
+
+
+def _format_shard_in_worker(shard: str, last: bool) -> str:
+    return _worker_formatter.format(shard, last)
+
+
+def _profile_shard_in_worker(shard: str, last: bool) -> Tuple[str, Dict[str, list]]:
+    program = _worker_formatter.last_program if last else _worker_formatter.inner_program
+    return program.profile(shard)
+
+
+def apply_fastformat_parallel(text: str, options: FastFormatOptions, max_workers: Optional[int] = None,
+                              min_parallel_size: int = 256 * 1024) -> str:
+    """
+    Formata o texto em paralelo, um bloco de parágrafos por processo.
+
+    Args:
+        text: Texto completo
+        options: Opções do FastFormat
+        max_workers: Número de processos (padrão: número de CPUs)
+        min_parallel_size: Abaixo desse tamanho o custo de iniciar processos
+            não compensa e o texto é formatado no processo atual
+
+    Returns:
+        Texto formatado, idêntico a apply_fastformat(text, options)
+    """
+    if not isinstance(text, str):
+        return text
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(text) < min_parallel_size:
+        return compile_fastformat(options).apply(text)
+
+    # Alguns blocos por worker equilibram parágrafos de tamanhos diferentes
+    shards = split_fastformat_shards(text, min_size=max(1, len(text) // (workers * 4)),
+                                     preserve_markdown=options.preserve_markdown)
+    if len(shards) == 1:
+        return compile_fastformat(options).apply(text)
+
+    formatter = ShardFormatter(options)
+    lasts = [False] * (len(shards) - 1) + [True]
+    profiling = bool(_PROFILE_HOOKS)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards)),
+                             initializer=_init_parallel_worker, initargs=(options,)) as executor:
+        worker = _profile_shard_in_worker if profiling else _format_shard_in_worker
+        formatted = list(executor.map(worker, [shard for shard, _ in shards], lasts))
+
+    if profiling:
+        # Uma chamada de gancho por regra, somando os blocos
+        records: Dict[str, list] = {}
+        for _, shard_records in formatted:
+            _merge_profile(records, shard_records)
+        _emit_profile(records)
+        formatted = [out for out, _ in formatted]
+
+    return "".join(out + formatter.separator(breaks) for out, (_, breaks) in zip(formatted, shards))
+
+
+class IncrementalFastFormatter:
+    """
+    Formatador incremental para sessões de edição.
+
+    Guarda o resultado de cada parágrafo em um cache LRU indexado pelo hash
+    do conteúdo; a cada chamada só os parágrafos novos ou alterados são
+    reformatados. O resultado é idêntico a apply_fastformat(text, options).
+
+    As remoções acontecem só no fim de cada chamada e nunca atingem os
+    parágrafos usados nela: um texto com mais parágrafos que max_entries
+    mantém todos em cache (o limite efetivo cresce até o número de
+    parágrafos da chamada), e a edição seguinte continua reaproveitando-os.
+    """
+
+    def __init__(self, options: FastFormatOptions, max_entries: int = 8192):
+        self.options = options
+        self.max_entries = max_entries
+        self._formatter = ShardFormatter(options)
+        # Valor: texto formatado ou (texto, alterações, contagem por regra)
+        self._cache: "OrderedDict[Tuple[bytes, bool], Any]" = OrderedDict()
+        self._separator_edits: Dict[str, Tuple[List[FastFormatEdit], Dict[str, int]]] = {}
+        # Posição de cada regra no programa, para nomear alterações unidas
+        self._rule_order: Dict[str, int] = {}
+        for step in self._formatter.last_program.steps:
+            self._rule_order.setdefault(step.rule, len(self._rule_order))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def format(self, text: str) -> str:
+        if not isinstance(text, str):
+            return text
+        out = []
+        shards = 0
+        for shard, breaks in split_fastformat_shards(text, preserve_markdown=self.options.preserve_markdown):
+            out.append(self._format_shard(shard, last=breaks == 0))
+            out.append(self._formatter.separator(breaks))
+            shards += 1
+        self._evict(max(self.max_entries, shards))
+        return "".join(out)
+
+    def _evict(self, limit: int):
+        # As entradas usadas nesta chamada estão no fim da ordem LRU; com
+        # limit >= parágrafos da chamada, só saem as de versões anteriores
+        while len(self._cache) > limit:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def format_with_edits(self, text: str) -> "FastFormatChanges":
+        """
+        Como format(), registrando também as alterações, na mesma passada.
+
+        Parágrafos em cache trazem as alterações registradas quando foram
+        formatados, deslocadas para a posição atual; só parágrafos novos,
+        alterados ou formatados antes sem registro passam pelo programa.
+        O texto, os trechos e a contagem por regra são os de
+        apply_fastformat_with_edits; só o nome de uma alteração que une
+        regras através de uma quebra de parágrafo pode listá-las em outra
+        ordem.
+        """
+        out = []
+        edits: List[FastFormatEdit] = []
+        rule_counts: Dict[str, int] = {}
+        offset = 0
+        shards = 0
+        for shard, breaks in split_fastformat_shards(text, preserve_markdown=self.options.preserve_markdown):
+            result, shard_edits, counts = self._format_shard(shard, last=breaks == 0, record=True)
+            out.append(result)
+            _extend_edits(edits, shard_edits, offset, self._rule_order)
+            for rule, count in counts.items():
+                rule_counts[rule] = rule_counts.get(rule, 0) + count
+            offset += len(shard)
+            shards += 1
+            if not breaks:
+                continue
+
+            run_end = _RE_NEWLINE_RUN.match(text, offset).end()
+            run = text[offset:run_end]
+            separator = self._formatter.separator(breaks)
+            out.append(separator)
+            if run != separator:
+                run_edits, counts = self._edits_for_separator(run)
+                _extend_edits(edits, run_edits, offset, self._rule_order)
+                for rule, count in counts.items():
+                    rule_counts[rule] = rule_counts.get(rule, 0) + count
+            offset = run_end
+        self._evict(max(self.max_entries, shards))
+        return FastFormatChanges(text, "".join(out), edits, rule_counts)
+
+    def _edits_for_separator(self, run: str) -> Tuple[List["FastFormatEdit"], Dict[str, int]]:
+        # Quebras entre parágrafos alteradas (linhas em branco recolhidas,
+        # "\r"): as regras vêm do próprio programa, entre dois caracteres neutros
+        cached = self._separator_edits.get(run)
+        if cached is None:
+            changes = self._formatter.inner_program.apply_with_edits("a" + run + "a")
+            edits = [replace(edit, offset=edit.offset - 1) for edit in changes.edits]
+            cached = self._separator_edits[run] = (edits, changes.rule_counts)
+        return cached
+
+    def _format_shard(self, shard: str, last: bool, record: bool = False):
+        key = (hashlib.blake2b(shard.encode('utf-8', 'surrogatepass'), digest_size=16).digest(), last)
+        cached = self._cache.get(key)
+        if cached is not None and (not record or isinstance(cached, tuple)):
+            self._cache.move_to_end(key)
+            self.hits += 1
+            if record:
+                return cached
+            return cached[0] if isinstance(cached, tuple) else cached
+
+        self.misses += 1
+        if not record:
+            result = self._formatter.format(shard, last)
+            self._cache[key] = result
+            return result
+        program = self._formatter.last_program if last else self._formatter.inner_program
+        changes = program.apply_with_edits(shard)
+        entry = (changes.text, changes.edits, changes.rule_counts)
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        return entry
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+# ---------------------------------------------------------------------------
+# Registro de alterações
+# ---------------------------------------------------------------------------
+# Em vez de comparar o texto antes/depois com difflib, o motor compilado
+# anota o que cada passo trocou e compõe essas trocas em coordenadas do
+# texto original. Trocas de regras diferentes que se sobrepõem (ex.: "..."
+# vira "…" e depois " …") viram uma única alteração com as regras unidas
+# por "+". A contagem por regra soma as trocas de cada passo.
+
+@dataclass(frozen=True)
+class FastFormatEdit:
+    offset: int     # posição no texto original
+    old: str        # trecho original substituído
+    new: str        # texto que o substitui na saída
+    rule: str       # regra(s) responsável(is), ex.: "normalize_ellipsis"
+
+    @property
+    def end(self) -> int:
+        return self.offset + len(self.old)
+
+
+@dataclass
+class FastFormatChanges:
+    original: str
+    text: str                               # igual a apply_fastformat(original, options)
+    edits: List[FastFormatEdit] = field(default_factory=list)
+    rule_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def _extend_edits(edits: List[FastFormatEdit], new_edits: List[FastFormatEdit], offset: int,
+                  rule_order: Dict[str, int]):
+    """
+    Acrescenta alterações de um trecho que começa em `offset`. Alterações
+    encostadas na anterior viram uma só, como em _compose_edits, com as
+    regras na ordem em que o programa as aplica.
+    """
+    for edit in new_edits:
+        start = edit.offset + offset
+        if edits and edits[-1].end == start:
+            previous = edits.pop()
+            rules = previous.rule.split("+")
+            rules += [rule for rule in edit.rule.split("+") if rule not in rules]
+            rules.sort(key=lambda rule: rule_order.get(rule, len(rule_order)))
+            edits.append(FastFormatEdit(previous.offset, previous.old + edit.old,
+                                        previous.new + edit.new, "+".join(rules)))
+        else:
+            edits.append(replace(edit, offset=start))
+
+
+def _trim_edit(text: str, start: int, end: int, new: str) -> Tuple[int, int, str]:
+    # Remove prefixo/sufixo comuns: "\s*\(\s*" -> " (" sobre " ( " só apaga um espaço
+    old_len = end - start
+    limit = min(old_len, len(new))
+    prefix = 0
+    while prefix < limit and text[start + prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and text[end - 1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return start + prefix, end - suffix, new[prefix:len(new) - suffix]
+
+
+def _compose_edits(composed: List[list], edits: List[Tuple[int, int, str]], text: str, rule: str) -> List[list]:
+    """
+    Compõe as alterações de um passo (em coordenadas de `text`, a entrada
+    do passo) com as já acumuladas ([início, fim, novo, regras] em
+    coordenadas do original, ordenadas e disjuntas).
+    """
+    def touches(c_start, c_end, a, b):
+        # Sobreposição ou contato: alterações encostadas viram uma só
+        return c_start <= b and a <= c_end
+
+    out: List[list] = []
+    # delta[i]: posição atual - posição original antes de composed[i];
+    # ends[i]: fim de composed[i] no texto atual
+    delta = list(accumulate((len(c[2]) - (c[1] - c[0]) for c in composed), initial=0))
+    ends = [c[1] + d for c, d in zip(composed, delta[1:])]
+    i = 0
+    k = 0
+    n = len(composed)
+    m = len(edits)
+    while k < m:
+        a, b, _ = edits[k]
+        # Copia de uma vez as acumuladas que terminam antes desta alteração
+        j = bisect.bisect_left(ends, a, i)
+        out.extend(composed[i:j])
+        i = j
+
+        # Grupo: a alteração do passo e tudo que se sobrepõe a ela em cadeia
+        group_edits = [edits[k]]
+        k += 1
+        delta_before = delta[i]
+        lo, hi = a, b
+        rules: Tuple[str, ...] = ()
+        last_c = None           # (início, fim) atuais da última acumulada do grupo
+        while True:
+            last_a, last_b, _ = group_edits[-1]
+            if i < n:
+                c = composed[i]
+                c_start = c[0] + delta[i]
+                c_end = ends[i]
+                if touches(c_start, c_end, last_a, last_b):
+                    lo = min(lo, c_start)
+                    hi = max(hi, c_end)
+                    rules += tuple(r for r in c[3] if r not in rules)
+                    last_c = (c_start, c_end)
+                    i += 1
+                    continue
+            if k < m and last_c is not None:
+                next_a, next_b, _ = edits[k]
+                if touches(last_c[0], last_c[1], next_a, next_b):
+                    group_edits.append(edits[k])
+                    hi = max(hi, next_b)
+                    k += 1
+                    continue
+            break
+
+        pieces = []
+        pos = lo
+        for e_start, e_end, new in group_edits:
+            pieces.append(text[pos:e_start])
+            pieces.append(new)
+            pos = e_end
+        pieces.append(text[pos:hi])
+        if rule not in rules:
+            rules += (rule,)
+        out.append([lo - delta_before, hi - delta[i], "".join(pieces), rules])
+
+    out.extend(composed[i:])
+    return out
+
+
+def apply_fastformat_with_edits(text: str, options: FastFormatOptions) -> FastFormatChanges:
+    """
+    Formata o texto e devolve também as alterações feitas, como trechos
+    (offset, old, new, rule) do texto original, e a contagem por regra.
+    """
+    return compile_fastformat(options).apply_with_edits(text)
+
+
+def _line_starts(text: str) -> List[int]:
+    # Início de cada linha, com as mesmas quebras de str.splitlines()
+    starts = [0]
+    for line in text.splitlines(keepends=True):
+        starts.append(starts[-1] + len(line))
+    return starts
+
+
+def _line_of(starts: List[int], pos: int) -> int:
+    return max(0, min(bisect.bisect_right(starts, pos) - 1, len(starts) - 2))
+
+
+def _apply_edits(text: str, edits: Iterable[FastFormatEdit], start: int, end: int) -> str:
+    pieces = []
+    pos = start
+    for edit in edits:
+        pieces.append(text[pos:edit.offset])
+        pieces.append(edit.new)
+        pos = edit.end
+    pieces.append(text[pos:end])
+    return "".join(pieces)
+
+
+def _is_unterminated(line: str) -> bool:
+    return len(line.splitlines()[0]) == len(line)
+
+
+def _format_diff_range(start: int, length: int) -> str:
+    # Mesmo formato do difflib.unified_diff
+    if length == 1:
+        return str(start + 1)
+    if not length:
+        start -= 1
+    return f"{start + 1},{length}"
+
+
+def make_edits_diff(original: str, edits: List[FastFormatEdit], fromfile: str = "antes.txt",
+                    tofile: str = "depois.txt", context_lines: int = 3) -> str:
+    """
+    Diff unificado montado a partir das alterações registradas, sem
+    comparar os textos inteiros.
+    """
+    starts = _line_starts(original)
+    line_count = len(starts) - 1
+    if not edits or not line_count:
+        return ""
+
+    # Blocos de linhas alteradas: (primeira, última, novas linhas)
+    blocks = []
+    i = 0
+    while i < len(edits):
+        first = _line_of(starts, edits[i].offset)
+        last = first
+        j = i
+        while True:
+            while j < len(edits) and _line_of(starts, edits[j].offset) <= last:
+                last = max(last, _line_of(starts, max(edits[j].offset, edits[j].end - 1)))
+                j += 1
+            new_text = _apply_edits(original, edits[i:j], starts[first], starts[last + 1])
+            if last + 1 < line_count and new_text and _is_unterminated(new_text.splitlines(keepends=True)[-1]):
+                # A alteração juntou a linha seguinte a esta
+                last += 1
+                continue
+            break
+        blocks.append((first, last, new_text.splitlines(keepends=True)))
+        i = j
+
+    out = [f"--- {fromfile}\n", f"+++ {tofile}\n"]
+    lines = original.splitlines(keepends=True)
+
+    def emit(prefix, line):
+        out.append(prefix + line)
+        if _is_unterminated(line):
+            out.append("\n\\ No newline at end of file\n")
+
+    line_delta = 0
+    b = 0
+    while b < len(blocks):
+        hunk_end = b + 1
+        while hunk_end < len(blocks) and blocks[hunk_end][0] - blocks[hunk_end - 1][1] - 1 <= 2 * context_lines:
+            hunk_end += 1
+        hunk = blocks[b:hunk_end]
+        old_start = max(0, hunk[0][0] - context_lines)
+        old_stop = min(line_count, hunk[-1][1] + 1 + context_lines)
+        hunk_delta = sum(len(new) - (last - first + 1) for first, last, new in hunk)
+        out.append(f"@@ -{_format_diff_range(old_start, old_stop - old_start)} "
+                   f"+{_format_diff_range(old_start + line_delta, old_stop - old_start + hunk_delta)} @@\n")
+        pos = old_start
+        for first, last, new in hunk:
+            for line in lines[pos:first]:
+                emit(" ", line)
+            for line in lines[first:last + 1]:
+                emit("-", line)
+            for line in new:
+                emit("+", line)
+            pos = last + 1
+        for line in lines[pos:old_stop]:
+            emit(" ", line)
+        line_delta += hunk_delta
+        b = hunk_end
+
+    return "".join(out)
+
+
+def describe_edits(original: str, edits: List[FastFormatEdit], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Alterações com linha e coluna (a partir de 1), para relatórios e prévias."""
+    starts = _line_starts(original)
+    rows = []
+    for edit in edits[:limit]:
+        line = _line_of(starts, edit.offset)
+        rows.append({
+            "line": line + 1,
+            "column": edit.offset - starts[line] + 1,
+            "rule": edit.rule,
+            "old": edit.old,
+            "new": edit.new,
+        })
+    return rows
+
+
 def make_unified_diff(a: str, b: str, fromfile: str = "antes.txt", tofile: str = "depois.txt") -> str:
     a_lines = a.splitlines(keepends=True)
     b_lines = b.splitlines(keepends=True)
     diff = difflib.unified_diff(a_lines, b_lines, fromfile=fromfile, tofile=tofile, lineterm="")
     return "".join(diff)
+
+
+# ---------------------------------------------------------------------------
+# Lote: python -m fastformat DIRETÓRIO
+# ---------------------------------------------------------------------------
+# Normaliza árvores inteiras de .md/.txt. Cada arquivo vai para um processo
+# do pool; o manifesto JSON guarda o hash do conteúdo deixado em cada
+# arquivo e, na execução seguinte (com as mesmas opções), os arquivos cujo
+# hash não mudou são pulados sem formatar. Arquivos alterados são gravados
+# de forma atômica (arquivo temporário no mesmo diretório + os.replace).
+
+FASTFORMAT_BATCH_SUFFIXES = (".md", ".txt")
+FASTFORMAT_MANIFEST_NAME = ".fastformat-manifest.json"
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def iter_batch_files(root: str, suffixes: Iterable[str] = FASTFORMAT_BATCH_SUFFIXES) -> List[str]:
+    """Caminhos relativos (com "/") dos arquivos de `root` com essas extensões, em ordem."""
+    suffixes = tuple(s.lower() for s in suffixes)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in filenames:
+            if not name.startswith(".") and name.lower().endswith(suffixes):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/"))
+    return sorted(found)
+
+
+def write_atomic(path: str, data: bytes):
+    """Grava `data` em `path` sem deixar o arquivo pela metade se o processo cair."""
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        else:
+            # mkstemp cria com 0600; arquivo novo segue a umask como open()
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _format_batch_file(path: str, options: FastFormatOptions, known_hash: Optional[str],
+                       dry_run: bool) -> Dict[str, Any]:
+    # Executado nos workers: lê, pula se o hash bate com o manifesto, formata e grava
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = _content_hash(data)
+        if digest == known_hash:
+            return {"status": "skipped", "hash": digest, "seconds": round(time.perf_counter() - start, 6),
+                    "changes": 0, "rules": {}}
+        changes = compile_fastformat(options).apply_with_edits(data.decode("utf-8"))
+        status = "unchanged"
+        if changes.edits:
+            status = "formatted"
+            output = changes.text.encode("utf-8")
+            if not dry_run:
+                write_atomic(path, output)
+            digest = _content_hash(output)
+        return {"status": status, "hash": digest, "seconds": round(time.perf_counter() - start, 6),
+                "changes": len(changes.edits), "rules": changes.rule_counts}
+    except (OSError, UnicodeDecodeError) as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}",
+                "seconds": round(time.perf_counter() - start, 6), "changes": 0, "rules": {}}
+
+
+def load_batch_manifest(path: str) -> Dict[str, Any]:
+    """Manifesto de uma execução anterior ({} se não existir ou estiver corrompido)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def format_tree(root: str, options: FastFormatOptions, max_workers: Optional[int] = None,
+                manifest_path: Optional[str] = None, suffixes: Iterable[str] = FASTFORMAT_BATCH_SUFFIXES,
+                dry_run: bool = False, force: bool = False) -> Dict[str, Any]:
+    """
+    Formata todos os arquivos .md/.txt de uma árvore de diretórios.
+
+    Args:
+        root: Diretório raiz
+        options: Opções do FastFormat
+        max_workers: Número de processos (padrão: número de CPUs)
+        manifest_path: Manifesto JSON (padrão: FASTFORMAT_MANIFEST_NAME na raiz)
+        suffixes: Extensões consideradas
+        dry_run: Não grava arquivos nem o manifesto
+        force: Ignora o manifesto anterior e formata tudo
+
+    Returns:
+        Manifesto: opções, resumo e, por arquivo (caminho relativo), status
+        ("formatted", "unchanged", "skipped" ou "error"), hash do conteúdo,
+        segundos e número de alterações por regra
+    """
+    started = time.perf_counter()
+    manifest_path = manifest_path or os.path.join(root, FASTFORMAT_MANIFEST_NAME)
+    options_dict = {f.name: getattr(options, f.name) for f in fields(options)}
+
+    previous = {} if force else load_batch_manifest(manifest_path)
+    known = previous.get("files", {}) if previous.get("options") == options_dict else {}
+
+    paths = iter_batch_files(root, suffixes)
+    args = (
+        [os.path.join(root, p) for p in paths],
+        [options] * len(paths),
+        [known.get(p, {}).get("hash") for p in paths],
+        [dry_run] * len(paths),
+    )
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        results = list(map(_format_batch_file, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_format_batch_file, *args,
+                                        chunksize=max(1, len(paths) // (workers * 4))))
+
+    files = dict(zip(paths, results))
+    summary = {status: 0 for status in ("formatted", "unchanged", "skipped", "error")}
+    for result in results:
+        summary[result["status"]] += 1
+    summary.update({
+        "files": len(paths),
+        "changes": sum(r["changes"] for r in results),
+        "seconds": round(time.perf_counter() - started, 3),
+    })
+    manifest = {"root": os.path.abspath(root), "options": options_dict, "summary": summary, "files": files}
+    if not dry_run:
+        write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    return manifest
+
+
+def _parse_option_value(name: str, value: str) -> Any:
+    # "--set campo=valor" para os campos de FastFormatOptions
+    kinds = {f.name: f.type for f in fields(FastFormatOptions)}
+    if name not in kinds:
+        raise ValueError(f"opção desconhecida: {name} (use {', '.join(kinds)})")
+    if kinds[name] in (bool, "bool"):
+        lowered = value.strip().lower()
+        if lowered in ("1", "true", "yes", "sim", "on"):
+            return True
+        if lowered in ("0", "false", "no", "nao", "não", "off"):
+            return False
+        raise ValueError(f"{name} espera true/false, recebeu {value!r}")
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Linha de comando: python -m fastformat DIRETÓRIO [opções]."""
+    parser = argparse.ArgumentParser(
+        prog="python -m fastformat",
+        description="Normaliza em lote os arquivos .md/.txt de um diretório com o FastFormat")
+    parser.add_argument("root", help="Diretório raiz")
+    parser.add_argument("--preset", choices=("ptbr", "academic"), default="ptbr",
+                        help="Opções de partida (padrão: ptbr)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="CAMPO=VALOR",
+                        help="Ajusta um campo de FastFormatOptions (pode repetir)")
+    parser.add_argument("--workers", type=int, help="Número de processos (padrão: número de CPUs)")
+    parser.add_argument("--manifest", help=f"Manifesto JSON (padrão: RAIZ/{FASTFORMAT_MANIFEST_NAME})")
+    parser.add_argument("--ext", default=",".join(FASTFORMAT_BATCH_SUFFIXES),
+                        help="Extensões separadas por vírgula (padrão: .md,.txt)")
+    parser.add_argument("--dry-run", action="store_true", help="Só relata; não grava arquivos nem manifesto")
+    parser.add_argument("--force", action="store_true", help="Ignora o manifesto e formata todos os arquivos")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"diretório não encontrado: {args.root}")
+    if args.preset == "academic":
+        from modules.fastformat_utils import get_academic_options
+        options = get_academic_options()
+    else:
+        options = FastFormatOptions()
+    try:
+        overrides = {}
+        for item in args.overrides:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise ValueError(f"use CAMPO=VALOR, recebeu {item!r}")
+            overrides[name.strip()] = _parse_option_value(name.strip(), value)
+    except ValueError as e:
+        parser.error(str(e))
+    options = replace(options, **overrides)
+    suffixes = [s if s.startswith(".") else "." + s for s in (x.strip() for x in args.ext.split(",")) if s]
+
+    manifest = format_tree(args.root, options, max_workers=args.workers, manifest_path=args.manifest,
+                           suffixes=suffixes, dry_run=args.dry_run, force=args.force)
+    for path, result in manifest["files"].items():
+        if result["status"] == "error":
+            print(f"❌ {path}: {result['error']}", file=sys.stderr)
+        elif result["status"] == "formatted":
+            print(f"✏️  {path}: {result['changes']} alterações")
+    summary = manifest["summary"]
+    print(f"✅ {summary['files']} arquivos em {summary['seconds']:.2f}s: {summary['formatted']} formatados, "
+          f"{summary['unchanged']} já normalizados, {summary['skipped']} pulados pelo manifesto, "
+          f"{summary['error']} erros" + (" (simulação)" if args.dry_run else ""))
+    return 1 if summary["error"] else 0
+
+
+if __name__ == "__main__":
+    # Reimporta como "fastformat" para os workers encontrarem as funções
+    # pelo nome do módulo (e não por __main__)
+    from fastformat import main as _main
+    sys.exit(_main())
@@ -19,8 +19,10 @@ from modules.utils import (
     print_banner, print_info, print_success, print_error,
     ProgressTracker, setup_logging
 )
+from modules.analysis_cache import AnalysisCache
 from modules.analyzer import ManuscriptAnalyzer
 from modules.enhancer import ContentEnhancer
+from modules.llm_cache import LLMResponseCache
 from modules.formatter import DocumentFormatter
 from modules.elements import ElementsGenerator
 from modules.reviewer import EditorialReviewer
@@ -144,10 +146,13 @@ class ManuscriptPublisher:
             print_info("FASE 5/7: Revisão Editorial Profissional")
             tracker.start_phase("REVIEW")
             
+            # Sem mudanças no texto, o revisor reaproveita os comprimentos da análise
+            unchanged = enhanced_content["content"] == analysis_result["content"]
             review_result = self.reviewer.review(
                 enhanced_content,
                 elements,
-                analysis_result["metadata"]
+                analysis_result["metadata"],
+                lengths=analysis_result["lengths"] if unchanged else None
             )
             
             # Salva relatório de revisão
@@ -315,6 +320,8 @@ Exemplos de uso:
   python main.py manuscrito.pdf -o output/
   python main.py manuscrito.docx -o output/ -c configs/academic.yaml
   python main.py --interactive
+  python main.py manuscrito.md --no-cache
+  python main.py --clear-cache
         """
     )
     
@@ -347,6 +354,18 @@ Exemplos de uso:
         help="Modo verbose (mais detalhes)"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignora os caches de análises e de respostas da IA (não lê nem grava)"
+    )
+    
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Limpa os caches de análises e de respostas da IA antes de processar"
+    )
+    
     args = parser.parse_args()
     
     # Configura logging
@@ -360,17 +379,29 @@ Exemplos de uso:
         interactive.run()
         return
     
-    # Modo linha de comando
-    if not args.input:
-        parser.print_help()
-        sys.exit(1)
-    
     # Carrega configuração
     if args.config:
         config = load_config(args.config)
     else:
         config = Config()
     
+    if args.clear_cache:
+        removed = AnalysisCache(config.cache_dir).clear()
+        print_info(f"Cache de análises limpo: {removed} entrada(s) removida(s)")
+        removed = LLMResponseCache(config.cache_dir).clear()
+        print_info(f"Cache de respostas da IA limpo: {removed} entrada(s) removida(s)")
+        if not args.input:
+            return
+    
+    if args.no_cache:
+        config.analysis_cache = False
+        config.llm_cache = False
+    
+    # Modo linha de comando
+    if not args.input:
+        parser.print_help()
+        sys.exit(1)
+    
     # Processa manuscrito
     publisher = ManuscriptPublisher(config)
     results = publisher.process_manuscript(args.input, args.output)
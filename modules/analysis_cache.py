@@ -0,0 +1,152 @@
+"""
+Módulo de Cache de Análises
+Guarda resultados do analisador em disco, endereçados pelo conteúdo do arquivo.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .utils import calculate_file_hash
+
+
+class AnalysisCache:
+    """
+    Cache persistente de análises de manuscritos.
+
+    Cada entrada é um JSON em ``<cache_dir>/analysis`` cujo nome é o hash da
+    chave (conteúdo do arquivo + versão do analisador + configuração
+    relevante). O mtime de cada entrada marca o último uso; ao passar de
+    ``max_bytes``, as entradas menos usadas recentemente são removidas.
+    """
+
+    SUBDIR = "analysis"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(cache_dir) / self.SUBDIR
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+
+    def key_for(self, file_path: str, fingerprint: Dict) -> str:
+        """
+        Calcula a chave de cache de um arquivo.
+
+        Args:
+            file_path: Caminho do manuscrito
+            fingerprint: Versão do analisador e campos de configuração que
+                afetam o resultado
+
+        Returns:
+            Chave em hexadecimal
+        """
+        payload = json.dumps(
+            {"file": calculate_file_hash(file_path), **fingerprint},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Recupera uma análise e marca a entrada como usada.
+
+        Args:
+            key: Chave retornada por ``key_for``
+
+        Returns:
+            Resultado da análise ou None se ausente/corrompido
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Entrada de cache inválida descartada ({path.name}): {e}")
+            self._unlink(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict):
+        """
+        Grava uma análise (escrita atômica) e aplica o limite de tamanho.
+
+        Args:
+            key: Chave retornada por ``key_for``
+            result: Resultado serializável em JSON
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._unlink(Path(tmp_path))
+            raise
+        self.evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.name.endswith(".json") and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
+
+    def evict(self) -> int:
+        """
+        Remove as entradas menos usadas até caber em ``max_bytes``.
+
+        Returns:
+            Número de entradas removidas
+        """
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._unlink(Path(path))
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove todas as entradas do cache.
+
+        Returns:
+            Número de entradas removidas
+        """
+        removed = 0
+        for entry in self._entries():
+            self._unlink(Path(entry.path))
+            removed += 1
+        return removed
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
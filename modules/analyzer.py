@@ -4,43 +4,85 @@ Realiza análise completa da estrutura e conteúdo do manuscrito.
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 import logging
 
+from .analysis_cache import AnalysisCache
 from .config import Config
-from .utils import count_words, estimate_pages, print_info, print_warning
+from .document_model import ELEMENT_PATTERNS, DocumentModel, TextIndex, find_headings
+from .extractors import extract_docx_text, extract_pdf_text
+from .length_stats import LengthStats, mean
+from .mapped_manuscript import MappedManuscript
+from .references import reference_index
+from .terminology import load_terminology, term_matcher
+from .utils import estimate_pages, print_info, print_warning
+
+# Incrementar sempre que uma mudança no analisador alterar os resultados,
+# para invalidar as análises guardadas em cache.
+ANALYZER_VERSION = "2.5"
 
 class ManuscriptAnalyzer:
     """Analisa manuscritos e identifica estrutura e oportunidades de melhoria."""
     
+    # Campos de Config que influenciam o resultado da análise
+    CACHE_CONFIG_FIELDS: Tuple[str, ...] = ()
+    
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.terminology = load_terminology(config.terminology_file)
+        self.cache = None
+        if config.analysis_cache:
+            self.cache = AnalysisCache(
+                config.cache_dir,
+                max_bytes=config.analysis_cache_max_mb * 1024 * 1024,
+            )
     
     def analyze(self, file_path: str) -> Dict:
         """
         Analisa um manuscrito completo.
         
+        Resultados ficam em cache por conteúdo do arquivo; uma nova análise
+        do mesmo arquivo, com a mesma versão e configuração, é lida do disco.
+        
         Args:
             file_path: Caminho do arquivo do manuscrito
             
         Returns:
             Dicionário com resultados da análise
         """
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = self.cache.key_for(file_path, self._cache_fingerprint(file_path))
+                cached = self.cache.get(cache_key)
+            except OSError as e:
+                self.logger.warning(f"Cache de análise indisponível: {e}")
+                cache_key = cached = None
+            if cached is not None:
+                cached["file_path"] = file_path
+                cached["lengths"] = LengthStats.from_dict(cached["lengths"])
+                print_info(f"Análise recuperada do cache: {cached['word_count']} palavras, ~{cached['page_count']} páginas")
+                return cached
+        
         print_info("Iniciando análise do manuscrito...")
         
         # Extrai conteúdo baseado no tipo de arquivo
         content = self._extract_content(file_path)
         
+        # Tokeniza uma única vez; as análises abaixo leem do mesmo modelo
+        document = self._build_document(content)
+        
         # Análise estrutural
-        structure = self._analyze_structure(content)
+        structure = self._analyze_structure(content, document)
         
         # Análise de conteúdo
-        content_analysis = self._analyze_content(content)
+        lengths = LengthStats.from_document(document)
+        content_analysis = self._analyze_content(content, document, lengths)
         
         # Análise de qualidade
-        quality = self._analyze_quality(content)
+        quality = self._analyze_quality(content, document)
         
         # Metadados
         metadata = self._extract_metadata(content, file_path)
@@ -52,14 +94,41 @@ class ManuscriptAnalyzer:
             "content_analysis": content_analysis,
             "quality": quality,
             "metadata": metadata,
-            "word_count": count_words(content),
-            "page_count": estimate_pages(count_words(content))
+            "word_count": document.word_count,
+            "page_count": estimate_pages(document.word_count),
+            # Comprimentos de parágrafos e sentenças, reaproveitados pelo revisor
+            "lengths": lengths
         }
         
         print_info(f"Análise concluída: {result['word_count']} palavras, ~{result['page_count']} páginas")
         
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, {**result, "lengths": lengths.to_dict()})
+            except (OSError, TypeError, ValueError) as e:
+                self.logger.warning(f"Não foi possível gravar a análise em cache: {e}")
+        
         return result
     
+    def _build_document(self, content: str) -> DocumentModel:
+        """
+        Tokeniza o manuscrito, dividido por capítulos entre processos quando
+        ``parallel_processing`` está ativo (até ``max_workers`` processos).
+        """
+        if self.config.parallel_processing:
+            return DocumentModel(content, max_workers=self.config.max_workers)
+        return DocumentModel(content)
+    
+    def _cache_fingerprint(self, file_path: str) -> Dict:
+        """Partes da chave de cache além do conteúdo do arquivo."""
+        return {
+            "analyzer_version": ANALYZER_VERSION,
+            # Nome e extensão definem o extrator e o título de fallback
+            "file_name": Path(file_path).name,
+            "config": {name: getattr(self.config, name) for name in self.CACHE_CONFIG_FIELDS},
+            "terminology": self.terminology.digest(),
+        }
+    
     def _extract_content(self, file_path: str) -> str:
         """Extrai conteúdo do arquivo baseado no tipo."""
         file_ext = Path(file_path).suffix.lower()
@@ -82,136 +151,118 @@ class ManuscriptAnalyzer:
             return f.read()
     
     def _extract_from_docx(self, file_path: str) -> str:
-        """Extrai conteúdo de arquivo DOCX."""
-        try:
-            from docx import Document
-            doc = Document(file_path)
-            return '\n\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
-        except ImportError:
-            print_warning("Biblioteca python-docx não instalada. Instale com: pip install python-docx")
-            return ""
+        """Extrai conteúdo de arquivo DOCX (títulos viram cabeçalhos Markdown)."""
+        return extract_docx_text(file_path)
     
     def _extract_from_pdf(self, file_path: str) -> str:
-        """Extrai conteúdo de arquivo PDF."""
+        """
+        Extrai conteúdo de arquivo PDF, com as páginas divididas entre processos.
+        
+        A análise precisa do texto completo (capítulos e tokenização cruzam
+        páginas), então a extração paralela reduz só o tempo total de leitura,
+        não o tempo até o primeiro resultado.
+        """
         try:
-            import PyPDF2
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                text = []
-                for page in pdf_reader.pages:
-                    text.append(page.extract_text())
-                return '\n\n'.join(text)
+            return extract_pdf_text(file_path, self.config.max_workers)
         except ImportError:
             print_warning("Biblioteca PyPDF2 não instalada. Instale com: pip install PyPDF2")
             return ""
     
-    def _analyze_structure(self, content: str) -> Dict:
-        """Analisa a estrutura do manuscrito."""
-        # Identifica capítulos
-        chapters = self._find_chapters(content)
+    def analyze_structure(self, file_path: str) -> Dict:
+        """
+        Analisa apenas a estrutura de um manuscrito.
         
-        # Identifica seções
-        sections = self._find_sections(content)
+        Arquivos .md/.txt são mapeados em memória: capítulos, seções e
+        elementos são localizados sem decodificar o corpo do texto.
         
-        # Identifica elementos especiais
-        figures = len(re.findall(r'!\[.*?\]\(.*?\)', content))  # Imagens em Markdown
-        tables = len(re.findall(r'\|.*\|', content))  # Tabelas
-        code_blocks = len(re.findall(r'```.*?```', content, re.DOTALL))
+        Args:
+            file_path: Caminho do arquivo do manuscrito
+            
+        Returns:
+            Dicionário no formato de ``analyze(...)["structure"]``
+        """
+        if Path(file_path).suffix.lower() in ('.md', '.txt'):
+            with MappedManuscript(file_path) as manuscript:
+                return self._analyze_structure(manuscript)
+        return self._analyze_structure(self._extract_content(file_path))
+    
+    def _analyze_structure(self, content: Union[str, MappedManuscript],
+                           document: Optional[DocumentModel] = None) -> Dict:
+        """Analisa a estrutura do manuscrito."""
+        if isinstance(content, MappedManuscript):
+            chapters = content.chapters
+            sections = content.sections
+            elements = content.count_elements()
+        else:
+            if document is None:
+                document = DocumentModel(content)
+            
+            # Identifica capítulos e seções
+            chapters = document.chapters
+            sections = document.sections
+            
+            # Identifica elementos especiais
+            elements = {key: len(re.findall(pattern, content, flags)) for key, pattern, flags in ELEMENT_PATTERNS}
         
         return {
             "chapters": chapters,
             "sections": sections,
             "chapter_count": len(chapters),
             "section_count": len(sections),
-            "figure_count": figures,
-            "table_count": tables,
-            "code_block_count": code_blocks
+            **elements
         }
     
-    def _find_chapters(self, content: str) -> List[Dict]:
-        """Encontra capítulos no manuscrito."""
-        chapters = []
-        
-        # Padrões para identificar capítulos
-        patterns = [
-            r'^#\s+(.+)$',  # Markdown H1
-            r'^CAPÍTULO\s+\d+[:\s]+(.+)$',  # CAPÍTULO 1: Título
-            r'^Capítulo\s+\d+[:\s]+(.+)$',  # Capítulo 1: Título
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, content, re.MULTILINE | re.IGNORECASE)
-            for match in matches:
-                chapters.append({
-                    "title": match.group(1).strip(),
-                    "position": match.start(),
-                    "level": 1
-                })
-        
-        # Remove duplicatas e ordena por posição
-        chapters = sorted(chapters, key=lambda x: x['position'])
-        unique_chapters = []
-        seen_positions = set()
-        
-        for chapter in chapters:
-            if chapter['position'] not in seen_positions:
-                unique_chapters.append(chapter)
-                seen_positions.add(chapter['position'])
-        
-        return unique_chapters
+    def _find_chapters(self, content: Union[str, MappedManuscript]) -> List[Dict]:
+        """Encontra capítulos no manuscrito (Markdown H1 e "Capítulo N: Título")."""
+        if isinstance(content, MappedManuscript):
+            return content.chapters
+        return [h.as_dict() for h in find_headings(content) if h.level == 1]
     
-    def _find_sections(self, content: str) -> List[Dict]:
-        """Encontra seções no manuscrito."""
-        sections = []
-        
-        # Padrões para identificar seções
-        patterns = [
-            (r'^##\s+(.+)$', 2),  # Markdown H2
-            (r'^###\s+(.+)$', 3),  # Markdown H3
-        ]
-        
-        for pattern, level in patterns:
-            matches = re.finditer(pattern, content, re.MULTILINE)
-            for match in matches:
-                sections.append({
-                    "title": match.group(1).strip(),
-                    "position": match.start(),
-                    "level": level
-                })
-        
-        return sorted(sections, key=lambda x: x['position'])
+    def _find_sections(self, content: Union[str, MappedManuscript]) -> List[Dict]:
+        """Encontra seções no manuscrito (Markdown H2 e H3)."""
+        if isinstance(content, MappedManuscript):
+            return content.sections
+        return [h.as_dict() for h in find_headings(content) if h.level > 1]
     
-    def _analyze_content(self, content: str) -> Dict:
+    def _analyze_content(self, content: str, document: Optional[DocumentModel] = None,
+                         lengths: Optional[LengthStats] = None) -> Dict:
         """Analisa o conteúdo do manuscrito."""
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+        if document is None:
+            document = DocumentModel(content)
+        if lengths is None:
+            lengths = LengthStats.from_document(document)
         
-        # Análise de parágrafos
-        para_lengths = [len(p.split()) for p in paragraphs]
-        avg_para_length = sum(para_lengths) / len(para_lengths) if para_lengths else 0
-        
-        # Análise de sentenças
-        sentences = re.split(r'[.!?]+', content)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        sent_lengths = [len(s.split()) for s in sentences]
-        avg_sent_length = sum(sent_lengths) / len(sent_lengths) if sent_lengths else 0
+        # Análise de parágrafos e sentenças
+        avg_para_length = mean(lengths.paragraph_lengths)
+        avg_sent_length = mean(lengths.sentence_lengths)
         
         # Identifica casos clínicos (para manuscritos acadêmicos)
-        clinical_cases = self._find_clinical_cases(content)
+        clinical_cases = self._find_clinical_cases(content, document.text_index)
         
-        # Identifica referências
-        references = self._find_references(content)
+        # Identifica referências e citações
+        references = reference_index(content)
+        unmatched = references.cross_check()["unmatched_citations"]
         
         return {
-            "paragraph_count": len(paragraphs),
+            "paragraph_count": document.paragraph_count,
             "avg_paragraph_length": round(avg_para_length, 1),
-            "sentence_count": len(sentences),
+            "sentence_count": document.sentence_count,
             "avg_sentence_length": round(avg_sent_length, 1),
+            "length_distribution": lengths.summary(),
+            "chapter_lengths": lengths.chapter_breakdown(),
             "clinical_cases": clinical_cases,
-            "reference_count": len(references)
+            "reference_count": len(references.complete_entries()),
+            "citation_count": len(references.citations),
+            "unmatched_citations": [
+                {"citation": f"({c.author}, {c.year})", "location": document.text_index.locate(c.position).as_dict()}
+                for c in unmatched
+            ]
         }
     
-    def _find_clinical_cases(self, content: str) -> List[Dict]:
+    def _find_clinical_cases(self, content: str, index: Optional[TextIndex] = None) -> List[Dict]:
         """Encontra casos clínicos no manuscrito."""
+        if index is None:
+            index = TextIndex(content)
         cases = []
         
         patterns = [
@@ -225,49 +276,26 @@ class ManuscriptAnalyzer:
             for match in matches:
                 cases.append({
                     "position": match.start(),
-                    "marker": match.group(0)
+                    "marker": match.group(0),
+                    "location": index.locate(match.start()).as_dict()
                 })
         
         return cases
     
-    def _find_references(self, content: str) -> List[str]:
-        """Encontra referências bibliográficas."""
-        references = []
-        
-        # Procura por seção de referências
-        ref_section_match = re.search(
-            r'(REFERÊNCIAS|BIBLIOGRAFIA|REFERENCES).*$',
-            content,
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        if ref_section_match:
-            ref_text = ref_section_match.group(0)
-            # Divide em linhas e filtra referências
-            ref_lines = [line.strip() for line in ref_text.split('\n') if line.strip()]
-            references = [line for line in ref_lines if self._is_reference_line(line)]
-        
-        return references
-    
-    def _is_reference_line(self, line: str) -> bool:
-        """Verifica se uma linha parece ser uma referência."""
-        # Heurística simples: linha contém ano entre parênteses e ponto final
-        return bool(re.search(r'\(\d{4}\)', line) and line.endswith('.'))
-    
-    def _analyze_quality(self, content: str) -> Dict:
+    def _analyze_quality(self, content: str, document: Optional[DocumentModel] = None) -> Dict:
         """Analisa qualidade do manuscrito."""
-        # Análise de legibilidade (Flesch Reading Ease simplificado)
-        words = content.split()
-        sentences = re.split(r'[.!?]+', content)
-        sentences = [s for s in sentences if s.strip()]
+        if document is None:
+            document = DocumentModel(content)
         
-        avg_words_per_sentence = len(words) / len(sentences) if sentences else 0
+        # Análise de legibilidade (Flesch Reading Ease simplificado)
+        sentence_count = document.sentence_count
+        avg_words_per_sentence = document.word_count / sentence_count if sentence_count else 0
         
         # Análise de consistência terminológica
-        term_consistency = self._check_term_consistency(content)
+        term_consistency = self._check_term_consistency(content, document.text_index)
         
         # Análise de formatação
-        formatting = self._check_formatting(content)
+        formatting = self._check_formatting(content, document.text_index)
         
         return {
             "avg_words_per_sentence": round(avg_words_per_sentence, 1),
@@ -276,24 +304,33 @@ class ManuscriptAnalyzer:
             "overall_score": self._calculate_quality_score(avg_words_per_sentence, term_consistency, formatting)
         }
     
-    def _check_term_consistency(self, content: str) -> Dict:
+    def _check_term_consistency(self, content: str, index: Optional[TextIndex] = None) -> Dict:
         """Verifica consistência terminológica."""
-        # Procura por termos que podem ter variações
-        common_terms = {
-            "Teoria da Emoção Construída": ["TCE", "teoria da emoção construída"],
-            "Modelo VIP": ["VIP", "modelo VIP"],
-        }
-        
+        # Termos e variações são contados juntos, em uma única passada,
+        # guardando a primeira ocorrência de cada um
+        common_terms = self.terminology.consistency
+        matcher = term_matcher(self.terminology.consistency_terms(), ignore_case=True)
+        counts = dict.fromkeys(matcher.terms, 0)
+        first = {}
+        for start, _, term in matcher.finditer(content):
+            counts[term] += 1
+            first.setdefault(term, start)
+        
+        if index is None:
+            index = TextIndex(content)
         inconsistencies = []
         for full_term, variations in common_terms.items():
-            full_count = len(re.findall(re.escape(full_term), content, re.IGNORECASE))
-            var_counts = {var: len(re.findall(re.escape(var), content, re.IGNORECASE)) for var in variations}
+            full_count = counts[full_term]
+            var_counts = {var: counts[var] for var in variations}
             
             if full_count > 10 and any(count > 5 for count in var_counts.values()):
+                # Aponta a primeira variação usada no lugar do termo preferido
+                position = min(first[var] for var, count in var_counts.items() if count)
                 inconsistencies.append({
                     "term": full_term,
                     "full_count": full_count,
-                    "variations": var_counts
+                    "variations": var_counts,
+                    "location": index.locate(position).as_dict()
                 })
         
         return {
@@ -301,24 +338,36 @@ class ManuscriptAnalyzer:
             "score": 1.0 if not inconsistencies else 0.7
         }
     
-    def _check_formatting(self, content: str) -> Dict:
+    def _check_formatting(self, content: str, index: Optional[TextIndex] = None) -> Dict:
         """Verifica qualidade da formatação."""
+        if index is None:
+            index = TextIndex(content)
         issues = []
+        # Primeira ocorrência de cada problema, na mesma ordem de ``issues``
+        locations = []
+        
+        def report(issue: str, match: re.Match):
+            issues.append(issue)
+            locations.append(index.locate(match.start()).as_dict())
         
         # Verifica espaçamento excessivo
-        if re.search(r'\n{4,}', content):
-            issues.append("Espaçamento excessivo entre parágrafos")
+        match = re.search(r'\n{4,}', content)
+        if match:
+            report("Espaçamento excessivo entre parágrafos", match)
         
         # Verifica pontuação inconsistente
-        if re.search(r'\s+[.,;:]', content):
-            issues.append("Espaços antes de pontuação")
+        match = re.search(r'\s+[.,;:]', content)
+        if match:
+            report("Espaços antes de pontuação", match)
         
         # Verifica aspas inconsistentes
-        if re.search(r'["""]', content) and re.search(r'["\']', content):
-            issues.append("Uso inconsistente de aspas")
+        match = re.search(r'["""]', content)
+        if match and re.search(r'["\']', content):
+            report("Uso inconsistente de aspas", match)
         
         return {
             "issues": issues,
+            "locations": locations,
             "score": 1.0 if not issues else max(0.5, 1.0 - len(issues) * 0.1)
         }
     
@@ -437,10 +486,47 @@ class ManuscriptAnalyzer:
             f"- **Formatação:** {analysis_result['quality']['formatting']['score']}/1.0",
             ""
         ]
+        lines.extend(self._length_report_lines(analysis_result["content_analysis"]))
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write('\n'.join(lines))
     
+    def _length_report_lines(self, content_analysis: Dict) -> List[str]:
+        """Seção do relatório com distribuições de comprimento e recorte por capítulo."""
+        distribution = content_analysis.get("length_distribution")
+        if not distribution:
+            return []
+        
+        lines = ["## LEGIBILIDADE", ""]
+        for label, key in (("Parágrafos", "paragraphs"), ("Sentenças", "sentences")):
+            stats = distribution[key]
+            p = stats["percentiles"]
+            lines.append(
+                f"- **{label} (palavras):** média {stats['mean']}, mediana {p['p50']}, "
+                f"p25 {p['p25']}, p75 {p['p75']}, p90 {p['p90']}"
+            )
+            bins = stats["histogram"]["bins"]
+            for i, count in enumerate(stats["histogram"]["counts"]):
+                label_range = f"{bins[i]}–{bins[i + 1] - 1}" if i + 1 < len(bins) else f"{bins[i]}+"
+                lines.append(f"  - {label_range}: {count}")
+        lines.append("")
+        
+        chapters = content_analysis.get("chapter_lengths") or []
+        if chapters:
+            lines.extend([
+                "| Capítulo | Palavras | Parágrafos | Média/Parágrafo | Sentenças | Média/Sentença |",
+                "|---|---|---|---|---|---|",
+            ])
+            for chapter in chapters:
+                title = chapter['title'].replace('|', r'\|')
+                lines.append(
+                    f"| {title} | {chapter['word_count']:,} | {chapter['paragraph_count']} | "
+                    f"{chapter['avg_paragraph_length']} | {chapter['sentence_count']} | "
+                    f"{chapter['avg_sentence_length']} |"
+                )
+            lines.append("")
+        return lines
+    
     def save_opportunities_report(self, opportunities: Dict, output_path: Path):
         """Salva relatório de oportunidades em arquivo Markdown."""
         lines = [
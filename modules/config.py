@@ -23,6 +23,11 @@ class Config:
     openai_model: str = "gpt-4o-mini"
     openai_max_tokens: int = 3000
     openai_temperature: float = 0.7
+    # Endereço da API (None = padrão da OpenAI); aceita servidores compatíveis
+    openai_base_url: Optional[str] = None
+    # Novas tentativas em erros 429, 5xx e de conexão, e tempo máximo por tentativa (s)
+    openai_max_retries: int = 4
+    openai_timeout: float = 60.0
     
     # Configurações de processamento
     enable_ai_enhancement: bool = True
@@ -30,6 +35,19 @@ class Config:
     enable_diagram_generation: bool = True
     parallel_processing: bool = False
     max_workers: int = 4
+    # Limite de requisições à API por minuto (0 = sem limite)
+    openai_requests_per_minute: int = 500
+    # Agrupa parágrafos consecutivos por requisição (até openai_max_tokens)
+    openai_pack_paragraphs: bool = True
+    
+    # Cache de análises (em cache_dir)
+    analysis_cache: bool = True
+    analysis_cache_max_mb: int = 256
+    
+    # Cache de respostas da IA (em cache_dir)
+    llm_cache: bool = True
+    llm_cache_max_mb: int = 64
+    llm_cache_max_age_days: int = 30
     
     # Configurações de formatação
     default_format: str = "A5"
@@ -43,6 +61,9 @@ class Config:
     generate_glossary: bool = True
     generate_index: bool = True
     
+    # Dicionários de termos (YAML/JSON); None usa os termos padrão
+    terminology_file: Optional[str] = None
+    
     # Configurações de revisão
     check_grammar: bool = True
     check_style: bool = True
@@ -74,13 +95,24 @@ class Config:
             "openai_model": self.openai_model,
             "openai_max_tokens": self.openai_max_tokens,
             "openai_temperature": self.openai_temperature,
+            "openai_base_url": self.openai_base_url,
+            "openai_max_retries": self.openai_max_retries,
+            "openai_timeout": self.openai_timeout,
+            "openai_requests_per_minute": self.openai_requests_per_minute,
+            "openai_pack_paragraphs": self.openai_pack_paragraphs,
             "enable_ai_enhancement": self.enable_ai_enhancement,
             "enable_ai_review": self.enable_ai_review,
             "enable_diagram_generation": self.enable_diagram_generation,
+            "analysis_cache": self.analysis_cache,
+            "analysis_cache_max_mb": self.analysis_cache_max_mb,
+            "llm_cache": self.llm_cache,
+            "llm_cache_max_mb": self.llm_cache_max_mb,
+            "llm_cache_max_age_days": self.llm_cache_max_age_days,
             "default_format": self.default_format,
             "default_font": self.default_font,
             "default_font_size": self.default_font_size,
             "export_formats": self.export_formats,
+            "terminology_file": self.terminology_file,
         }
     
     @classmethod
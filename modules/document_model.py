@@ -0,0 +1,355 @@
+"""
+Módulo de Modelo de Documento
+Tokeniza o manuscrito uma única vez em parágrafos, sentenças, títulos e
+palavras, guardando apenas offsets no texto original.
+"""
+
+import os
+import re
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Fim de sentença, com grupo de captura para que ``split`` devolva também os
+# separadores e os offsets possam ser acumulados sem uma segunda varredura.
+_RE_SENTENCE_END = re.compile(r'([.!?]+)')
+_RE_WORD = re.compile(r'\S+')
+_RE_NEWLINE = re.compile(r'\n')
+
+# Apenas linhas que começam com '#' ou 'c'/'C' podem ser títulos; os padrões
+# completos só são testados nesses pontos.
+_RE_HEADING_CANDIDATE = re.compile(r'\n[#cC]')
+
+# Elementos especiais contados na análise estrutural: (chave, padrão, flags).
+# Os delimitadores são ASCII, então os mesmos padrões valem sobre bytes UTF-8.
+ELEMENT_PATTERNS: Tuple[Tuple[str, str, int], ...] = (
+    ("figure_count", r'!\[.*?\]\(.*?\)', 0),  # Imagens em Markdown
+    ("table_count", r'\|.*\|', 0),  # Tabelas
+    ("code_block_count", r'```.*?```', re.DOTALL),
+)
+
+# (padrão, nível) — mesmos padrões historicamente usados pelo analisador.
+# A variante "CAPÍTULO" em maiúsculas é coberta por IGNORECASE. O primeiro
+# padrão é o título Markdown ("# Título"); ver ``Heading.markdown``.
+HEADING_PATTERNS: Tuple[Tuple["re.Pattern[str]", int], ...] = (
+    (re.compile(r'^#\s+(.+)$', re.MULTILINE | re.IGNORECASE), 1),
+    (re.compile(r'^Capítulo\s+\d+[:\s]+(.+)$', re.MULTILINE | re.IGNORECASE), 1),
+    (re.compile(r'^##\s+(.+)$', re.MULTILINE), 2),
+    (re.compile(r'^###\s+(.+)$', re.MULTILINE), 3),
+)
+
+# Abaixo desse tamanho, tokenizar no próprio processo é mais rápido do que
+# enviar os capítulos para outros processos.
+PARALLEL_MIN_SIZE = 512 * 1024
+
+
+@dataclass(frozen=True)
+class Heading:
+    """Título de capítulo (nível 1) ou seção (níveis 2 e 3)."""
+    title: str
+    position: int
+    end: int
+    level: int
+    markdown: bool = True
+
+    def as_dict(self) -> Dict:
+        """Representação usada nos relatórios do analisador."""
+        return {"title": self.title, "position": self.position, "level": self.level}
+
+
+@dataclass(frozen=True)
+class Location:
+    """Posição de um trecho no manuscrito; linha e coluna começam em 1."""
+    offset: int
+    line: int
+    column: int
+    chapter: int = 0  # 0: antes do primeiro capítulo
+    chapter_title: Optional[str] = None
+
+    def as_dict(self) -> Dict:
+        """Representação usada nos relatórios (serializável em JSON)."""
+        return {
+            "offset": self.offset,
+            "line": self.line,
+            "column": self.column,
+            "chapter": self.chapter,
+            "chapter_title": self.chapter_title,
+        }
+
+    def __str__(self) -> str:
+        position = f"linha {self.line}, coluna {self.column}"
+        if self.chapter:
+            return f"cap. {self.chapter} ({self.chapter_title}), {position}"
+        return position
+
+
+class TextIndex:
+    """
+    Inícios de linha e de capítulo de um texto, em arrays ordenados.
+
+    Montado uma vez por texto; cada ``locate`` é uma busca binária, então
+    localizar milhares de ocorrências custa O(k log n) sem voltar ao texto.
+    """
+
+    def __init__(self, content: str, headings: Optional[List['Heading']] = None):
+        """
+        Args:
+            content: Texto indexado
+            headings: Títulos já encontrados (ex.: ``DocumentModel.headings``);
+                None procura os títulos no texto
+        """
+        self.line_starts = array('q', [0])
+        self.line_starts.extend(m.end() for m in _RE_NEWLINE.finditer(content))
+        if headings is None:
+            headings = find_headings(content)
+        chapters = [h for h in headings if h.level == 1]
+        self.chapter_starts = array('q', (h.position for h in chapters))
+        self.chapter_titles = [h.title for h in chapters]
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def locate(self, offset: int) -> Location:
+        """
+        Converte um offset do texto em capítulo, linha e coluna.
+
+        Args:
+            offset: Posição (em caracteres) no texto indexado
+
+        Returns:
+            Localização; ``chapter`` é 0 antes do primeiro capítulo
+        """
+        line = bisect_right(self.line_starts, offset)
+        chapter = bisect_right(self.chapter_starts, offset)
+        return Location(
+            offset, line, offset - self.line_starts[line - 1] + 1,
+            chapter, self.chapter_titles[chapter - 1] if chapter else None,
+        )
+
+
+def _spans(pieces: Iterable[Tuple[str, int]]) -> Tuple[array, array, array]:
+    """
+    Offsets de ``piece.strip()`` e número de palavras de cada trecho não vazio.
+
+    Args:
+        pieces: Pares (trecho, comprimento do separador que o segue), na
+            ordem em que aparecem no texto
+
+    Returns:
+        Arrays de início, fim e contagem de palavras
+    """
+    starts, ends, lengths = array('q'), array('q'), array('q')
+    add_start, add_end, add_length = starts.append, ends.append, lengths.append
+    offset = 0
+    for piece, separator in pieces:
+        words = piece.split()
+        if words:
+            last = words[-1]
+            add_start(offset + piece.find(words[0]))
+            add_end(offset + piece.rfind(last) + len(last))
+            add_length(len(words))
+        offset += len(piece) + separator
+    return starts, ends, lengths
+
+
+def find_headings(content: str) -> List[Heading]:
+    """
+    Encontra títulos de capítulos e seções em uma única varredura.
+
+    Equivale a rodar ``finditer`` de cada padrão de ``HEADING_PATTERNS``
+    separadamente: cada padrão só volta a casar depois do fim do seu último
+    casamento, como no ``finditer``.
+
+    Args:
+        content: Texto do manuscrito
+
+    Returns:
+        Lista de títulos ordenada por posição
+    """
+    headings = []
+    last_end = [0] * len(HEADING_PATTERNS)
+
+    candidates = (m.start() + 1 for m in _RE_HEADING_CANDIDATE.finditer(content))
+    if content[:1] in ('#', 'c', 'C'):
+        candidates = chain((0,), candidates)
+
+    for pos in candidates:
+        for index, (pattern, level) in enumerate(HEADING_PATTERNS):
+            if pos < last_end[index]:
+                continue
+            match = pattern.match(content, pos)
+            if match:
+                last_end[index] = match.end()
+                headings.append(Heading(match.group(1).strip(), pos, match.end(), level, index != 1))
+    return headings
+
+
+def _tokenize(text: str) -> Tuple[Tuple[array, array, array], bool, Tuple[array, array, array], bool, int]:
+    """
+    Spans de parágrafos e sentenças de um texto (ou de um capítulo).
+
+    Returns:
+        Spans dos parágrafos, se o último parágrafo continua no texto
+        seguinte (não termina em linha em branco), spans das sentenças, se
+        a última sentença continua (não termina em ``.``, ``!`` ou ``?``) e
+        o número de sequências de pontuação final
+    """
+    pieces = text.split('\n\n')
+    paragraphs = _spans(zip(pieces, repeat(2)))
+    paragraph_open = not pieces[-1].isspace() and pieces[-1] != ''
+
+    pieces = _RE_SENTENCE_END.split(text)
+    sentences = _spans(zip(pieces[::2], chain(map(len, pieces[1::2]), (0,))))
+    sentence_open = not pieces[-1].isspace() and pieces[-1] != ''
+    return paragraphs, paragraph_open, sentences, sentence_open, len(pieces) // 2
+
+
+def _merge_spans(shards: Iterable[Tuple[int, Tuple[array, array, array], bool]]) -> Tuple[array, array, array]:
+    """
+    Junta os spans de capítulos tokenizados separadamente.
+
+    Os cortes ficam sempre no início de uma linha de título, então nenhuma
+    palavra é partida; um parágrafo ou sentença que atravessa o corte aparece
+    como o último trecho de um capítulo e o primeiro do seguinte, e os dois
+    são reunidos em um só.
+
+    Args:
+        shards: Triplas (offset do capítulo, spans, último trecho em aberto)
+
+    Returns:
+        Arrays de início, fim e contagem de palavras, como em ``_spans``
+    """
+    starts, ends, lengths = array('q'), array('q'), array('q')
+    previous_open = False
+    for offset, (shard_starts, shard_ends, shard_lengths), is_open in shards:
+        first = 0
+        if previous_open and shard_lengths:
+            ends[-1] = shard_ends[0] + offset
+            lengths[-1] += shard_lengths[0]
+            first = 1
+        starts.extend(start + offset for start in shard_starts[first:])
+        ends.extend(end + offset for end in shard_ends[first:])
+        lengths.extend(shard_lengths[first:])
+        previous_open = is_open or (previous_open and not shard_lengths)
+    return starts, ends, lengths
+
+
+def _chapter_cuts(content: str, headings: List[Heading], shard_count: int) -> List[int]:
+    """Offsets de início de cada bloco: capítulos agrupados até ~len/shard_count caracteres."""
+    min_size = max(1, len(content) // shard_count)
+    cuts = [0]
+    for heading in headings:
+        if heading.level == 1 and heading.position - cuts[-1] >= min_size:
+            cuts.append(heading.position)
+    return cuts
+
+
+class DocumentModel:
+    """
+    Visão tokenizada de um manuscrito.
+
+    Parágrafos (blocos separados por linha em branco) e sentenças (trechos
+    entre ``.``, ``!`` e ``?``) são guardados como pares de offsets do texto
+    sem os espaços das bordas, junto com a contagem de palavras de cada um.
+    Trechos só com espaços são descartados. As palavras não são materializadas:
+    ``word_count`` vem da soma por parágrafo e ``iter_word_spans`` gera os
+    offsets sob demanda. ``sentence_breaks`` é o número de sequências de
+    ``.``, ``!`` e ``?`` (``len(re.split(r'[.!?]+', content)) - 1``).
+    """
+
+    def __init__(self, content: str, max_workers: Optional[int] = 1,
+                 min_parallel_size: int = PARALLEL_MIN_SIZE):
+        """
+        Args:
+            content: Texto do manuscrito
+            max_workers: Processos usados na tokenização (None usa os
+                núcleos disponíveis; 1 tokeniza no processo atual). Com mais
+                de um, o texto é dividido nos capítulos e o resultado é
+                idêntico ao da tokenização em um só processo
+            min_parallel_size: Tamanho mínimo do texto para usar processos
+        """
+        self.content = content
+        self.headings = find_headings(content)
+        self._text_index = None
+
+        workers = max_workers or os.cpu_count() or 1
+        cuts = [0]
+        if workers > 1 and len(content) >= min_parallel_size:
+            # Alguns blocos por worker equilibram capítulos de tamanhos diferentes
+            cuts = _chapter_cuts(content, self.headings, workers * 4)
+
+        if len(cuts) == 1:
+            paragraphs, _, sentences, _, self.sentence_breaks = _tokenize(content)
+        else:
+            shards = [content[start:end] for start, end in zip(cuts, cuts[1:] + [len(content)])]
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+                results = list(executor.map(_tokenize, shards))
+            paragraphs = _merge_spans((offset, result[0], result[1]) for offset, result in zip(cuts, results))
+            sentences = _merge_spans((offset, result[2], result[3]) for offset, result in zip(cuts, results))
+            # Os cortes nunca partem uma sequência de pontuação
+            self.sentence_breaks = sum(result[4] for result in results)
+
+        self.paragraph_starts, self.paragraph_ends, self.paragraph_lengths = paragraphs
+        self.sentence_starts, self.sentence_ends, self.sentence_lengths = sentences
+        self.word_count = sum(self.paragraph_lengths)
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self.paragraph_lengths)
+
+    @property
+    def text_index(self) -> TextIndex:
+        """Índice de linhas e capítulos, montado no primeiro acesso."""
+        if self._text_index is None:
+            self._text_index = TextIndex(self.content, self.headings)
+        return self._text_index
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_lengths)
+
+    @property
+    def chapters(self) -> List[Dict]:
+        """Capítulos no formato dos relatórios do analisador."""
+        return [h.as_dict() for h in self.headings if h.level == 1]
+
+    @property
+    def sections(self) -> List[Dict]:
+        """Seções no formato dos relatórios do analisador."""
+        return [h.as_dict() for h in self.headings if h.level > 1]
+
+    def paragraph(self, index: int) -> str:
+        return self.content[self.paragraph_starts[index]:self.paragraph_ends[index]]
+
+    def sentence(self, index: int) -> str:
+        return self.content[self.sentence_starts[index]:self.sentence_ends[index]]
+
+    def iter_paragraphs(self) -> Iterator[str]:
+        content = self.content
+        for start, end in zip(self.paragraph_starts, self.paragraph_ends):
+            yield content[start:end]
+
+    def iter_sentences(self) -> Iterator[str]:
+        content = self.content
+        for start, end in zip(self.sentence_starts, self.sentence_ends):
+            yield content[start:end]
+
+    def iter_word_spans(self, start: int = 0, end: int = -1) -> Iterator[Tuple[int, int]]:
+        """
+        Gera os offsets das palavras (mesma definição de ``str.split()``).
+
+        Args:
+            start: Offset inicial da varredura
+            end: Offset final (exclusivo); negativo para ir até o fim
+
+        Returns:
+            Iterador de pares (início, fim)
+        """
+        if end < 0:
+            end = len(self.content)
+        for match in _RE_WORD.finditer(self.content, start, end):
+            yield match.span()
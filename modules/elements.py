@@ -9,6 +9,8 @@ from datetime import datetime
 import logging
 
 from .config import Config
+from .references import reference_index
+from .terminology import load_terminology, term_matcher
 from .utils import print_info
 
 class ElementsGenerator:
@@ -17,6 +19,7 @@ class ElementsGenerator:
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.terminology = load_terminology(config.terminology_file)
     
     def generate_all(self, enhanced_content: Dict, metadata: Dict) -> Dict:
         """
@@ -258,23 +261,12 @@ Boa leitura!
         """Gera glossário de termos."""
         lines = ["## GLOSSÁRIO", "", "---", ""]
         
-        # Termos técnicos comuns (expandir conforme necessário)
-        terms = {
-            "Teoria da Emoção Construída": "Teoria neurocientífica que propõe que emoções são construções ativas do cérebro, não reações automáticas a estímulos.",
-            "TCE": "Sigla para Teoria da Emoção Construída.",
-            "Interocepção": "Percepção do estado interno do corpo, incluindo sinais de órgãos internos.",
-            "Predição": "Processo pelo qual o cérebro antecipa eventos futuros baseado em experiências passadas.",
-            "Orçamento Corporal": "Sistema de gerenciamento de recursos do corpo (energia, água, glicose, etc.).",
-            "Granularidade Emocional": "Capacidade de fazer distinções precisas entre diferentes estados emocionais.",
-            "Conceito Emocional": "Representação mental que o cérebro usa para categorizar experiências como emoções específicas.",
-            "Modelo Preditivo": "Framework teórico que entende o cérebro como um órgão que constantemente gera predições sobre o mundo.",
-        }
+        # Termos técnicos com definição (ver ``terminology_file``)
+        terms = self.terminology.glossary
         
         # Detecta termos presentes no conteúdo
-        present_terms = {}
-        for term, definition in terms.items():
-            if term in content:
-                present_terms[term] = definition
+        found = term_matcher(tuple(terms)).present(content)
+        present_terms = {term: definition for term, definition in terms.items() if term in found}
         
         # Ordena alfabeticamente
         for term in sorted(present_terms.keys()):
@@ -294,19 +286,12 @@ Boa leitura!
         """Gera índice remissivo."""
         lines = ["## ÍNDICE REMISSIVO", "", "---", ""]
         
-        # Termos para indexar (expandir conforme necessário)
-        index_terms = [
-            "emoção", "cérebro", "predição", "interocepção",
-            "terapia", "modelo", "teoria", "prática",
-            "cliente", "terapeuta", "vínculo", "palavra", "imagem"
-        ]
+        # Termos para indexar (ver ``terminology_file``)
+        index_terms = tuple(self.terminology.index)
         
-        # Conta ocorrências
-        term_counts = {}
-        for term in index_terms:
-            count = len(re.findall(r'\b' + re.escape(term) + r'\b', content, re.IGNORECASE))
-            if count > 0:
-                term_counts[term] = count
+        # Conta ocorrências de todos os termos em uma única passada
+        counts = term_matcher(index_terms, ignore_case=True, whole_word=True).count(content)
+        term_counts = {term: count for term, count in counts.items() if count > 0}
         
         # Gera índice
         for term in sorted(term_counts.keys()):
@@ -323,23 +308,12 @@ Boa leitura!
         """Extrai e formata referências bibliográficas."""
         lines = ["## REFERÊNCIAS BIBLIOGRÁFICAS", "", "---", ""]
         
-        # Procura seção de referências
-        ref_match = re.search(
-            r'(REFERÊNCIAS|BIBLIOGRAFIA|REFERENCES).*$',
-            content,
-            re.IGNORECASE | re.DOTALL
-        )
+        # Seção de referências, compartilhada com analisador e revisor
+        index = reference_index(content)
         
-        if ref_match:
-            ref_section = ref_match.group(0)
-            
-            # Extrai linhas que parecem referências
-            ref_lines = []
-            for line in ref_section.split('\n'):
-                line = line.strip()
-                # Heurística: linha com ano entre parênteses e ponto final
-                if re.search(r'\(\d{4}\)', line) and line.endswith('.'):
-                    ref_lines.append(line)
+        if index.found:
+            # Heurística: linha com ano entre parênteses e ponto final
+            ref_lines = [entry.text for entry in index.complete_entries()]
             
             if ref_lines:
                 lines.extend(ref_lines)
@@ -3,19 +3,46 @@ Módulo de Aprimoramento de Conteúdo
 Realiza melhorias no conteúdo do manuscrito usando IA e regras.
 """
 
+import asyncio
 import re
-import time
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
 
 from .config import Config
+from .document_model import DocumentModel
+from .llm_cache import LLMResponseCache
+from .llm_client import OPENAI_AVAILABLE, LLMError, client_options, shared_client
+from .paragraph_packer import pack_paragraphs, render_batch, split_batch
 from .utils import print_info, print_warning, ProgressTracker
 
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# Parágrafos com menos palavras não são enviados à IA
+AI_MIN_WORDS = 10
+
+AI_SYSTEM_PROMPT = "Você é um editor. Aprimore o parágrafo mantendo o significado."
+AI_TEMPERATURE = 0.7
+
+AI_BATCH_SYSTEM_PROMPT = (
+    "Você é um editor. Aprimore cada parágrafo mantendo o significado. "
+    "Cada parágrafo vem precedido de um marcador numerado, como [[§1]], em linha própria. "
+    "Responda com os mesmos marcadores, na mesma ordem, cada um seguido apenas do parágrafo aprimorado."
+)
+# Folga para a resposta ser maior que o lote enviado (ambos limitados por openai_max_tokens)
+AI_BATCH_EXPANSION = 1.5
+# Lotes muito longos tornam a separação da resposta menos confiável
+AI_BATCH_MAX_PARAGRAPHS = 40
+
+
+def _run_async(coroutine: Awaitable):
+    """Executa uma corrotina a partir de código síncrono, mesmo dentro de um event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Já há um loop nesta thread (ex.: interface web): roda em outra thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
 
 class ContentEnhancer:
     """Aprimora conteúdo do manuscrito."""
@@ -25,11 +52,20 @@ class ContentEnhancer:
         self.logger = logging.getLogger(__name__)
         
         if OPENAI_AVAILABLE and config.openai_api_key and config.enable_ai_enhancement:
-            self.client = OpenAI(api_key=config.openai_api_key)
+            # Cliente compartilhado: mesma cota por minuto dos demais módulos
+            self.client = shared_client(**client_options(config))
             self.ai_enabled = True
         else:
             self.client = None
             self.ai_enabled = False
+        
+        self.llm_cache = None
+        if config.llm_cache:
+            self.llm_cache = LLMResponseCache(
+                config.cache_dir,
+                max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+                max_age_days=config.llm_cache_max_age_days,
+            )
     
     def enhance(self, content: str, opportunities: Dict, metadata: Dict) -> Dict:
         """Aprimora o conteúdo do manuscrito."""
@@ -61,7 +97,9 @@ class ContentEnhancer:
                 "total_changes": len(changes),
                 "formatting_changes": len(format_changes),
                 "terminology_changes": len(term_changes),
-                "ai_changes": len(ai_changes)
+                "ai_changes": len(ai_changes),
+                "ai_cache": self.llm_cache.stats() if self.llm_cache else None,
+                "ai_usage": self.client.usage.summary() if self.client else None
             }
         }
     
@@ -102,47 +140,226 @@ class ContentEnhancer:
         return enhanced, changes
     
     def _enhance_with_ai(self, content: str, metadata: Dict) -> Tuple[str, List[Dict]]:
-        """Aprimora conteúdo usando IA."""
-        changes = []
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-        sample_paragraphs = paragraphs[:5]  # Amostra reduzida
+        """
+        Aprimora com IA todos os parágrafos elegíveis do manuscrito.
+        
+        Os parágrafos são enviados concorrentemente (até ``max_workers`` ao
+        mesmo tempo, respeitando ``openai_requests_per_minute``) e cada
+        resposta substitui o parágrafo no lugar original; o restante do
+        texto, inclusive o espaçamento entre parágrafos, não é alterado.
+        """
+        document = DocumentModel(content)
+        targets = [i for i, length in enumerate(document.paragraph_lengths) if length >= AI_MIN_WORDS]
+        originals = [document.paragraph(i) for i in targets]
         
-        print_info(f"Aprimorando {len(sample_paragraphs)} parágrafos com IA...")
+        # Parágrafos já enviados antes (mesmo modelo e prompt) não vão à API
+        results = [self._cached_response(paragraph) for paragraph in originals]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) < len(originals):
+            print_info(f"{len(originals) - len(missing)} parágrafos reaproveitados do cache de respostas")
         
-        enhanced_paragraphs = []
-        for para in sample_paragraphs:
-            if len(para.split()) < 10:
-                enhanced_paragraphs.append(para)
+        if missing:
+            print_info(f"Aprimorando {len(missing)} parágrafos com IA "
+                       f"({self.config.max_workers} requisições simultâneas)...")
+            fetched = _run_async(self._enhance_with_async_client([originals[i] for i in missing]))
+            for i, result in zip(missing, fetched):
+                results[i] = result
+        
+        changes = []
+        pieces = []
+        last = 0
+        for index, original, enhanced in zip(targets, originals, results):
+            if not enhanced or enhanced == original:
                 continue
+            pieces.append(content[last:document.paragraph_starts[index]])
+            pieces.append(enhanced)
+            last = document.paragraph_ends[index]
+            changes.append({"type": "ai", "description": "Parágrafo aprimorado", "paragraph": index})
+        pieces.append(content[last:])
+        
+        return ''.join(pieces), changes
+    
+    async def _enhance_with_async_client(self, paragraphs: List[str]) -> List[Optional[str]]:
+        """Aprimora os parágrafos e fecha as conexões abertas neste loop."""
+        try:
+            complete = self._enhance_paragraph_ai_async
+            if not self.config.openai_pack_paragraphs:
+                return await self._enhance_paragraphs_async(paragraphs, complete)
+            return await self._enhance_packed_async(paragraphs, self._enhance_batch_ai_async, complete)
+        finally:
+            await self.client.aclose()
+    
+    async def _enhance_packed_async(self, paragraphs: List[str],
+                                    complete_batch: Callable[[List[str]], Awaitable[Optional[List[str]]]],
+                                    complete: Callable[[str], Awaitable[str]]) -> List[Optional[str]]:
+        """
+        Aprimora parágrafos agrupados em lotes dimensionados por ``openai_max_tokens``.
+        
+        Lotes cuja resposta não pôde ser separada (ou cuja chamada falhou)
+        são reenviados parágrafo a parágrafo.
+        
+        Args:
+            paragraphs: Parágrafos a aprimorar
+            complete_batch: Corrotina que aprimora um lote; None se a resposta
+                não puder ser separada em parágrafos
+            complete: Corrotina que aprimora um único parágrafo
             
-            try:
-                enhanced_para = self._enhance_paragraph_ai(para)
-                enhanced_paragraphs.append(enhanced_para)
-                if enhanced_para != para:
-                    changes.append({"type": "ai", "description": "Parágrafo aprimorado"})
-            except:
-                enhanced_paragraphs.append(para)
+        Returns:
+            Respostas na mesma ordem de ``paragraphs``; None onde a chamada falhou
+        """
+        budget = int(self.config.openai_max_tokens / AI_BATCH_EXPANSION)
+        batches = pack_paragraphs(paragraphs, budget, AI_BATCH_MAX_PARAGRAPHS)
+        
+        async def run_batch(batch: List[str]) -> Optional[List[str]]:
+            if len(batch) == 1:
+                return [await complete(batch[0])]
+            return await complete_batch(batch)
+        
+        print_info(f"{len(paragraphs)} parágrafos agrupados em {len(batches)} requisições")
+        batch_results = await self._enhance_paragraphs_async(
+            [[paragraphs[i] for i in batch] for batch in batches], run_batch)
+        
+        results: List[Optional[str]] = [None] * len(paragraphs)
+        retry = []
+        for batch, parts in zip(batches, batch_results):
+            if parts is None:
+                if len(batch) > 1:
+                    retry.extend(batch)
+                continue
+            for index, part in zip(batch, parts):
+                results[index] = part
+        
+        if retry:
+            print_warning(f"{len(retry)} parágrafos reenviados individualmente")
+            singles = await self._enhance_paragraphs_async([paragraphs[i] for i in retry], complete)
+            for index, result in zip(retry, singles):
+                results[index] = result
+        return results
+    
+    async def _enhance_paragraphs_async(self, paragraphs: List,
+                                        complete: Callable[..., Awaitable]) -> List:
+        """
+        Aprimora parágrafos (ou lotes de parágrafos) com concorrência limitada.
+        
+        Args:
+            paragraphs: Itens a aprimorar, um por requisição
+            complete: Corrotina que aprimora um item
             
-            time.sleep(0.5)
+        Returns:
+            Respostas na mesma ordem de ``paragraphs``; None onde a chamada falhou
+        """
+        results: List[Optional[str]] = [None] * len(paragraphs)
+        if not paragraphs:
+            return results
+        
+        progress = ProgressTracker(len(paragraphs), "Aprimoramento com IA")
+        pending = iter(enumerate(paragraphs))
+        failures = []
+        
+        async def worker():
+            # ``next`` é síncrono: cada parágrafo é retirado por um único worker
+            for index, paragraph in pending:
+                try:
+                    results[index] = await complete(paragraph)
+                except LLMError as e:
+                    failures.append(e)
+                    self.logger.warning(f"Falha ao aprimorar parágrafo {index}: {e}")
+                progress.update()
+        
+        workers = min(max(1, self.config.max_workers), len(paragraphs))
+        await asyncio.gather(*(worker() for _ in range(workers)))
         
-        enhanced_content = '\n\n'.join(enhanced_paragraphs + paragraphs[len(sample_paragraphs):])
-        return enhanced_content, changes
+        if failures:
+            print_warning(f"{len(failures)} requisições à IA falharam")
+        return results
+    
+    async def _enhance_batch_ai_async(self, batch: List[str]) -> Optional[List[str]]:
+        """
+        Aprimora um lote de parágrafos em uma única requisição.
+        
+        Returns:
+            Parágrafos aprimorados, ou None se a resposta não trouxer os
+            marcadores de todos os parágrafos
+        """
+        response = await self.client.achat(
+            render_batch(batch),
+            model=self.config.openai_model,
+            system=AI_BATCH_SYSTEM_PROMPT,
+            temperature=AI_TEMPERATURE,
+            max_tokens=self.config.openai_max_tokens,
+            purpose="enhancer"
+        )
+        parts = split_batch(response, len(batch))
+        if parts is None:
+            self.logger.info(f"Resposta de lote com {len(batch)} parágrafos não pôde ser separada")
+            return None
+        # Guardados por parágrafo, para que uma nova execução reaproveite cada um,
+        # sob o prompt de lote que de fato os produziu
+        for paragraph, enhanced in zip(batch, parts):
+            self._store_response(paragraph, enhanced, self._batch_cache_system())
+        return parts
+    
+    async def _enhance_paragraph_ai_async(self, paragraph: str) -> str:
+        """Aprimora um parágrafo usando o cliente assíncrono."""
+        response = await self.client.achat(
+            paragraph,
+            model=self.config.openai_model,
+            system=AI_SYSTEM_PROMPT,
+            temperature=AI_TEMPERATURE,
+            max_tokens=500,
+            purpose="enhancer"
+        )
+        enhanced = response.strip()
+        self._store_response(paragraph, enhanced)
+        return enhanced
+    
+    def _batch_cache_system(self) -> str:
+        """
+        Chave de cache das respostas de lote: o prompt de lote e o limite de
+        tokens da requisição, para que alterar qualquer um invalide as entradas.
+        """
+        return f"{AI_BATCH_SYSTEM_PROMPT}\n[lote; max_tokens={self.config.openai_max_tokens}]"
+    
+    def _cached_response(self, paragraph: str) -> Optional[str]:
+        """Resposta guardada para o parágrafo (individual ou de lote), se houver."""
+        if self.llm_cache is None:
+            return None
+        model = self.config.openai_model
+        # Uma consulta sem resposta conta como uma única falta no cache
+        cached = self.llm_cache.get(model, AI_TEMPERATURE, AI_SYSTEM_PROMPT, paragraph, count_miss=False)
+        if cached is not None:
+            return cached
+        return self.llm_cache.get(model, AI_TEMPERATURE, self._batch_cache_system(), paragraph)
+    
+    def _store_response(self, paragraph: str, enhanced: str, system: str = AI_SYSTEM_PROMPT):
+        """Guarda a resposta da IA; falhas de disco não interrompem o aprimoramento."""
+        if self.llm_cache is None:
+            return
+        try:
+            self.llm_cache.put(self.config.openai_model, AI_TEMPERATURE, system, paragraph, enhanced)
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar resposta no cache: {e}")
     
     def _enhance_paragraph_ai(self, paragraph: str) -> str:
         """Aprimora um parágrafo usando IA."""
         if not self.client:
             return paragraph
         
+        cached = self._cached_response(paragraph)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
+            enhanced = self.client.chat(
+                paragraph,
                 model=self.config.openai_model,
-                messages=[
-                    {"role": "system", "content": "Você é um editor. Aprimore o parágrafo mantendo o significado."},
-                    {"role": "user", "content": paragraph}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
-            return response.choices[0].message.content.strip()
-        except:
+                system=AI_SYSTEM_PROMPT,
+                temperature=AI_TEMPERATURE,
+                max_tokens=500,
+                purpose="enhancer"
+            ).strip()
+        except LLMError as e:
+            self.logger.warning(f"Falha ao aprimorar parágrafo: {e}")
             return paragraph
+        self._store_response(paragraph, enhanced)
+        return enhanced
@@ -0,0 +1,222 @@
+"""
+Módulo de Extração de Texto
+Leitores de arquivos de manuscrito otimizados para documentos grandes.
+"""
+
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+# Páginas por tarefa enviada a cada processo: blocos maiores amortizam a
+# abertura do PDF em cada worker, blocos menores antecipam a primeira página.
+PDF_PAGES_PER_TASK = 16
+
+# Abaixo disso, abrir o PDF em vários processos custa mais do que ganha.
+PDF_PARALLEL_MIN_PAGES = 48
+
+
+def _extract_pdf_range(task: Tuple[str, int, int]) -> List[str]:
+    """Extrai um intervalo de páginas com um leitor próprio (roda no worker)."""
+    import PyPDF2
+    file_path, start, stop = task
+    pages = PyPDF2.PdfReader(file_path).pages
+    return [pages[i].extract_text() for i in range(start, stop)]
+
+
+def _pdf_tasks(file_path: str, page_count: int, pages_per_task: int) -> List[Tuple[str, int, int]]:
+    return [
+        (file_path, start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+
+def iter_pdf_pages(file_path: str, max_workers: Optional[int] = None,
+                   pages_per_task: int = PDF_PAGES_PER_TASK) -> Iterator[str]:
+    """
+    Extrai o texto de um PDF página a página, em paralelo.
+
+    O intervalo de páginas é dividido em blocos distribuídos entre processos;
+    cada processo abre seu próprio ``PdfReader``. As páginas são entregues em
+    ordem assim que o bloco correspondente termina, de modo que o consumidor
+    pode começar a trabalhar antes do fim da extração.
+
+    Args:
+        file_path: Caminho do PDF
+        max_workers: Número máximo de processos (None usa os núcleos
+            disponíveis; 1 extrai no processo atual)
+        pages_per_task: Páginas por bloco enviado a cada processo
+
+    Returns:
+        Iterador com o texto de cada página, na ordem do documento
+
+    Raises:
+        ImportError: Se PyPDF2 não estiver instalado
+    """
+    import PyPDF2
+
+    workers = min(max_workers or os.cpu_count() or 1, os.cpu_count() or 1)
+    pages = PyPDF2.PdfReader(file_path).pages
+    page_count = len(pages)
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for page in pages:
+            yield page.extract_text()
+        return
+    del pages
+
+    tasks = _pdf_tasks(file_path, page_count, max(1, pages_per_task))
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        for chunk in executor.map(_extract_pdf_range, tasks):
+            yield from chunk
+
+
+def extract_pdf_text(file_path: str, max_workers: Optional[int] = None) -> str:
+    """
+    Extrai o texto completo de um PDF, com páginas separadas por linha em branco.
+
+    Args:
+        file_path: Caminho do PDF
+        max_workers: Número máximo de processos (ver ``iter_pdf_pages``)
+
+    Returns:
+        Texto do documento
+    """
+    return '\n\n'.join(iter_pdf_pages(file_path, max_workers))
+
+
+# ---------------------------------------------------------------------------
+# DOCX
+# ---------------------------------------------------------------------------
+
+# Nomes internos dos estilos de título do Word ("heading 1"…), iguais em
+# documentos localizados; o styleId ("Heading1", "Ttulo1"…) varia.
+_RE_HEADING_STYLE = re.compile(r'^heading\s*([1-9])$', re.IGNORECASE)
+
+# Texto dos filhos de um ``w:r``, como em ``python-docx`` (Run.text).
+_RUN_TEXT = {'tab': '\t', 'ptab': '\t', 'cr': '\n', 'noBreakHyphen': '-'}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _namespace(tag: str) -> str:
+    return tag[:tag.index('}') + 1] if tag.startswith('{') else ''
+
+
+def _docx_heading_styles(archive: zipfile.ZipFile) -> Dict[str, int]:
+    """Mapeia styleId -> nível de título a partir de ``word/styles.xml``."""
+    levels: Dict[str, int] = {}
+    try:
+        styles = archive.open('word/styles.xml')
+    except KeyError:
+        return levels
+    with styles:
+        for _, element in ElementTree.iterparse(styles):
+            if _local(element.tag) != 'style':
+                continue
+            ns = _namespace(element.tag)
+            name = element.find(f'{ns}name')
+            match = _RE_HEADING_STYLE.match(name.get(f'{ns}val', '') if name is not None else '')
+            if match and element.get(f'{ns}styleId'):
+                levels[element.get(f'{ns}styleId')] = int(match.group(1))
+            element.clear()
+    return levels
+
+
+def _docx_run_text(run: ElementTree.Element, ns: str) -> str:
+    parts = []
+    for child in run:
+        tag = _local(child.tag)
+        if tag == 't':
+            parts.append(child.text or '')
+        elif tag == 'br':
+            # Apenas quebras de linha (não de página/coluna) viram "\n"
+            if child.get(f'{ns}type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_TEXT:
+            parts.append(_RUN_TEXT[tag])
+    return ''.join(parts)
+
+
+def _docx_paragraph(paragraph: ElementTree.Element, ns: str,
+                    heading_styles: Dict[str, int]) -> Tuple[int, str]:
+    level = 0
+    parts = []
+    for child in paragraph:
+        tag = _local(child.tag)
+        if tag == 'r':
+            parts.append(_docx_run_text(child, ns))
+        elif tag == 'hyperlink':
+            parts.extend(_docx_run_text(run, ns) for run in child if _local(run.tag) == 'r')
+        elif tag == 'pPr':
+            style = child.find(f'{ns}pStyle')
+            if style is not None:
+                level = heading_styles.get(style.get(f'{ns}val', ''), 0)
+    return level, ''.join(parts)
+
+
+def iter_docx_paragraphs(source: Union[str, BinaryIO]) -> Iterator[Tuple[int, str]]:
+    """
+    Lê os parágrafos de um DOCX sem montar a árvore do ``python-docx``.
+
+    ``word/document.xml`` é lido direto do zip com um parser incremental;
+    cada parágrafo do corpo é convertido em texto e descartado em seguida,
+    então a memória usada não cresce com o tamanho do documento. O texto
+    segue as regras de ``python-docx`` (``Paragraph.text``): parágrafos de
+    tabelas e caixas de texto ficam de fora.
+
+    Args:
+        source: Caminho do arquivo ou objeto binário (ex.: ``io.BytesIO``)
+
+    Returns:
+        Iterador de pares (nível de título, texto); nível 0 é parágrafo comum
+
+    Raises:
+        zipfile.BadZipFile: Se o arquivo não for um DOCX válido
+    """
+    with zipfile.ZipFile(source) as archive:
+        heading_styles = _docx_heading_styles(archive)
+        with archive.open('word/document.xml') as document:
+            depth = 0
+            ns = ''
+            body = None
+            for event, element in ElementTree.iterparse(document, events=('start', 'end')):
+                if event == 'start':
+                    if depth == 0:
+                        ns = _namespace(element.tag)
+                    elif depth == 1 and element.tag == f'{ns}body':
+                        body = element
+                    depth += 1
+                    continue
+                depth -= 1
+                # Filhos diretos de document (0) > body (1)
+                if depth == 2 and body is not None:
+                    if element.tag == f'{ns}p':
+                        yield _docx_paragraph(element, ns, heading_styles)
+                    body.remove(element)
+                elif depth == 1:
+                    body = None
+
+
+def extract_docx_text(source: Union[str, BinaryIO], headings: bool = True) -> str:
+    """
+    Extrai o texto de um DOCX, com parágrafos separados por linha em branco.
+
+    Args:
+        source: Caminho do arquivo ou objeto binário
+        headings: Se True, títulos viram linhas Markdown (``#``, ``##``…)
+
+    Returns:
+        Texto dos parágrafos não vazios
+    """
+    parts = []
+    for level, text in iter_docx_paragraphs(source):
+        if not text.strip():
+            continue
+        if headings and level:
+            text = f"{'#' * level} {text}"
+        parts.append(text)
+    return '\n\n'.join(parts)
@@ -7,11 +7,20 @@ with additional helper functions for common formatting tasks.
 import re
 import sys
 from pathlib import Path
+from typing import Iterable, Iterator
 
 # Import the comprehensive fastformat module
 from fastformat import (
+    FastFormatChanges,
+    FastFormatEdit,
     FastFormatOptions,
+    FastFormatProfiler,
+    IncrementalFastFormatter,
     apply_fastformat as _apply_fastformat_core,
+    apply_fastformat_with_edits,
+    describe_edits,
+    iter_fastformat,
+    make_edits_diff,
     make_unified_diff,
     get_fastformat_default_options
 )
@@ -75,7 +84,8 @@ def get_academic_options() -> FastFormatOptions:
     return options
 
 
-def apply_fastformat(text: str, options: FastFormatOptions = None) -> str:
+def apply_fastformat(text: str, options: FastFormatOptions = None, mode: str = "classic",
+                     max_workers: int = None) -> str:
     """
     Apply FastFormat formatting to text.
     
@@ -85,6 +95,10 @@ def apply_fastformat(text: str, options: FastFormatOptions = None) -> str:
     Args:
         text: Text to format
         options: FastFormatOptions to use. If None, uses PT-BR defaults.
+        mode: "classic" (rule-by-rule implementation), "compiled"
+            (precompiled rule program, same output, faster on long texts) or
+            "parallel" (compiled program over paragraph blocks in a process pool)
+        max_workers: Process count for "parallel" mode (e.g. Config.max_workers)
         
     Returns:
         Formatted text
@@ -95,13 +109,56 @@ def apply_fastformat(text: str, options: FastFormatOptions = None) -> str:
     if options is None:
         options = get_ptbr_options()
     
-    return _apply_fastformat_core(text, options)
+    return _apply_fastformat_core(text, options, mode=mode, max_workers=max_workers)
+
+
+def apply_fastformat_stream(source: Iterable[str], options: FastFormatOptions = None) -> Iterator[str]:
+    """
+    Apply FastFormat to a text read incrementally (file handle or iterable of str).
+    
+    Memory stays bounded by roughly one block of paragraphs, so this is the
+    entry point for very large files. Joining the yielded chunks gives the
+    same result as apply_fastformat() on the whole text.
+    
+    Args:
+        source: Text-mode file object or iterable of str pieces
+        options: FastFormatOptions to use. If None, uses PT-BR defaults.
+        
+    Yields:
+        Formatted chunks
+    """
+    if options is None:
+        options = get_ptbr_options()
+    
+    return iter_fastformat(source, options)
+
+
+def format_with_edits(text: str, options: FastFormatOptions = None) -> FastFormatChanges:
+    """
+    Apply FastFormat and record what it changed.
+    
+    Args:
+        text: Text to format
+        options: FastFormatOptions to use. If None, uses PT-BR defaults.
+        
+    Returns:
+        FastFormatChanges with the formatted text, the edits as
+        (offset, old, new, rule) spans of the original text and the
+        number of changes per rule
+    """
+    if options is None:
+        options = get_ptbr_options()
+    
+    return apply_fastformat_with_edits(text, options)
 
 
 def format_with_diff(text: str, options: FastFormatOptions = None) -> tuple:
     """
     Apply FastFormat and return both formatted text and diff.
     
+    The diff is built from the edits recorded by the engine instead of
+    comparing both full texts.
+    
     Args:
         text: Text to format
         options: FastFormatOptions to use. If None, uses PT-BR defaults.
@@ -112,10 +169,10 @@ def format_with_diff(text: str, options: FastFormatOptions = None) -> tuple:
     if not isinstance(text, str) or not text:
         return text, ""
     
-    formatted = apply_fastformat(text, options)
-    diff = make_unified_diff(text, formatted)
+    changes = format_with_edits(text, options)
+    diff = make_edits_diff(text, changes.edits)
     
-    return formatted, diff
+    return changes.text, diff
 
 
 # Legacy helper functions for backward compatibility
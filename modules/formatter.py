@@ -32,6 +32,9 @@ class DocumentFormatter:
         
         # Permite configurações customizadas
         self.use_fastformat = getattr(self.config, 'use_fastformat', True)
+        
+        # Livros longos são formatados em paralelo, por blocos de parágrafos
+        self.fastformat_mode = "parallel" if self.config.parallel_processing else "compiled"
     
     def format_document(self, enhanced_content: Dict, elements: Dict, corrections: List[Dict]) -> Dict:
         """
@@ -55,7 +58,12 @@ class DocumentFormatter:
         # Aplica FastFormat para formatação tipográfica avançada
         if self.use_fastformat:
             print_info("Aplicando FastFormat (formatação tipográfica avançada)...")
-            content = apply_fastformat(content, self.fastformat_options)
+            content = apply_fastformat(
+                content,
+                self.fastformat_options,
+                mode=self.fastformat_mode,
+                max_workers=self.config.max_workers
+            )
         
         # Formatação de títulos e subtítulos
         content = self._format_headings(content)
@@ -0,0 +1,246 @@
+"""
+Módulo de Estatísticas de Comprimento
+Comprimentos (em palavras) de parágrafos e sentenças guardados uma única vez,
+com médias, percentis, histogramas e recortes por capítulo vetorizados.
+"""
+
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .document_model import DocumentModel
+
+PERCENTILES: Tuple[int, ...] = (10, 25, 50, 75, 90)
+
+# Limites inferiores das faixas dos histogramas, em palavras; a última é aberta
+PARAGRAPH_BINS: Tuple[int, ...] = (0, 25, 50, 100, 150, 200)
+SENTENCE_BINS: Tuple[int, ...] = (0, 10, 20, 30, 40)
+
+
+def _compact(values, dtype: str = 'int32'):
+    """Array compacto: ``numpy`` quando disponível, ``array('q')`` sem ele."""
+    if NUMPY_AVAILABLE:
+        return np.asarray(values, dtype=dtype)
+    return values if isinstance(values, array) else array('q', values)
+
+
+def mean(values) -> float:
+    """Média (0 para sequência vazia), com soma inteira exata."""
+    if not len(values):
+        return 0
+    total = int(values.sum()) if NUMPY_AVAILABLE else sum(values)
+    return total / len(values)
+
+
+def percentiles(values, qs: Sequence[int] = PERCENTILES) -> Dict[str, float]:
+    """
+    Percentis com interpolação linear (o método padrão de ``numpy.percentile``).
+
+    Returns:
+        Dicionário ``{"p50": ...}`` (chaves em texto para caber no cache JSON)
+    """
+    if not len(values):
+        return {f"p{q}": 0 for q in qs}
+    if NUMPY_AVAILABLE:
+        return {f"p{q}": round(float(v), 1) for q, v in zip(qs, np.percentile(values, qs))}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    result = {}
+    for q in qs:
+        rank = q / 100 * last
+        low = int(rank)
+        high = min(low + 1, last)
+        result[f"p{q}"] = round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 1)
+    return result
+
+
+def histogram(values, edges: Sequence[int]) -> List[int]:
+    """
+    Contagem por faixa ``[edges[i], edges[i + 1])``; a última faixa é aberta.
+
+    Args:
+        values: Comprimentos (nenhum menor que ``edges[0]``)
+        edges: Limites inferiores, em ordem crescente
+    """
+    if NUMPY_AVAILABLE:
+        bins = np.searchsorted(np.asarray(edges), values, side='right') - 1
+        return [int(c) for c in np.bincount(bins, minlength=len(edges))]
+    counts = [0] * len(edges)
+    for value in values:
+        counts[bisect_right(edges, value) - 1] += 1
+    return counts
+
+
+def distribution(values, edges: Sequence[int]) -> Dict:
+    """Média, percentis e histograma de um array de comprimentos."""
+    return {
+        "mean": round(mean(values), 1),
+        "percentiles": percentiles(values),
+        "histogram": {"bins": list(edges), "counts": histogram(values, edges)},
+    }
+
+
+def _segment_totals(starts, lengths, boundaries: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """
+    Quantidade e soma dos comprimentos dos trechos que começam em cada segmento.
+
+    O segmento ``i`` vai de ``boundaries[i]`` até o limite seguinte; trechos
+    antes do primeiro limite são ignorados.
+    """
+    if NUMPY_AVAILABLE:
+        index = np.searchsorted(np.asarray(boundaries, dtype=np.int64), starts, side='right')
+        counts = np.bincount(index, minlength=len(boundaries) + 1)[1:]
+        totals = np.bincount(index, weights=lengths, minlength=len(boundaries) + 1)[1:]
+        return [int(c) for c in counts], [int(t) for t in totals]
+    counts = [0] * (len(boundaries) + 1)
+    totals = [0] * (len(boundaries) + 1)
+    for start, length in zip(starts, lengths):
+        index = bisect_right(boundaries, start)
+        counts[index] += 1
+        totals[index] += length
+    return counts[1:], totals[1:]
+
+
+class LengthStats:
+    """
+    Comprimentos de parágrafos e sentenças de um manuscrito.
+
+    Os arrays são montados uma vez a partir do ``DocumentModel`` e
+    compartilhados pelo analisador e pelo revisor; médias, percentis,
+    histogramas e recortes por capítulo são calculados sobre eles, sem nova
+    passada pelo texto. Com NumPy os arrays são ``int32``/``bool``; sem ele,
+    ``array`` da biblioteca padrão, com os mesmos resultados.
+    """
+
+    def __init__(self, paragraph_lengths, sentence_lengths,
+                 paragraph_starts=(), sentence_starts=(), heading_paragraphs=(),
+                 chapters: Sequence[Tuple[str, int]] = (), sentence_breaks: int = 0):
+        """
+        Args:
+            paragraph_lengths: Palavras por parágrafo
+            sentence_lengths: Palavras por sentença
+            paragraph_starts: Offset de cada parágrafo no texto
+            sentence_starts: Offset de cada sentença no texto
+            heading_paragraphs: Marca dos parágrafos que são títulos (``#``)
+            chapters: Pares (título, offset) dos capítulos
+            sentence_breaks: Sequências de pontuação final no texto
+        """
+        self.paragraph_lengths = _compact(paragraph_lengths)
+        self.sentence_lengths = _compact(sentence_lengths)
+        self.paragraph_starts = _compact(paragraph_starts, 'int64')
+        self.sentence_starts = _compact(sentence_starts, 'int64')
+        if NUMPY_AVAILABLE:
+            self.heading_paragraphs = np.asarray(heading_paragraphs, dtype=bool)
+        else:
+            self.heading_paragraphs = bytes(bytearray(heading_paragraphs))
+        self.chapters = [(str(title), int(position)) for title, position in chapters]
+        self.sentence_breaks = sentence_breaks
+
+    @classmethod
+    def from_document(cls, document: DocumentModel) -> 'LengthStats':
+        """Monta as estatísticas a partir de um modelo já tokenizado."""
+        content = document.content
+        return cls(
+            document.paragraph_lengths,
+            document.sentence_lengths,
+            document.paragraph_starts,
+            document.sentence_starts,
+            [content[start] == '#' for start in document.paragraph_starts],
+            [(h.title, h.position) for h in document.headings if h.level == 1],
+            document.sentence_breaks,
+        )
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self.paragraph_lengths)
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_lengths)
+
+    def body_paragraph_lengths(self):
+        """Comprimentos dos parágrafos que não são títulos Markdown."""
+        if NUMPY_AVAILABLE:
+            return self.paragraph_lengths[~self.heading_paragraphs]
+        return array('q', compress(self.paragraph_lengths, (not h for h in self.heading_paragraphs)))
+
+    def sentences_longer_than(self, limit: int) -> int:
+        """Número de sentenças com mais de ``limit`` palavras."""
+        if NUMPY_AVAILABLE:
+            return int(np.count_nonzero(self.sentence_lengths > limit))
+        return sum(1 for length in self.sentence_lengths if length > limit)
+
+    def first_sentence_longer_than(self, limit: int) -> Optional[int]:
+        """Offset da primeira sentença com mais de ``limit`` palavras (None se não houver)."""
+        if NUMPY_AVAILABLE:
+            longer = np.flatnonzero(self.sentence_lengths > limit)
+            return int(self.sentence_starts[longer[0]]) if len(longer) else None
+        for start, length in zip(self.sentence_starts, self.sentence_lengths):
+            if length > limit:
+                return start
+        return None
+
+    def summary(self) -> Dict:
+        """Distribuições de parágrafos e sentenças, serializáveis em JSON."""
+        return {
+            "paragraphs": distribution(self.paragraph_lengths, PARAGRAPH_BINS),
+            "sentences": distribution(self.sentence_lengths, SENTENCE_BINS),
+        }
+
+    def chapter_breakdown(self) -> List[Dict]:
+        """
+        Parágrafos, sentenças e médias de cada capítulo.
+
+        Cada parágrafo ou sentença conta no capítulo em que começa; o texto
+        antes do primeiro capítulo fica de fora.
+        """
+        if not self.chapters:
+            return []
+        boundaries = [position for _, position in self.chapters]
+        para_counts, para_words = _segment_totals(self.paragraph_starts, self.paragraph_lengths, boundaries)
+        sent_counts, sent_words = _segment_totals(self.sentence_starts, self.sentence_lengths, boundaries)
+        return [
+            {
+                "title": title,
+                "position": position,
+                "word_count": para_words[i],
+                "paragraph_count": para_counts[i],
+                "avg_paragraph_length": round(para_words[i] / para_counts[i], 1) if para_counts[i] else 0,
+                "sentence_count": sent_counts[i],
+                "avg_sentence_length": round(sent_words[i] / sent_counts[i], 1) if sent_counts[i] else 0,
+            }
+            for i, (title, position) in enumerate(self.chapters)
+        ]
+
+    def to_dict(self) -> Dict:
+        """Representação em listas, para o cache de análises."""
+        return {
+            "paragraph_lengths": [int(v) for v in self.paragraph_lengths],
+            "sentence_lengths": [int(v) for v in self.sentence_lengths],
+            "paragraph_starts": [int(v) for v in self.paragraph_starts],
+            "sentence_starts": [int(v) for v in self.sentence_starts],
+            "heading_paragraphs": [bool(v) for v in self.heading_paragraphs],
+            "chapters": [list(chapter) for chapter in self.chapters],
+            "sentence_breaks": self.sentence_breaks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LengthStats':
+        """Reconstrói as estatísticas a partir de ``to_dict``."""
+        return cls(**data)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LengthStats):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"LengthStats({self.paragraph_count} parágrafos, {self.sentence_count} sentenças)"
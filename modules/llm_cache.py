@@ -0,0 +1,244 @@
+"""
+Módulo de Cache de Respostas da IA
+Guarda em disco as respostas de chat completions, endereçadas pelo modelo,
+pela temperatura, pelo prompt de sistema e pelo hash do conteúdo enviado.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class LLMResponseCache:
+    """
+    Cache persistente de respostas da IA.
+
+    Cada resposta é um JSON em ``<cache_dir>/llm``. O mtime marca o último
+    uso: ao passar de ``max_bytes`` as entradas menos usadas recentemente
+    são removidas, assim como as que ficaram sem uso por mais de
+    ``max_age_days``. Respostas criadas há mais de ``max_age_days`` não são
+    mais devolvidas, mesmo que continuem em uso.
+
+    O tamanho total é acompanhado em memória, então gravar milhares de
+    respostas não varre o diretório a cada gravação.
+    """
+
+    SUBDIR = "llm"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 64 * 1024 * 1024, max_age_days: float = 30):
+        self.directory = Path(cache_dir) / self.SUBDIR
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days > 0 else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(model: str, temperature: float, system: str, user: str) -> str:
+        """
+        Calcula a chave de uma requisição.
+
+        Args:
+            model: Modelo usado
+            temperature: Temperatura da requisição
+            system: Prompt de sistema ('' se não houver)
+            user: Conteúdo enviado pelo usuário
+
+        Returns:
+            Chave em hexadecimal
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "temperature": temperature,
+                "system": system,
+                "user": hashlib.sha256(user.encode("utf-8")).hexdigest(),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, model: str, temperature: float, system: str, user: str,
+            count_miss: bool = True) -> Optional[str]:
+        """
+        Recupera uma resposta e marca a entrada como usada.
+
+        Args:
+            count_miss: Se False, a ausência não entra nas estatísticas (para
+                consultas seguidas de outra chave da mesma resposta)
+
+        Returns:
+            Texto da resposta ou None se ausente, expirada ou corrompida
+        """
+        path = self._path(self.key_for(model, temperature, system, user))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            response = entry["response"]
+        except FileNotFoundError:
+            if count_miss:
+                self._count_miss()
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Resposta em cache inválida descartada ({path.name}): {e}")
+            self._discard(path)
+            if count_miss:
+                self._count_miss()
+            return None
+
+        if self.max_age is not None and time.time() - entry.get("created", 0) > self.max_age:
+            self._discard(path)
+            if count_miss:
+                self._count_miss()
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def put(self, model: str, temperature: float, system: str, user: str, response: str):
+        """
+        Grava uma resposta (escrita atômica) e aplica o limite de tamanho.
+
+        Args:
+            model: Modelo usado
+            temperature: Temperatura da requisição
+            system: Prompt de sistema ('' se não houver)
+            user: Conteúdo enviado pelo usuário
+            response: Texto devolvido pela IA
+        """
+        path = self._path(self.key_for(model, temperature, system, user))
+        data = json.dumps(
+            {"created": time.time(), "model": model, "response": response},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._unlink(Path(tmp_path))
+            raise
+
+        with self._lock:
+            self.writes += 1
+            if self._total_bytes is None:
+                over = True  # primeira gravação: mede o diretório
+            else:
+                self._total_bytes += len(data) - replaced
+                over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.name.endswith(".json") and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
+
+    def evict(self) -> int:
+        """
+        Remove as entradas sem uso há mais de ``max_age_days`` e, depois, as
+        menos usadas até caber em ``max_bytes``.
+
+        Returns:
+            Número de entradas removidas
+        """
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        oldest = time.time() - self.max_age if self.max_age is not None else None
+        removed = 0
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes and (oldest is None or mtime >= oldest):
+                break
+            self._unlink(Path(path))
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += removed
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove todas as respostas do cache.
+
+        Returns:
+            Número de entradas removidas
+        """
+        removed = 0
+        for entry in self._entries():
+            self._unlink(Path(entry.path))
+            removed += 1
+        with self._lock:
+            self._total_bytes = 0
+        return removed
+
+    def stats(self) -> Dict:
+        """Acertos, faltas, gravações e remoções desde a criação do objeto."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _discard(self, path: Path):
+        """Remove uma entrada inválida ou expirada, mantendo o total em memória."""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+            self.evictions += 1
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,405 @@
+"""
+Módulo de Cliente da IA
+Cliente único para as chamadas à API da OpenAI: conexões reaproveitadas,
+limite de requisições por minuto compartilhado entre threads e tarefas
+assíncronas, novas tentativas com espera exponencial e contabilidade de
+latência e tokens por chamada.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import openai
+    from openai import AsyncOpenAI, OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+# Códigos HTTP que valem nova tentativa (além de falhas de conexão e timeout)
+RETRY_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class LLMError(Exception):
+    """Falha de uma chamada à IA depois de esgotadas as tentativas."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Balde de fichas para limitar requisições por minuto.
+
+    Cada requisição reserva uma ficha; o saldo pode ficar negativo, e quem
+    reservou espera o tempo até sua ficha ser reposta. Assim as esperas
+    são calculadas sob a trava, mas dormidas fora dela, e a mesma instância
+    serve threads (``acquire``) e tarefas assíncronas (``acquire_async``)
+    sem bloquear o event loop. Com limite 0 não há espera.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: Optional[float] = None):
+        """
+        Args:
+            requests_per_minute: Requisições permitidas por minuto (0 = sem limite)
+            burst: Requisições que podem sair de uma vez com o balde cheio
+                (padrão: o equivalente a um segundo, no mínimo 1)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Reserva fichas e retorna quantos segundos esperar antes de usá-las.
+
+        Args:
+            tokens: Fichas a reservar
+
+        Returns:
+            Espera em segundos (0 se havia saldo)
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens: float = 1.0):
+        """Aguarda (bloqueando a thread) até haver fichas."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Aguarda (sem bloquear o event loop) até haver fichas."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LLMUsage:
+    """Chamadas, falhas, novas tentativas, latência e tokens, por finalidade."""
+
+    _FIELDS = ("calls", "failures", "retries", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_purpose: Dict[str, Dict] = {}
+
+    def _entry(self, purpose: str) -> Dict:
+        entry = self._by_purpose.get(purpose)
+        if entry is None:
+            entry = dict.fromkeys(self._FIELDS, 0)
+            entry.update(latency_total=0.0, latency_max=0.0)
+            self._by_purpose[purpose] = entry
+        return entry
+
+    def record(self, purpose: str, latency: float, usage=None, retries: int = 0, failed: bool = False):
+        """
+        Registra uma chamada.
+
+        Args:
+            purpose: Rótulo de quem chamou (ex.: 'enhancer')
+            latency: Duração total, incluindo novas tentativas e esperas
+            usage: Objeto ``usage`` da resposta, se houver
+            retries: Novas tentativas feitas
+            failed: Se a chamada terminou em erro
+        """
+        with self._lock:
+            entry = self._entry(purpose)
+            entry["calls"] += 1
+            entry["failures"] += int(failed)
+            entry["retries"] += retries
+            entry["latency_total"] += latency
+            entry["latency_max"] = max(entry["latency_max"], latency)
+            if usage is not None:
+                entry["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                entry["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def summary(self) -> Dict:
+        """Totais gerais e por finalidade, com latência média em segundos."""
+        with self._lock:
+            entries = {purpose: dict(entry) for purpose, entry in self._by_purpose.items()}
+        total = dict.fromkeys(self._FIELDS, 0)
+        total.update(latency_total=0.0, latency_max=0.0)
+        for entry in entries.values():
+            for key in self._FIELDS:
+                total[key] += entry[key]
+            total["latency_total"] += entry["latency_total"]
+            total["latency_max"] = max(total["latency_max"], entry["latency_max"])
+        for entry in list(entries.values()) + [total]:
+            entry["latency_avg"] = round(entry["latency_total"] / entry["calls"], 3) if entry["calls"] else 0.0
+            entry["latency_total"] = round(entry["latency_total"], 3)
+            entry["latency_max"] = round(entry["latency_max"], 3)
+        total["by_purpose"] = entries
+        return total
+
+
+class LLMClient:
+    """
+    Cliente compartilhado da API de chat completions e de imagens.
+
+    Um único ``OpenAI`` (e um ``AsyncOpenAI`` por event loop) mantém o
+    pool de conexões HTTP entre as chamadas. Toda tentativa, inclusive as
+    repetidas, passa pelo mesmo ``TokenBucket``; erros 429, 5xx, de
+    conexão e de timeout são repetidos com espera exponencial com jitter
+    (ou o ``Retry-After`` do servidor, se maior). Outros erros, e os que
+    persistirem, viram ``LLMError``.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 requests_per_minute: float = 500, max_retries: int = 4, timeout: float = 60.0,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0):
+        """
+        Args:
+            api_key: Chave da API
+            base_url: Endereço da API (None = padrão do SDK)
+            requests_per_minute: Limite compartilhado por todos os chamadores
+            max_retries: Novas tentativas após a primeira falha recuperável
+            timeout: Tempo máximo de cada tentativa, em segundos
+            backoff_base: Espera máxima antes da primeira nova tentativa
+            backoff_max: Teto da espera entre tentativas
+        """
+        if not OPENAI_AVAILABLE:
+            raise LLMError("Pacote openai não instalado")
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = TokenBucket(requests_per_minute)
+        self.usage = LLMUsage()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._sync_client = None
+        self._async_clients: Dict[asyncio.AbstractEventLoop, "AsyncOpenAI"] = {}
+
+    # -- clientes do SDK ---------------------------------------------------
+
+    def _sdk_options(self) -> Dict:
+        # As novas tentativas ficam a cargo deste módulo, não do SDK
+        return {"api_key": self.api_key, "base_url": self.base_url,
+                "max_retries": 0, "timeout": self.timeout}
+
+    @property
+    def sync_client(self) -> "OpenAI":
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = OpenAI(**self._sdk_options())
+            return self._sync_client
+
+    def _async_client(self) -> "AsyncOpenAI":
+        # Conexões assíncronas pertencem ao loop que as abriu
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = AsyncOpenAI(**self._sdk_options())
+            return client
+
+    async def aclose(self):
+        """Fecha o cliente assíncrono do loop atual (chamar antes de o loop terminar)."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def close(self):
+        """Fecha o cliente síncrono."""
+        with self._lock:
+            client, self._sync_client = self._sync_client, None
+        if client is not None:
+            client.close()
+
+    # -- novas tentativas --------------------------------------------------
+
+    def _classify(self, error: Exception) -> Tuple[bool, Optional[int], Optional[float]]:
+        """
+        Returns:
+            (se vale nova tentativa, status HTTP, Retry-After em segundos)
+        """
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True, None, None
+        if isinstance(error, openai.APIStatusError):
+            retry_after = None
+            try:
+                retry_after = float(error.response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+            return error.status_code in RETRY_STATUS, error.status_code, retry_after
+        return False, None, None
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Espera antes da tentativa ``attempt`` (1, 2, ...): jitter completo sobre 2^n."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _give_up(self, error: Exception, status: Optional[int], attempts: int) -> LLMError:
+        self.logger.warning(f"Chamada à IA falhou após {attempts} tentativa(s): {error}")
+        return LLMError(f"{type(error).__name__}: {error}", status)
+
+    def _call(self, purpose: str, method, **kwargs):
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                response = method(**kwargs)
+            except openai.OpenAIError as e:
+                retry, status, retry_after = self._classify(e)
+                if not retry or attempt >= self.max_retries:
+                    self.usage.record(purpose, time.perf_counter() - started, retries=attempt, failed=True)
+                    raise self._give_up(e, status, attempt + 1) from e
+                attempt += 1
+                time.sleep(self._backoff(attempt, retry_after))
+                continue
+            self.usage.record(purpose, time.perf_counter() - started,
+                              getattr(response, "usage", None), retries=attempt)
+            return response
+
+    async def _acall(self, purpose: str, method, **kwargs):
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async()
+            try:
+                response = await method(**kwargs)
+            except openai.OpenAIError as e:
+                retry, status, retry_after = self._classify(e)
+                if not retry or attempt >= self.max_retries:
+                    self.usage.record(purpose, time.perf_counter() - started, retries=attempt, failed=True)
+                    raise self._give_up(e, status, attempt + 1) from e
+                attempt += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+                continue
+            self.usage.record(purpose, time.perf_counter() - started,
+                              getattr(response, "usage", None), retries=attempt)
+            return response
+
+    # -- API ---------------------------------------------------------------
+
+    @staticmethod
+    def _messages(system: Optional[str], user: str) -> List[Dict]:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": user})
+        return messages
+
+    @staticmethod
+    def _text(response) -> str:
+        content = response.choices[0].message.content
+        if content is None:
+            raise LLMError("Resposta da IA sem conteúdo")
+        return content
+
+    def chat(self, user: str, *, model: str, system: Optional[str] = None,
+             temperature: float = 0.7, max_tokens: Optional[int] = None,
+             purpose: str = "default") -> str:
+        """
+        Envia uma conversa de uma mensagem e retorna o texto da resposta.
+
+        Args:
+            user: Conteúdo enviado pelo usuário
+            model: Modelo a usar
+            system: Prompt de sistema (None = sem mensagem de sistema)
+            temperature: Temperatura
+            max_tokens: Limite de tokens da resposta (None = padrão da API)
+            purpose: Rótulo de quem chamou, para a contabilidade
+
+        Returns:
+            Texto da resposta
+
+        Raises:
+            LLMError: Se a chamada falhar
+        """
+        options = {"max_tokens": max_tokens} if max_tokens is not None else {}
+        response = self._call(purpose, self.sync_client.chat.completions.create, model=model,
+                              messages=self._messages(system, user), temperature=temperature, **options)
+        return self._text(response)
+
+    async def achat(self, user: str, *, model: str, system: Optional[str] = None,
+                    temperature: float = 0.7, max_tokens: Optional[int] = None,
+                    purpose: str = "default") -> str:
+        """Versão assíncrona de ``chat``."""
+        options = {"max_tokens": max_tokens} if max_tokens is not None else {}
+        response = await self._acall(purpose, self._async_client().chat.completions.create, model=model,
+                                     messages=self._messages(system, user), temperature=temperature, **options)
+        return self._text(response)
+
+    def image(self, prompt: str, *, size: str = "1024x1024", model: Optional[str] = None,
+              purpose: str = "images") -> str:
+        """
+        Gera uma imagem e retorna a URL.
+
+        Raises:
+            LLMError: Se a chamada falhar
+        """
+        options = {"model": model} if model else {}
+        response = self._call(purpose, self.sync_client.images.generate,
+                              prompt=prompt, n=1, size=size, **options)
+        url = response.data[0].url if response.data else None
+        if not url:
+            raise LLMError("Resposta da IA sem URL de imagem")
+        return url
+
+    def verify(self) -> bool:
+        """
+        Confirma que a chave é aceita (lista os modelos).
+
+        Raises:
+            LLMError: Se a chave for recusada ou a API não responder
+        """
+        self._call("verify", self.sync_client.models.list)
+        return True
+
+
+_shared_clients: Dict[Tuple, LLMClient] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_client(api_key: Optional[str], base_url: Optional[str] = None, **options) -> LLMClient:
+    """
+    Retorna o ``LLMClient`` do processo para a chave e o endereço dados.
+
+    Todos os módulos que usam a mesma chave recebem a mesma instância, e
+    portanto o mesmo pool de conexões e a mesma cota por minuto. As opções
+    só valem na criação; chamadas posteriores reaproveitam as da primeira.
+
+    Args:
+        api_key: Chave da API
+        base_url: Endereço da API (None = padrão do SDK)
+        **options: Demais argumentos de ``LLMClient``
+
+    Returns:
+        Cliente compartilhado
+    """
+    key = (api_key, base_url)
+    with _shared_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _shared_clients[key] = LLMClient(api_key, base_url, **options)
+        return client
+
+
+def client_options(config) -> Dict:
+    """Argumentos de ``shared_client`` a partir de um ``Config``."""
+    return {
+        "api_key": config.openai_api_key,
+        "base_url": config.openai_base_url,
+        "requests_per_minute": config.openai_requests_per_minute,
+        "max_retries": config.openai_max_retries,
+        "timeout": config.openai_timeout,
+    }
@@ -0,0 +1,319 @@
+"""
+Módulo de Servidor Substituto da IA
+Servidor HTTP local que fala o formato da API de chat completions (e de
+imagens) da OpenAI, com latência, taxa de erros e vazão de tokens
+configuráveis. Permite testar e medir os caminhos com IA sem chave e sem
+rede: basta apontar ``openai_base_url`` para ``LLMStandIn.base_url``.
+
+Uso:
+    python -m modules.llm_standin --port 8000 --latency 0.3 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .paragraph_packer import estimate_tokens
+
+
+@dataclass
+class StandInSettings:
+    """Comportamento simulado do servidor."""
+    # Segundos antes de cada resposta, mais um sorteio entre 0 e ``jitter``
+    latency: float = 0.05
+    jitter: float = 0.0
+    # Fração das requisições respondidas com ``error_status``
+    error_rate: float = 0.0
+    error_status: int = 429
+    # Tokens gerados por segundo em cada resposta (0 = instantâneo)
+    tokens_per_second: float = 0.0
+    # Semente dos sorteios (None = aleatória)
+    seed: Optional[int] = None
+
+
+def _rewrite(text: str) -> str:
+    """
+    Resposta simulada: o próprio texto com espaços repetidos reduzidos.
+
+    As linhas são mantidas, então os marcadores de lote continuam em linha
+    própria e a resposta pode ser separada como a de um modelo real.
+    """
+    return "\n".join(" ".join(line.split()) for line in text.strip().split("\n"))
+
+
+@lru_cache(maxsize=8)
+def _png(width: int, height: int) -> bytes:
+    """PNG RGB com um degradê vertical, gerado sem bibliotecas de imagem."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(
+        b"\x00" + bytes((20 + 60 * y // height, 30 + 80 * y // height, 60 + 120 * y // height)) * width
+        for y in range(height)
+    )
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 6))
+            + chunk(b"IEND", b""))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive: o pool de conexões do cliente é exercitado como na API real
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def standin(self) -> "LLMStandIn":
+        return self.server.standin
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, kind: str):
+        headers = {"Retry-After": "0"} if status == 429 else None
+        self._send_json(status, {"error": {"message": message, "type": kind, "code": None}}, headers)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [
+                {"id": "standin", "object": "model", "created": 0, "owned_by": "standin"}]})
+        elif path.startswith("/files/") and path.endswith(".png"):
+            try:
+                width, height = (int(n) for n in path[len("/files/"):-len(".png")].split("x"))
+            except ValueError:
+                self._send_error(404, "Imagem inexistente", "not_found")
+                return
+            body = _png(width, height)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_error(404, f"Rota desconhecida: {path}", "not_found")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._send_error(400, "JSON inválido", "invalid_request_error")
+            return
+
+        if path.endswith("/chat/completions"):
+            handler = self.standin._chat_completion
+        elif path.endswith("/images/generations"):
+            handler = self.standin._image_generation
+        else:
+            self._send_error(404, f"Rota desconhecida: {path}", "not_found")
+            return
+
+        with self.standin._active():
+            fail, delay = self.standin._draw()
+            if fail:
+                time.sleep(self.standin.settings.latency)
+                self._send_error(self.standin.settings.error_status, "Erro simulado pelo servidor substituto",
+                                 "rate_limit_error" if self.standin.settings.error_status == 429 else "server_error")
+                return
+            status, payload, generated = handler(request, self.headers.get("Host", ""))
+            tokens_per_second = self.standin.settings.tokens_per_second
+            if tokens_per_second > 0:
+                delay += generated / tokens_per_second
+            time.sleep(delay)
+            self._send_json(status, payload)
+
+
+class LLMStandIn:
+    """
+    Servidor substituto da API, em uma thread própria.
+
+    Rotas: ``POST /v1/chat/completions`` (devolve o texto enviado, com os
+    espaços normalizados, respeitando ``max_tokens``), ``POST
+    /v1/images/generations`` (devolve a URL de um PNG servido pelo próprio
+    servidor) e ``GET /v1/models``. Cada requisição atende em uma thread,
+    então a concorrência do cliente é preservada.
+    """
+
+    def __init__(self, settings: Optional[StandInSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            settings: Latência, erros e vazão simulados
+            host: Endereço de escuta
+            port: Porta (0 = escolhida pelo sistema)
+        """
+        self.settings = settings or StandInSettings()
+        self._random = random.Random(self.settings.seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._active_now = 0
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        """Valor para ``openai_base_url``."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LLMStandIn":
+        """Começa a atender em segundo plano."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="llm-standin", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Para de atender e libera a porta."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "LLMStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # -- estatísticas ------------------------------------------------------
+
+    def reset_stats(self):
+        """Zera os contadores (ex.: entre rodadas de um benchmark)."""
+        with self._lock:
+            self._counts = dict.fromkeys(
+                ("requests", "chat_completions", "images", "errors", "truncated",
+                 "prompt_tokens", "completion_tokens", "peak_concurrency"), 0)
+
+    def stats(self) -> Dict:
+        """Requisições, erros simulados, tokens e pico de requisições simultâneas."""
+        with self._lock:
+            return dict(self._counts)
+
+    @contextmanager
+    def _active(self):
+        """Conta a requisição e o pico de requisições em atendimento."""
+        with self._lock:
+            self._active_now += 1
+            self._counts["requests"] += 1
+            self._counts["peak_concurrency"] = max(self._counts["peak_concurrency"], self._active_now)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_now -= 1
+
+    def _draw(self) -> Tuple[bool, float]:
+        """Sorteia se a requisição falha e quanto ela demora (sem a geração)."""
+        settings = self.settings
+        with self._lock:
+            fail = settings.error_rate > 0 and self._random.random() < settings.error_rate
+            delay = settings.latency + (self._random.uniform(0, settings.jitter) if settings.jitter else 0.0)
+            if fail:
+                self._counts["errors"] += 1
+        return fail, delay
+
+    # -- rotas -------------------------------------------------------------
+
+    def _chat_completion(self, request: Dict, host: str) -> Tuple[int, Dict, int]:
+        messages: List[Dict] = request.get("messages") or []
+        if not messages:
+            return 400, {"error": {"message": "messages é obrigatório", "type": "invalid_request_error"}}, 0
+
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+        reply = _rewrite(str(messages[-1].get("content") or ""))
+        finish_reason = "stop"
+        max_tokens = request.get("max_tokens") or request.get("max_completion_tokens")
+        if max_tokens and estimate_tokens(reply) > max_tokens:
+            reply = reply.encode("utf-8")[:max_tokens * 4].decode("utf-8", errors="ignore")
+            finish_reason = "length"
+        completion_tokens = estimate_tokens(reply)
+
+        with self._lock:
+            self._counts["chat_completions"] += 1
+            self._counts["prompt_tokens"] += prompt_tokens
+            self._counts["completion_tokens"] += completion_tokens
+            self._counts["truncated"] += finish_reason == "length"
+
+        return 200, {
+            "id": f"chatcmpl-standin-{time.monotonic_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "standin"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, completion_tokens
+
+    def _image_generation(self, request: Dict, host: str) -> Tuple[int, Dict, int]:
+        try:
+            width, height = (int(n) for n in str(request.get("size", "1024x1024")).split("x"))
+        except ValueError:
+            return 400, {"error": {"message": "size inválido", "type": "invalid_request_error"}}, 0
+        with self._lock:
+            self._counts["images"] += 1
+        host = host or "{}:{}".format(*self._httpd.server_address[:2])
+        return 200, {
+            "created": int(time.time()),
+            "data": [{"url": f"http://{host}/files/{width}x{height}.png"}],
+        }, 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor local que simula a API de chat completions")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Porta (padrão: 8000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos antes de cada resposta")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Atraso aleatório adicional máximo, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das requisições que falham (0 a 1)")
+    parser.add_argument("--error-status", type=int, default=429, help="Código HTTP das falhas (padrão: 429)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Vazão de geração (0 = instantâneo)")
+    parser.add_argument("--seed", type=int, help="Semente dos sorteios")
+    args = parser.parse_args(argv)
+
+    settings = StandInSettings(args.latency, args.jitter, args.error_rate, args.error_status,
+                               args.tokens_per_second, args.seed)
+    standin = LLMStandIn(settings, args.host, args.port)
+    print(f"🤖 Servidor substituto da IA em {standin.base_url} (Ctrl+C para parar)")
+    print(f"   Use openai_base_url: \"{standin.base_url}\" e qualquer openai_api_key")
+    try:
+        standin._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin._httpd.server_close()
+        print(f"\n📊 {standin.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
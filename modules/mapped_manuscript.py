@@ -0,0 +1,270 @@
+"""
+Módulo de Leitura Mapeada de Manuscritos
+Mapeia arquivos .md/.txt em memória e indexa capítulos e parágrafos em uma
+única varredura, sem decodificar o corpo do texto.
+"""
+
+import mmap
+import os
+import re
+from array import array
+from itertools import chain
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .document_model import ELEMENT_PATTERNS, HEADING_PATTERNS, Heading
+
+# Inícios de linha que podem ser títulos: '#' ou "capítulo" em qualquer
+# caixa (em UTF-8, 'í' é C3 AD e 'Í' é C3 8D). O '\n' literal, em vez de
+# '^' com MULTILINE, deixa o re saltar direto entre quebras de linha; a
+# posição 0 é testada à parte.
+_RE_HEADING_CANDIDATE = re.compile(rb'\n(#|[cC][aA][pP]\xc3[\xad\x8d][tT][uU][lL][oO])')
+_RE_HEADING_CANDIDATE_TEXT = re.compile(r'\n(#|[cC][aA][pP][íÍ][tT][uU][lL][oO])')
+_RE_PARAGRAPH_BREAK = re.compile(rb'\n\n')
+_RE_PARAGRAPH_BREAK_TEXT = re.compile(r'\n\n')
+
+# Um título pode atravessar linhas em branco ("#\n\nTítulo"), mas só
+# enquanto as linhas tiverem apenas espaços, dígitos e ':'.
+_RE_HEADING_STOP = re.compile(r'[^\s:\d]')
+
+_RE_MARKDOWN_LEVEL = re.compile(r'#{1,6}(?!#)')
+
+_BYTE_ELEMENT_PATTERNS = tuple(
+    (key, re.compile(pattern.encode('ascii'), flags)) for key, pattern, flags in ELEMENT_PATTERNS
+)
+
+_UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+_COUNT_CHUNK = 1024 * 1024
+
+
+def _count_chars(buffer, start: int, end: int) -> int:
+    """Número de caracteres UTF-8 em ``buffer[start:end]``, em blocos."""
+    count = 0
+    for offset in range(start, end, _COUNT_CHUNK):
+        chunk = buffer[offset:min(offset + _COUNT_CHUNK, end)]
+        count += len(chunk.translate(None, _UTF8_CONTINUATION))
+    return count
+
+
+class TextView:
+    """Trecho do manuscrito decodificado apenas quando acessado."""
+
+    __slots__ = ('_manuscript', 'start', 'end')
+
+    def __init__(self, manuscript: 'MappedManuscript', start: int, end: int):
+        self._manuscript = manuscript
+        self.start = start
+        self.end = end
+
+    @property
+    def text(self) -> str:
+        return self._manuscript._decode(self.start, self.end)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"TextView({self.start}, {self.end})"
+
+
+class MappedManuscript:
+    """
+    Manuscrito .md/.txt mapeado em memória.
+
+    A abertura faz uma varredura sobre os bytes e guarda os offsets dos
+    parágrafos (separados por linha em branco) e dos títulos, com as mesmas
+    regras de ``find_headings``. Os títulos reportam posições em caracteres,
+    como se o arquivo tivesse sido lido com ``open(..., encoding='utf-8')``;
+    o texto só é decodificado ao acessar ``text()`` ou uma ``TextView``.
+
+    Arquivos com ``\\r`` (quebras Windows ou Mac antigo) são decodificados
+    por inteiro, pois a leitura em modo texto normaliza essas quebras e os
+    offsets em bytes deixariam de corresponder.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self._buffer: Union[mmap.mmap, bytes, str] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = b''
+
+        self._mapped = isinstance(self._buffer, mmap.mmap)
+        if self._buffer.find(b'\r') != -1:
+            self.close()
+            self._mapped = False
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self._buffer = f.read()
+        self._text_mode = isinstance(self._buffer, str)
+
+        self._index()
+
+    # -- indexação ---------------------------------------------------------
+
+    def _index(self):
+        buffer = self._buffer
+        candidates = _RE_HEADING_CANDIDATE_TEXT if self._text_mode else _RE_HEADING_CANDIDATE
+        hash_mark = '#' if self._text_mode else b'#'
+
+        self.headings: List[Heading] = []
+        self._heading_offsets = array('q')
+        self.markdown_levels = array('b')
+        self.markdown_level_positions = array('q')
+        self._paragraph_starts = None
+        self._char_cursor = (0, 0)
+        last_end = [0] * len(HEADING_PATTERNS)
+
+        newline = '\n' if self._text_mode else b'\n'
+        at_start = candidates.match(newline + buffer[:16])
+        positions = chain((0,) if at_start else (), (m.start(1) for m in candidates.finditer(buffer)))
+        for pos in positions:
+            markdown = buffer[pos:pos + 1] == hash_mark
+            window, base = self._heading_window(pos)
+            char_pos = None
+            if markdown:
+                level = _RE_MARKDOWN_LEVEL.match(window, base)
+                if level and window[level.end():level.end() + 1].isspace():
+                    self.markdown_levels.append(level.end() - base)
+                    char_pos = self._char_offset(pos)
+                    self.markdown_level_positions.append(char_pos)
+            for index, (pattern, level) in enumerate(HEADING_PATTERNS):
+                # O padrão 1 ("Capítulo N") é o único que não começa com '#'
+                if pos < last_end[index] or markdown == (index == 1):
+                    continue
+                match = pattern.match(window, base)
+                if match:
+                    if self._text_mode:
+                        last_end[index] = match.end()
+                    else:
+                        last_end[index] = pos + len(window[:match.end()].encode('utf-8'))
+                    if char_pos is None:
+                        char_pos = self._char_offset(pos)
+                    self.headings.append(Heading(
+                        match.group(1).strip(), char_pos,
+                        char_pos + match.end() - base, level, markdown))
+                    self._heading_offsets.append(pos)
+
+        self.length = self._char_offset(len(buffer))
+
+    def _char_offset(self, pos: int) -> int:
+        """Converte offset no buffer em offset de caractere (chamadas em ordem crescente)."""
+        if self._text_mode:
+            return pos
+        byte_pos, char_pos = self._char_cursor
+        char_pos += _count_chars(self._buffer, byte_pos, pos)
+        self._char_cursor = (pos, char_pos)
+        return char_pos
+
+    def _heading_window(self, pos: int) -> Tuple[str, int]:
+        """
+        Texto onde os padrões de título são aplicados a partir de ``pos``.
+
+        No modo texto é o próprio buffer. No modo mapeado, decodifica a linha
+        de ``pos`` e as seguintes até a primeira que contenha algo além de
+        espaços, dígitos e ':' — nenhum padrão consegue casar além dela.
+
+        Returns:
+            Par (texto, posição inicial no texto)
+        """
+        buffer = self._buffer
+        if self._text_mode:
+            return buffer, pos
+
+        size = len(buffer)
+        end = buffer.find(b'\n', pos)
+        end = size if end == -1 else end
+        while end < size:
+            next_end = buffer.find(b'\n', end + 1)
+            next_end = size if next_end == -1 else next_end
+            line = buffer[end + 1:next_end].decode('utf-8')
+            end = next_end
+            if _RE_HEADING_STOP.search(line):
+                break
+        return buffer[pos:end].decode('utf-8'), 0
+
+    # -- acesso ------------------------------------------------------------
+
+    def _decode(self, start: int, end: int) -> str:
+        if self._text_mode:
+            return self._buffer[start:end]
+        return self._buffer[start:end].decode('utf-8')
+
+    def text(self) -> str:
+        """Texto completo, idêntico à leitura com ``open(..., encoding='utf-8')``."""
+        return self._decode(0, len(self._buffer))
+
+    @property
+    def chapters(self) -> List[Dict]:
+        """Capítulos no formato dos relatórios do analisador."""
+        return [h.as_dict() for h in self.headings if h.level == 1]
+
+    @property
+    def sections(self) -> List[Dict]:
+        """Seções no formato dos relatórios do analisador."""
+        return [h.as_dict() for h in self.headings if h.level > 1]
+
+    def chapter_views(self) -> List[Tuple[Heading, TextView]]:
+        """
+        Capítulos como trechos preguiçosos, do título até o próximo capítulo.
+
+        Returns:
+            Lista de pares (título, trecho)
+        """
+        chapters = [(h, offset) for h, offset in zip(self.headings, self._heading_offsets) if h.level == 1]
+        views = []
+        for index, (heading, start) in enumerate(chapters):
+            end = chapters[index + 1][1] if index + 1 < len(chapters) else len(self._buffer)
+            views.append((heading, TextView(self, start, end)))
+        return views
+
+    @property
+    def paragraph_starts(self) -> array:
+        """
+        Offsets (no buffer) do início de cada trecho de ``split('\\n\\n')``.
+
+        O índice de parágrafos só é montado no primeiro acesso, para que abrir
+        o arquivo e consultar a estrutura não percorra cada linha em branco.
+        """
+        if self._paragraph_starts is None:
+            breaks = _RE_PARAGRAPH_BREAK_TEXT if self._text_mode else _RE_PARAGRAPH_BREAK
+            self._paragraph_starts = array('q', [0])
+            self._paragraph_starts.extend(m.end() for m in breaks.finditer(self._buffer))
+        return self._paragraph_starts
+
+    @property
+    def raw_paragraph_count(self) -> int:
+        """Trechos entre linhas em branco, incluindo os vazios."""
+        return len(self.paragraph_starts)
+
+    def paragraph_view(self, index: int) -> TextView:
+        """Trecho bruto (sem ``strip``) do parágrafo ``index``."""
+        starts = self.paragraph_starts
+        start = starts[index]
+        end = starts[index + 1] - 2 if index + 1 < len(starts) else len(self._buffer)
+        return TextView(self, start, end)
+
+    def iter_paragraphs(self) -> Iterator[str]:
+        """Parágrafos não vazios, sem espaços nas bordas (como ``DocumentModel``)."""
+        for index in range(len(self.paragraph_starts)):
+            paragraph = self.paragraph_view(index).text.strip()
+            if paragraph:
+                yield paragraph
+
+    def count_elements(self) -> Dict[str, int]:
+        """Conta figuras, tabelas e blocos de código sem decodificar o texto."""
+        if self._text_mode:
+            return {key: len(re.findall(pattern, self._buffer, flags))
+                    for key, pattern, flags in ELEMENT_PATTERNS}
+        return {key: sum(1 for _ in pattern.finditer(self._buffer))
+                for key, pattern in _BYTE_ELEMENT_PATTERNS}
+
+    def close(self):
+        if self._mapped and not self._buffer.closed:
+            self._buffer.close()
+
+    def __enter__(self) -> 'MappedManuscript':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
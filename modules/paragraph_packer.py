@@ -0,0 +1,96 @@
+"""
+Módulo de Agrupamento de Parágrafos
+Agrupa parágrafos consecutivos em lotes dimensionados por uma estimativa
+local de tokens, para enviar vários parágrafos em uma única requisição à IA,
+e separa a resposta de volta em parágrafos.
+"""
+
+import re
+from typing import List, Optional, Sequence
+
+# Marcador que precede cada parágrafo de um lote, em linha própria
+BATCH_MARKER = "[[§{}]]"
+_RE_BATCH_MARKER = re.compile(r'^[ \t]*\[\[§(\d+)\]\][ \t]*$', re.MULTILINE)
+
+# Tokens gastos por marcador e quebras de linha ao redor
+MARKER_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa rápida de tokens, sem tokenizador.
+
+    Tokenizadores BPE produzem em média ~4 bytes UTF-8 por token; contar
+    bytes (e não caracteres) encarece acentos como o tokenizador encarece.
+
+    Args:
+        text: Texto a estimar
+
+    Returns:
+        Número aproximado de tokens (ao menos 1)
+    """
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+def pack_paragraphs(paragraphs: Sequence[str], budget: int, max_items: Optional[int] = None) -> List[List[int]]:
+    """
+    Agrupa parágrafos consecutivos em lotes que cabem em ``budget`` tokens.
+
+    Um parágrafo maior que o orçamento fica sozinho no seu lote.
+
+    Args:
+        paragraphs: Parágrafos, na ordem do texto
+        budget: Tokens disponíveis por lote (parágrafos e marcadores)
+        max_items: Máximo de parágrafos por lote (None = sem limite)
+
+    Returns:
+        Lista de lotes, cada um com os índices dos seus parágrafos
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, paragraph in enumerate(paragraphs):
+        cost = estimate_tokens(paragraph) + MARKER_TOKENS
+        full = max_items is not None and len(current) >= max_items
+        if current and (used + cost > budget or full):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def render_batch(paragraphs: Sequence[str]) -> str:
+    """Junta os parágrafos de um lote, cada um precedido do seu marcador numerado."""
+    return "\n\n".join(f"{BATCH_MARKER.format(number)}\n{paragraph}"
+                       for number, paragraph in enumerate(paragraphs, 1))
+
+
+def split_batch(response: str, count: int) -> Optional[List[str]]:
+    """
+    Separa a resposta de um lote em parágrafos.
+
+    Args:
+        response: Texto devolvido pela IA
+        count: Número de parágrafos enviados
+
+    Returns:
+        Parágrafos na ordem dos marcadores, ou None se os marcadores não
+        forem exatamente 1..count, em ordem, cada um com texto não vazio
+    """
+    markers = list(_RE_BATCH_MARKER.finditer(response))
+    if not markers or [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
+        return None
+    if response[:markers[0].start()].strip():
+        return None  # texto solto antes do primeiro marcador
+
+    parts = []
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following else len(response)
+        part = response[marker.end():end].strip()
+        if not part:
+            return None
+        parts.append(part)
+    return parts
@@ -16,6 +16,8 @@ from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 import requests
 from io import BytesIO
 
+from ..llm_client import OPENAI_AVAILABLE, LLMError, shared_client
+
 
 class CoverDesigner:
     """Designer automatizado de capas de livros."""
@@ -60,19 +62,19 @@ class CoverDesigner:
         Args:
             config: Dicionário de configuração com opções:
                 - openai_api_key: Chave API OpenAI para geração de imagens
+                - openai_base_url: Endereço de um servidor compatível (padrão: OpenAI)
                 - use_ai_images: Usar IA para gerar imagens (padrão: False)
                 - fonts_dir: Diretório de fontes customizadas
         """
         self.config = config or {}
         self.use_ai_images = self.config.get('use_ai_images', False)
         
-        # Configurar OpenAI se disponível
+        # Cliente compartilhado com os demais módulos (mesma cota por minuto)
+        self.client = None
         if self.use_ai_images and 'openai_api_key' in self.config:
-            try:
-                import openai
-                self.openai = openai
-                self.openai.api_key = self.config['openai_api_key']
-            except ImportError:
+            if OPENAI_AVAILABLE:
+                self.client = shared_client(self.config['openai_api_key'], self.config.get('openai_base_url'))
+            else:
                 print("⚠️  OpenAI não instalado. Geração de imagens com IA desativada.")
                 self.use_ai_images = False
         
@@ -177,7 +179,7 @@ class CoverDesigner:
     def _generate_background_ai(self, metadata: Dict, size: Tuple[int, int]) -> Optional[Image.Image]:
         """Gera imagem de fundo usando IA."""
         
-        if not self.use_ai_images:
+        if not self.use_ai_images or self.client is None:
             return None
         
         # Criar prompt baseado em metadados
@@ -191,24 +193,30 @@ No text, no people, just abstract shapes and patterns."""
         
         try:
             print("  🤖 Gerando imagem de fundo com IA...")
-            response = self.openai.Image.create(
-                prompt=prompt,
-                n=1,
-                size=f"{size[0]}x{size[1]}" if size[0] <= 1024 else "1024x1024"
+            image_url = self.client.image(
+                prompt,
+                size=f"{size[0]}x{size[1]}" if size[0] <= 1024 else "1024x1024",
+                purpose="cover"
             )
-            
-            image_url = response['data'][0]['url']
-            response = requests.get(image_url)
-            img = Image.open(BytesIO(response.content))
-            
-            # Redimensionar se necessário
-            if img.size != size:
-                img = img.resize(size, Image.Resampling.LANCZOS)
-            
-            return img
-        except Exception as e:
+        except LLMError as e:
             print(f"  ⚠️  Erro ao gerar imagem com IA: {e}")
             return None
+        
+        try:
+            response = requests.get(image_url, timeout=60)
+            response.raise_for_status()
+            img = Image.open(BytesIO(response.content))
+            img.load()
+        except (requests.RequestException, OSError) as e:
+            # OSError inclui PIL.UnidentifiedImageError (conteúdo que não é imagem)
+            print(f"  ⚠️  Erro ao baixar imagem gerada pela IA: {e}")
+            return None
+        
+        # Redimensionar se necessário
+        if img.size != size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+        
+        return img
     
     def _layout_centered(self, draw: ImageDraw.Draw, metadata: Dict, 
                         palette: Dict, size: Tuple[int, int]):
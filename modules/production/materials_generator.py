@@ -25,6 +25,9 @@ try:
 except ImportError:
     qrcode = None
 
+from ..llm_cache import LLMResponseCache
+from ..llm_client import OPENAI_AVAILABLE, LLMError, shared_client
+
 
 class MaterialsGenerator:
     """Gerador de materiais adicionais para publicação."""
@@ -36,18 +39,23 @@ class MaterialsGenerator:
         Args:
             config: Dicionário de configuração com opções:
                 - openai_api_key: Chave API OpenAI para geração de texto
+                - openai_base_url: Endereço de um servidor compatível (padrão: OpenAI)
                 - use_ai: Usar IA para geração de texto (padrão: False)
+                - llm_cache: Reaproveitar respostas da IA já obtidas (padrão: True)
+                - cache_dir: Diretório do cache de respostas (padrão: '.cache')
         """
         self.config = config or {}
         self.use_ai = self.config.get('use_ai', False)
+        self.llm_cache = None
+        if self.use_ai and self.config.get('llm_cache', True):
+            self.llm_cache = LLMResponseCache(self.config.get('cache_dir', '.cache'))
         
-        # Configurar OpenAI se disponível
+        # Cliente compartilhado com os demais módulos (mesma cota por minuto)
+        self.client = None
         if self.use_ai and 'openai_api_key' in self.config:
-            try:
-                import openai
-                self.openai = openai
-                self.openai.api_key = self.config['openai_api_key']
-            except ImportError:
+            if OPENAI_AVAILABLE:
+                self.client = shared_client(self.config['openai_api_key'], self.config.get('openai_base_url'))
+            else:
                 print("⚠️  OpenAI não instalado. Geração com IA desativada.")
                 self.use_ai = False
     
@@ -183,21 +191,46 @@ Público-alvo: {metadata.get('target_audience', 'profissionais e estudantes')}
 O blurb deve ter 100-150 palavras, ser persuasivo e destacar os principais benefícios do livro."""
         
         try:
-            response = self.openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "Você é um copywriter especializado em textos de contracapa de livros."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.7
+            return self._chat_completion(
+                "Você é um copywriter especializado em textos de contracapa de livros.",
+                prompt,
+                max_tokens=300
             )
-            
-            return response.choices[0].message.content.strip()
-        except Exception as e:
+        except LLMError as e:
             print(f"  ⚠️  Erro ao gerar blurb com IA: {e}")
             return self._generate_blurb_template(metadata)
     
+    def _chat_completion(self, system: str, prompt: str, max_tokens: int,
+                         model: str = "gpt-4", temperature: float = 0.7) -> str:
+        """
+        Chama a IA, reaproveitando a resposta guardada para o mesmo prompt.
+        
+        Raises:
+            LLMError: Se a chamada falhar ou a IA não estiver configurada
+        """
+        if self.client is None:
+            raise LLMError("Cliente da IA não configurado")
+        if self.llm_cache is not None:
+            cached = self.llm_cache.get(model, temperature, system, prompt)
+            if cached is not None:
+                return cached
+        
+        text = self.client.chat(
+            prompt,
+            model=model,
+            system=system,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            purpose="materials"
+        ).strip()
+        
+        if self.llm_cache is not None:
+            try:
+                self.llm_cache.put(model, temperature, system, prompt, text)
+            except OSError as e:
+                print(f"  ⚠️  Não foi possível gravar resposta no cache: {e}")
+        return text
+    
     def generate_synopsis(self, metadata: Dict, length: str = 'medium') -> str:
         """
         Gera sinopse do livro.
@@ -265,18 +298,12 @@ Descrição: {metadata.get('description', 'N/A')}
 A sinopse deve ter entre {min_words} e {max_words} palavras e apresentar claramente o conteúdo e os benefícios do livro."""
         
         try:
-            response = self.openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "Você é um especialista em sinopses de livros acadêmicos e profissionais."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_words * 2,
-                temperature=0.7
+            return self._chat_completion(
+                "Você é um especialista em sinopses de livros acadêmicos e profissionais.",
+                prompt,
+                max_tokens=max_words * 2
             )
-            
-            return response.choices[0].message.content.strip()
-        except Exception as e:
+        except LLMError as e:
             print(f"  ⚠️  Erro ao gerar sinopse com IA: {e}")
             return self._generate_synopsis_template(metadata, 'medium')
     
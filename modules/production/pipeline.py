@@ -33,7 +33,9 @@ class ProductionPipeline:
                 - language: Idioma (padrão: 'pt-BR')
                 - use_ai: Usar IA para geração de conteúdo
                 - openai_api_key: Chave API OpenAI
+                - openai_base_url: Endereço de um servidor compatível (padrão: OpenAI)
                 - output_dir: Diretório base de saída
+                - cache_dir: Diretório do cache de respostas da IA (padrão: '.cache')
         """
         self.config = config or {}
         
@@ -53,12 +55,15 @@ class ProductionPipeline:
         
         self.materials_generator = MaterialsGenerator({
             'use_ai': self.config.get('use_ai', False),
-            'openai_api_key': self.config.get('openai_api_key')
+            'openai_api_key': self.config.get('openai_api_key'),
+            'openai_base_url': self.config.get('openai_base_url'),
+            'cache_dir': self.config.get('cache_dir', '.cache')
         })
         
         self.cover_designer = CoverDesigner({
             'use_ai_images': self.config.get('use_ai', False),
-            'openai_api_key': self.config.get('openai_api_key')
+            'openai_api_key': self.config.get('openai_api_key'),
+            'openai_base_url': self.config.get('openai_base_url')
         })
     
     def process_book(self,
@@ -22,6 +22,8 @@ except ImportError:
     PyPDF2 = None
     pdfplumber = None
 
+from ..document_model import TextIndex
+
 try:
     import language_tool_python
 except ImportError:
@@ -46,6 +48,10 @@ class Issue:
     location: str
     suggestion: Optional[str] = None
     page: Optional[int] = None
+    offset: Optional[int] = None   # posição no texto verificado
+    line: Optional[int] = None
+    column: Optional[int] = None
+    chapter: Optional[int] = None
 
 
 class ProofChecker:
@@ -197,6 +203,14 @@ class ProofChecker:
             reference_issues = self._check_references_text(text, location)
             issues.extend(reference_issues)
         
+        # Converte offsets em capítulo, linha e coluna
+        index = TextIndex(text)
+        for issue in issues:
+            if issue.offset is not None:
+                loc = index.locate(issue.offset)
+                issue.line, issue.column, issue.chapter = loc.line, loc.column, loc.chapter
+                issue.location = f"{location}, {loc}"
+        
         return issues
     
     def _check_grammar_text(self, text: str, location: str) -> List[Issue]:
@@ -213,7 +227,8 @@ class ProofChecker:
                     severity=self._map_grammar_severity(match.ruleIssueType),
                     description=match.message,
                     location=location,
-                    suggestion=", ".join(match.replacements[:3]) if match.replacements else None
+                    suggestion=", ".join(match.replacements[:3]) if match.replacements else None,
+                    offset=getattr(match, 'offset', None)
                 ))
         except Exception as e:
             print(f"  ⚠️  Erro na verificação gramatical: {e}")
@@ -225,37 +240,44 @@ class ProofChecker:
         issues = []
         
         # Espaços múltiplos
-        if re.search(r'  +', text):
+        match = re.search(r'  +', text)
+        if match:
             issues.append(Issue(
                 category="formatting",
                 severity=IssueSeverity.MEDIUM,
                 description="Espaços múltiplos encontrados",
                 location=location,
-                suggestion="Substituir por espaço único"
+                suggestion="Substituir por espaço único",
+                offset=match.start()
             ))
         
         # Espaços antes de pontuação
-        if re.search(r' [.,;:!?]', text):
+        match = re.search(r' [.,;:!?]', text)
+        if match:
             issues.append(Issue(
                 category="formatting",
                 severity=IssueSeverity.MEDIUM,
                 description="Espaço antes de pontuação",
                 location=location,
-                suggestion="Remover espaço antes de pontuação"
+                suggestion="Remover espaço antes de pontuação",
+                offset=match.start()
             ))
         
         # Falta de espaço após pontuação
-        if re.search(r'[.,;:!?][A-Za-zÀ-ÿ]', text):
+        match = re.search(r'[.,;:!?][A-Za-zÀ-ÿ]', text)
+        if match:
             issues.append(Issue(
                 category="formatting",
                 severity=IssueSeverity.MEDIUM,
                 description="Falta espaço após pontuação",
                 location=location,
-                suggestion="Adicionar espaço após pontuação"
+                suggestion="Adicionar espaço após pontuação",
+                offset=match.start() + 1
             ))
         
         # Linhas muito longas (mais de 100 caracteres sem quebra)
         lines = text.split('\n')
+        line_start = 0
         for i, line in enumerate(lines):
             if len(line) > 100 and ' ' not in line[-50:]:
                 issues.append(Issue(
@@ -263,10 +285,12 @@ class ProofChecker:
                     severity=IssueSeverity.LOW,
                     description=f"Linha {i+1} muito longa sem quebras",
                     location=location,
-                    suggestion="Verificar quebra de linha"
+                    suggestion="Verificar quebra de linha",
+                    offset=line_start
                 ))
+            line_start += len(line) + 1
         
-        # Aspas inconsistentes
+        # Aspas inconsistentes (aponta para a última, provavelmente sem par)
         single_quotes = text.count("'")
         double_quotes = text.count('"')
         if single_quotes % 2 != 0:
@@ -275,7 +299,8 @@ class ProofChecker:
                 severity=IssueSeverity.HIGH,
                 description="Aspas simples desbalanceadas",
                 location=location,
-                suggestion="Verificar fechamento de aspas"
+                suggestion="Verificar fechamento de aspas",
+                offset=text.rfind("'")
             ))
         if double_quotes % 2 != 0:
             issues.append(Issue(
@@ -283,7 +308,8 @@ class ProofChecker:
                 severity=IssueSeverity.HIGH,
                 description="Aspas duplas desbalanceadas",
                 location=location,
-                suggestion="Verificar fechamento de aspas"
+                suggestion="Verificar fechamento de aspas",
+                offset=text.rfind('"')
             ))
         
         # Parênteses desbalanceados
@@ -293,7 +319,8 @@ class ProofChecker:
                 severity=IssueSeverity.HIGH,
                 description="Parênteses desbalanceados",
                 location=location,
-                suggestion="Verificar fechamento de parênteses"
+                suggestion="Verificar fechamento de parênteses",
+                offset=self._unmatched_parenthesis(text)
             ))
         
         return issues
@@ -306,29 +333,44 @@ class ProofChecker:
         citations = re.findall(r'\([A-ZÀ-Ý][a-zà-ÿ]+(?:\s+et\s+al\.)?,\s*\d{4}\)', text)
         
         # Detectar referências quebradas [?]
-        broken_refs = re.findall(r'\[\?\]', text)
+        broken_refs = [m.start() for m in re.finditer(r'\[\?\]', text)]
         if broken_refs:
             issues.append(Issue(
                 category="references",
                 severity=IssueSeverity.CRITICAL,
                 description=f"{len(broken_refs)} referência(s) quebrada(s) encontrada(s)",
                 location=location,
-                suggestion="Verificar e corrigir referências"
+                suggestion="Verificar e corrigir referências",
+                offset=broken_refs[0]
             ))
         
         # Detectar URLs quebradas
-        broken_urls = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+\s+[^\s<>"{}|\\^`\[\]]+', text)
-        if broken_urls:
+        broken_url = re.search(r'https?://[^\s<>"{}|\\^`\[\]]+\s+[^\s<>"{}|\\^`\[\]]+', text)
+        if broken_url:
             issues.append(Issue(
                 category="references",
                 severity=IssueSeverity.MEDIUM,
                 description="Possível URL quebrada em múltiplas linhas",
                 location=location,
-                suggestion="Verificar URLs"
+                suggestion="Verificar URLs",
+                offset=broken_url.start()
             ))
         
         return issues
     
+    @staticmethod
+    def _unmatched_parenthesis(text: str) -> Optional[int]:
+        """Offset do primeiro ')' sem abertura ou, não havendo, do último '(' sem fechamento."""
+        opened = []
+        for match in re.finditer(r'[()]', text):
+            if match.group() == '(':
+                opened.append(match.start())
+            elif opened:
+                opened.pop()
+            else:
+                return match.start()
+        return opened[-1] if opened else None
+    
     def _check_page_layout(self, page, page_num: int) -> List[Issue]:
         """Verifica problemas de layout em uma página PDF."""
         issues = []
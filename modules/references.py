@@ -0,0 +1,144 @@
+"""
+Módulo de Referências Bibliográficas
+Índice da seção de referências e das citações no texto, montado uma vez por
+documento e compartilhado pelo analisador, pelo revisor e pelo gerador de
+elementos.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# A seção começa na primeira ocorrência de um desses termos, em qualquer caixa
+_RE_SECTION = re.compile(r'(REFERÊNCIAS|BIBLIOGRAFIA|REFERENCES)', re.IGNORECASE)
+# Linhas de referência trazem o ano entre parênteses
+_RE_YEAR = re.compile(r'\((\d{4})\)')
+# Citação no texto: (Autor, 2020) ou (Autor et al., 2020)
+_RE_CITATION = re.compile(r'\(([A-ZÀ-Ý][a-zà-ÿ]+)(?:\s+et\s+al\.)?,\s*(\d{4})\)')
+_RE_FIRST_WORD = re.compile(r'[^\W\d_]+')
+
+
+@dataclass(frozen=True)
+class ReferenceEntry:
+    """Linha da seção de referências com ano entre parênteses."""
+    text: str
+    position: int
+    year: str
+
+    @property
+    def complete(self) -> bool:
+        """Termina com ponto final (critério dos elementos pós-textuais)."""
+        return self.text.endswith('.')
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """(primeiro sobrenome em minúsculas, ano), para cruzar com citações."""
+        match = _RE_FIRST_WORD.search(self.text)
+        return (match.group().casefold() if match else '', self.year)
+
+
+@dataclass(frozen=True)
+class Citation:
+    """Citação (Autor, Ano) encontrada no corpo do texto."""
+    author: str
+    year: str
+    position: int
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.author.casefold(), self.year)
+
+
+class ReferenceIndex:
+    """
+    Seção de referências, suas entradas e as citações do texto.
+
+    A seção vai da primeira ocorrência de "Referências", "Bibliografia" ou
+    "References" até o fim do texto. As entradas são localizadas pelo ano
+    entre parênteses, sem copiar a seção nem percorrê-la linha a linha; as
+    citações são procuradas apenas antes da seção.
+    """
+
+    def __init__(self, content: str):
+        """
+        Args:
+            content: Texto do manuscrito
+        """
+        section = _RE_SECTION.search(content)
+        self.start: Optional[int] = section.start() if section else None
+        self.end = len(content)
+
+        self.entries: List[ReferenceEntry] = []
+        if section:
+            line_end = self.start
+            for match in _RE_YEAR.finditer(content, self.start):
+                if match.start() < line_end:
+                    continue  # mesma linha da entrada anterior
+                line_start = max(content.rfind('\n', 0, match.start()) + 1, self.start)
+                line_end = content.find('\n', match.end())
+                if line_end == -1:
+                    line_end = len(content)
+                line = content[line_start:line_end]
+                text = line.strip()
+                self.entries.append(ReferenceEntry(
+                    text, line_start + len(line) - len(line.lstrip()), match.group(1)))
+
+        body_end = self.start if section else len(content)
+        self.citations: List[Citation] = [
+            Citation(m.group(1), m.group(2), m.start())
+            for m in _RE_CITATION.finditer(content, 0, body_end)
+        ]
+
+    @property
+    def found(self) -> bool:
+        """Se o texto tem seção de referências."""
+        return self.start is not None
+
+    def complete_entries(self) -> List[ReferenceEntry]:
+        """Entradas que terminam com ponto final."""
+        return [entry for entry in self.entries if entry.complete]
+
+    def cross_check(self) -> Dict[str, List]:
+        """
+        Cruza citações e referências por (sobrenome, ano).
+
+        Returns:
+            Dicionário com ``unmatched_citations`` (citações sem referência
+            correspondente) e ``uncited_entries`` (referências nunca citadas)
+        """
+        entry_keys = {entry.key for entry in self.entries}
+        citation_keys = {citation.key for citation in self.citations}
+        return {
+            "unmatched_citations": [c for c in self.citations if c.key not in entry_keys],
+            "uncited_entries": [e for e in self.entries if e.key not in citation_keys],
+        }
+
+
+# Índices recentes por digest do texto: o cache não mantém manuscritos vivos
+_INDEX_CACHE_SIZE = 4
+_index_cache: "OrderedDict[str, ReferenceIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def reference_index(content: str) -> ReferenceIndex:
+    """
+    Retorna o ``ReferenceIndex`` do texto, reaproveitado entre os módulos.
+
+    O cache guarda só o índice (posições e linhas curtas), com o SHA-256 do
+    texto como chave, para os últimos ``_INDEX_CACHE_SIZE`` documentos.
+    """
+    key = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    index = ReferenceIndex(content)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
@@ -4,10 +4,15 @@ Realiza revisão editorial profissional do manuscrito.
 """
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
 from .config import Config
+from .document_model import DocumentModel, Location, TextIndex
+from .length_stats import LengthStats, mean
+from .mapped_manuscript import MappedManuscript
+from .references import reference_index
+from .terminology import load_terminology, term_matcher
 from .utils import print_info, count_words
 
 class EditorialReviewer:
@@ -16,8 +21,10 @@ class EditorialReviewer:
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.terminology = load_terminology(config.terminology_file)
     
-    def review(self, enhanced_content: Dict, elements: Dict, metadata: Dict) -> Dict:
+    def review(self, enhanced_content: Dict, elements: Dict, metadata: Dict,
+               lengths: Optional[LengthStats] = None) -> Dict:
         """
         Realiza revisão editorial completa.
         
@@ -25,6 +32,8 @@ class EditorialReviewer:
             enhanced_content: Conteúdo aprimorado
             elements: Elementos pré e pós-textuais
             metadata: Metadados do manuscrito
+            lengths: Comprimentos já calculados para este mesmo conteúdo
+                (ex.: ``analysis_result["lengths"]`` quando o texto não mudou)
             
         Returns:
             Resultado da revisão com correções e avaliação
@@ -33,14 +42,26 @@ class EditorialReviewer:
         
         content = enhanced_content["content"]
         
+        # Comprimentos de parágrafos e sentenças, compartilhados pelas revisões
+        if lengths is None:
+            lengths = LengthStats.from_document(DocumentModel(content))
+        
         # Diferentes dimensões de revisão
         structure_review = self._review_structure(content)
-        content_review = self._review_content(content)
-        style_review = self._review_style(content)
+        content_review = self._review_content(content, lengths)
+        style_review = self._review_style(content, lengths)
         consistency_review = self._review_consistency(content)
         references_review = self._review_references(content)
         technical_review = self._review_technical_aspects(content, elements)
         
+        # Converte o offset de cada questão em capítulo, linha e coluna
+        index = TextIndex(content)
+        for review in (structure_review, content_review, style_review,
+                       consistency_review, references_review, technical_review):
+            for issue in review.get("issues", []):
+                position = issue.get("position")
+                issue["location"] = index.locate(position).as_dict() if position is not None else None
+        
         # Calcula avaliação geral
         overall_rating = self._calculate_overall_rating([
             structure_review,
@@ -80,14 +101,25 @@ class EditorialReviewer:
             }
         }
     
-    def _review_structure(self, content: str) -> Dict:
-        """Revisa estrutura do manuscrito."""
+    def _review_structure(self, content: Union[str, MappedManuscript]) -> Dict:
+        """Revisa estrutura do manuscrito (texto ou arquivo mapeado, sem decodificar o corpo)."""
         issues = []
         score = 10.0
         
+        if isinstance(content, MappedManuscript):
+            chapter_positions = [h.position for h in content.headings if h.level == 1 and h.markdown]
+            levels = list(content.markdown_levels)
+            level_positions = list(content.markdown_level_positions)
+            content_length = content.length
+        else:
+            chapter_positions = [m.start() for m in re.finditer(r'^#\s+.+$', content, re.MULTILINE)]
+            headings = [(m.start(), len(m.group(1))) for m in re.finditer(r'^(#{1,6})\s+', content, re.MULTILINE)]
+            levels = [level for _, level in headings]
+            level_positions = [position for position, _ in headings]
+            content_length = len(content)
+        
         # Verifica presença de capítulos
-        chapters = re.findall(r'^#\s+.+$', content, re.MULTILINE)
-        if len(chapters) == 0:
+        if len(chapter_positions) == 0:
             issues.append({
                 "severity": "high",
                 "category": "structure",
@@ -96,25 +128,23 @@ class EditorialReviewer:
             score -= 2.0
         
         # Verifica hierarquia de headings
-        headings = re.findall(r'^(#{1,6})\s+', content, re.MULTILINE)
-        if headings:
-            levels = [len(h) for h in headings]
+        if levels:
             # Verifica se há saltos na hierarquia (ex: # direto para ###)
             for i in range(len(levels) - 1):
                 if levels[i+1] - levels[i] > 1:
                     issues.append({
                         "severity": "medium",
                         "category": "structure",
-                        "description": f"Salto na hierarquia de títulos detectado (nível {levels[i]} para {levels[i+1]})"
+                        "description": f"Salto na hierarquia de títulos detectado (nível {levels[i]} para {levels[i+1]})",
+                        "position": level_positions[i+1]
                     })
                     score -= 0.5
                     break
         
         # Verifica balanceamento de seções
-        if len(chapters) > 0:
+        if len(chapter_positions) > 0:
             # Calcula tamanho médio de capítulos
-            chapter_positions = [m.start() for m in re.finditer(r'^#\s+.+$', content, re.MULTILINE)]
-            chapter_positions.append(len(content))
+            chapter_positions.append(content_length)
             
             chapter_sizes = []
             for i in range(len(chapter_positions) - 1):
@@ -129,7 +159,8 @@ class EditorialReviewer:
                         issues.append({
                             "severity": "low",
                             "category": "structure",
-                            "description": f"Capítulo {i+1} significativamente menor que os demais"
+                            "description": f"Capítulo {i+1} significativamente menor que os demais",
+                            "position": chapter_positions[i]
                         })
                         score -= 0.3
         
@@ -139,17 +170,18 @@ class EditorialReviewer:
             "corrections": []
         }
     
-    def _review_content(self, content: str) -> Dict:
+    def _review_content(self, content: str, lengths: Optional[LengthStats] = None) -> Dict:
         """Revisa qualidade do conteúdo."""
         issues = []
         score = 10.0
+        if lengths is None:
+            lengths = LengthStats.from_document(DocumentModel(content))
         
-        # Verifica densidade de parágrafos
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip() and not p.strip().startswith('#')]
+        # Verifica densidade de parágrafos (sem contar títulos)
+        para_lengths = lengths.body_paragraph_lengths()
         
-        if paragraphs:
-            para_lengths = [len(p.split()) for p in paragraphs]
-            avg_para_length = sum(para_lengths) / len(para_lengths)
+        if len(para_lengths):
+            avg_para_length = mean(para_lengths)
             
             # Parágrafos ideais: 50-150 palavras
             if avg_para_length < 30:
@@ -185,11 +217,13 @@ class EditorialReviewer:
             "corrections": []
         }
     
-    def _review_style(self, content: str) -> Dict:
+    def _review_style(self, content: str, lengths: Optional[LengthStats] = None) -> Dict:
         """Revisa estilo de escrita."""
         issues = []
         corrections = []
         score = 10.0
+        if lengths is None:
+            lengths = LengthStats.from_document(DocumentModel(content))
         
         # Verifica voz passiva excessiva
         passive_patterns = [
@@ -198,8 +232,9 @@ class EditorialReviewer:
             r'\bsão\s+\w+ados\b',
         ]
         
-        passive_count = sum(len(re.findall(pattern, content, re.IGNORECASE)) for pattern in passive_patterns)
-        total_sentences = len(re.split(r'[.!?]+', content))
+        passive_matches = [list(re.finditer(pattern, content, re.IGNORECASE)) for pattern in passive_patterns]
+        passive_count = sum(len(matches) for matches in passive_matches)
+        total_sentences = lengths.sentence_breaks + 1
         
         if total_sentences > 0:
             passive_ratio = passive_count / total_sentences
@@ -207,7 +242,8 @@ class EditorialReviewer:
                 issues.append({
                     "severity": "medium",
                     "category": "style",
-                    "description": f"Uso excessivo de voz passiva ({passive_ratio*100:.0f}% das sentenças)"
+                    "description": f"Uso excessivo de voz passiva ({passive_ratio*100:.0f}% das sentenças)",
+                    "position": min(matches[0].start() for matches in passive_matches if matches)
                 })
                 score -= 1.5
         
@@ -221,22 +257,24 @@ class EditorialReviewer:
             overused = [(w, c) for w, c in word_freq.most_common(20) if w not in common_words and c > len(words) * 0.02]
             
             if overused:
+                first_use = re.search(r'\b' + re.escape(overused[0][0]) + r'\b', content, re.IGNORECASE)
                 issues.append({
                     "severity": "low",
                     "category": "style",
-                    "description": f"Palavras potencialmente repetitivas: {', '.join([w for w, c in overused[:5]])}"
+                    "description": f"Palavras potencialmente repetitivas: {', '.join([w for w, c in overused[:5]])}",
+                    "position": first_use.start() if first_use else None
                 })
                 score -= 0.5
         
         # Verifica sentenças muito longas
-        sentences = [s.strip() for s in re.split(r'[.!?]+', content) if s.strip()]
-        long_sentences = [s for s in sentences if len(s.split()) > 40]
+        long_sentences = lengths.sentences_longer_than(40)
         
-        if len(long_sentences) > len(sentences) * 0.2:
+        if long_sentences > lengths.sentence_count * 0.2:
             issues.append({
                 "severity": "medium",
                 "category": "style",
-                "description": f"{len(long_sentences)} sentenças muito longas (>40 palavras)"
+                "description": f"{long_sentences} sentenças muito longas (>40 palavras)",
+                "position": lengths.first_sentence_longer_than(40)
             })
             score -= 1.0
         
@@ -253,34 +291,41 @@ class EditorialReviewer:
         score = 10.0
         
         # Verifica consistência de termos técnicos
-        term_variations = {
-            "Teoria da Emoção Construída": ["teoria da emoção construída", "TCE"],
-            "Modelo VIP": ["modelo VIP", "VIP"],
-        }
+        term_variations = self.terminology.consistency
+        counts = dict.fromkeys(self.terminology.consistency_terms(), 0)
+        first = {}
+        for start, _, term in term_matcher(self.terminology.consistency_terms()).finditer(content):
+            counts[term] += 1
+            first.setdefault(term, start)
         
         for main_term, variations in term_variations.items():
-            main_count = content.count(main_term)
-            var_counts = {v: content.count(v) for v in variations}
+            main_count = counts[main_term]
+            var_counts = {v: counts[v] for v in variations}
             
             # Se há uso inconsistente
             if main_count > 5 and any(count > main_count * 0.5 for count in var_counts.values()):
                 issues.append({
                     "severity": "low",
                     "category": "consistency",
-                    "description": f"Uso inconsistente de '{main_term}' e suas variações"
+                    "description": f"Uso inconsistente de '{main_term}' e suas variações",
+                    "position": min(first[v] for v, count in var_counts.items() if count > main_count * 0.5)
                 })
                 score -= 0.5
         
         # Verifica consistência de formatação de listas
-        list_markers = re.findall(r'^[\s]*([*\-+])\s', content, re.MULTILINE)
+        list_matches = list(re.finditer(r'^[\s]*([*\-+])\s', content, re.MULTILINE))
+        list_markers = [m.group(1) for m in list_matches]
         if list_markers:
             from collections import Counter
             marker_counts = Counter(list_markers)
             if len(marker_counts) > 1:
+                # Primeiro marcador diferente do usado na primeira lista
+                different = next(m for m in list_matches if m.group(1) != list_markers[0])
                 issues.append({
                     "severity": "low",
                     "category": "consistency",
-                    "description": "Uso inconsistente de marcadores de lista (*, -, +)"
+                    "description": "Uso inconsistente de marcadores de lista (*, -, +)",
+                    "position": different.start(1)
                 })
                 score -= 0.3
         
@@ -295,10 +340,10 @@ class EditorialReviewer:
         issues = []
         score = 10.0
         
-        # Procura seção de referências
-        ref_section = re.search(r'(REFERÊNCIAS|BIBLIOGRAFIA|REFERENCES)', content, re.IGNORECASE)
+        # Seção, entradas e citações, compartilhadas com analisador e elementos
+        index = reference_index(content)
         
-        if not ref_section:
+        if not index.found:
             issues.append({
                 "severity": "high",
                 "category": "references",
@@ -306,27 +351,36 @@ class EditorialReviewer:
             })
             score -= 3.0
         else:
-            # Extrai referências
-            ref_text = content[ref_section.start():]
-            ref_lines = [line.strip() for line in ref_text.split('\n') if line.strip()]
-            
             # Conta referências (heurística: linhas com ano entre parênteses)
-            references = [line for line in ref_lines if re.search(r'\(\d{4}\)', line)]
+            references = index.entries
             
             if len(references) == 0:
                 issues.append({
                     "severity": "medium",
                     "category": "references",
-                    "description": "Nenhuma referência identificada na seção de referências"
+                    "description": "Nenhuma referência identificada na seção de referências",
+                    "position": index.start
                 })
                 score -= 2.0
             elif len(references) < 10:
                 issues.append({
                     "severity": "low",
                     "category": "references",
-                    "description": f"Poucas referências identificadas ({len(references)})"
+                    "description": f"Poucas referências identificadas ({len(references)})",
+                    "position": index.start
                 })
                 score -= 0.5
+            
+            # Citações (Autor, Ano) sem entrada correspondente na seção:
+            # apenas relatadas, sem alterar a nota
+            unmatched = index.cross_check()["unmatched_citations"] if references else []
+            if unmatched:
+                issues.append({
+                    "severity": "medium",
+                    "category": "references",
+                    "description": f"{len(unmatched)} citação(ões) sem referência correspondente, ex.: ({unmatched[0].author}, {unmatched[0].year})",
+                    "position": unmatched[0].position
+                })
         
         return {
             "score": max(0, score),
@@ -353,12 +407,13 @@ class EditorialReviewer:
         
         # Verifica formatação Markdown
         # Headings sem espaço após #
-        bad_headings = re.findall(r'^#{1,6}[^\s]', content, re.MULTILINE)
+        bad_headings = [m.start() for m in re.finditer(r'^#{1,6}[^\s]', content, re.MULTILINE)]
         if bad_headings:
             issues.append({
                 "severity": "low",
                 "category": "technical",
-                "description": f"{len(bad_headings)} títulos com formatação incorreta (falta espaço após #)"
+                "description": f"{len(bad_headings)} títulos com formatação incorreta (falta espaço após #)",
+                "position": bad_headings[0]
             })
             score -= 0.5
         
@@ -419,7 +474,8 @@ class EditorialReviewer:
                 lines.append("")
                 for issue in issues:
                     severity_icon = {"critical": "🔴", "high": "🟠", "medium": "🟡", "low": "🟢"}.get(issue.get("severity", "low"), "⚪")
-                    lines.append(f"{severity_icon} **{issue.get('severity', 'low').upper()}:** {issue.get('description', '')}")
+                    location = f" ({Location(**issue['location'])})" if issue.get("location") else ""
+                    lines.append(f"{severity_icon} **{issue.get('severity', 'low').upper()}:** {issue.get('description', '')}{location}")
                 lines.append("")
             else:
                 lines.append("*Nenhuma questão identificada.*")
@@ -0,0 +1,282 @@
+"""
+Módulo de Terminologia
+Dicionários de termos (consistência, glossário e índice remissivo) e um
+localizador multi-padrão (Aho–Corasick) compartilhado pelo analisador, pelo
+revisor e pelo gerador de elementos.
+"""
+
+import hashlib
+import json
+import re
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import yaml
+
+
+# Equivalências extras de ``re.IGNORECASE`` entre minúsculas (ver
+# ``re._casefix``): cada grupo é mapeado para o seu primeiro caractere.
+_EXTRA_CASES = (
+    'iı', 'sſ', 'µμ', '\u0345ι\u1fbe', 'ΐ\u1fd3', 'ΰ\u1fe3', 'βϐ', 'εϵ',
+    'θϑ', 'κϰ', 'πϖ', 'ρϱ', 'ςσ', 'φϕ', 'в\u1c80', 'д\u1c81', 'о\u1c82',
+    'с\u1c83', 'т\u1c84\u1c85', 'ъ\u1c86', 'ѣ\u1c87', '\u1c88\ua64b',
+    'ṡẛ', '\ufb05\ufb06',
+)
+_FOLD_BEFORE = {ord('İ'): 'i'}  # única minúscula com mais de um caractere
+_FOLD_AFTER = {ord(c): group[0] for group in _EXTRA_CASES for c in group[1:]}
+_RE_FOLD_AFTER = re.compile('[' + re.escape(''.join(map(chr, _FOLD_AFTER))) + ']')
+
+
+def _fold(text: str) -> str:
+    """
+    Normaliza a caixa com as mesmas equivalências de ``re.IGNORECASE``.
+
+    O comprimento é preservado, então os offsets valem para o texto original.
+    """
+    # ``translate`` é lento; só é aplicado quando há o que traduzir
+    if 'İ' in text:
+        text = text.translate(_FOLD_BEFORE)
+    text = text.lower()
+    if _RE_FOLD_AFTER.search(text):
+        text = text.translate(_FOLD_AFTER)
+    return text
+
+
+def _is_word(char: str) -> bool:
+    """Mesma definição de ``\\w`` do módulo ``re`` para ``str``."""
+    return char.isalnum() or char == '_'
+
+
+class TermMatcher:
+    """
+    Localiza vários termos em uma única passada sobre o texto (Aho–Corasick).
+
+    As ocorrências de cada termo seguem a semântica de ``str.count`` e de
+    ``re.findall`` com o termo escapado: da esquerda para a direita, sem
+    sobreposição entre ocorrências do mesmo termo (termos diferentes podem se
+    sobrepor, como "VIP" dentro de "Modelo VIP").
+
+    Args:
+        terms: Termos a localizar (vazios são ignorados)
+        ignore_case: Compara em minúsculas, como ``re.IGNORECASE``
+        whole_word: Exige fronteira de palavra nas duas pontas, como ``\\b``
+    """
+
+    def __init__(self, terms: Iterable[str], ignore_case: bool = False, whole_word: bool = False):
+        self.terms: Tuple[str, ...] = tuple(dict.fromkeys(t for t in terms if t))
+        self.ignore_case = ignore_case
+        self.whole_word = whole_word
+
+        # Termos que coincidem após a normalização compartilham o mesmo padrão
+        patterns: Dict[str, List[str]] = {}
+        for term in self.terms:
+            patterns.setdefault(_fold(term) if ignore_case else term, []).append(term)
+        self._patterns = list(patterns)
+        self._owners = list(patterns.values())
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self._patterns):
+            state = 0
+            for char in pattern:
+                following = self._goto[state].get(char)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[state][char] = following
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = following
+            self._output[state] += (index,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[following] = target if target != following else 0
+                self._output[following] += self._output[self._fail[following]]
+
+        # Na raiz, salta direto para o próximo caractere que inicia algum termo
+        starts = ''.join(sorted(self._goto[0]))
+        self._re_start = re.compile('[' + re.escape(starts) + ']') if starts else None
+
+    def _scan(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Gera (índice do padrão, fim) de todas as ocorrências, inclusive sobrepostas."""
+        if self._re_start is None:
+            return
+        goto, fail, output = self._goto, self._fail, self._output
+        search = self._re_start.search
+        size = len(text)
+        state = 0
+        pos = 0
+        while pos < size:
+            if not state:
+                match = search(text, pos)
+                if match is None:
+                    return
+                pos = match.start()
+            char = text[pos]
+            pos += 1
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                yield index, pos
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Ocorrências dos termos, em ordem de término.
+
+        Args:
+            text: Texto a percorrer
+
+        Returns:
+            Iterador de (início, fim, termo); termos equivalentes após a
+            normalização de caixa geram uma ocorrência para cada um
+        """
+        haystack = _fold(text) if self.ignore_case else text
+        lengths = [len(p) for p in self._patterns]
+        last_end = [0] * len(self._patterns)
+        size = len(text)
+        for index, end in self._scan(haystack):
+            start = end - lengths[index]
+            if start < last_end[index]:
+                continue
+            if self.whole_word:
+                if (start > 0 and _is_word(text[start - 1])) == _is_word(text[start]):
+                    continue
+                if (end < size and _is_word(text[end])) == _is_word(text[end - 1]):
+                    continue
+            last_end[index] = end
+            for term in self._owners[index]:
+                yield start, end, term
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Conta as ocorrências de cada termo.
+
+        Args:
+            text: Texto a percorrer
+
+        Returns:
+            Dicionário termo -> ocorrências, na ordem dos termos (inclui zeros)
+        """
+        counts = dict.fromkeys(self.terms, 0)
+        for _, _, term in self.finditer(text):
+            counts[term] += 1
+        return counts
+
+    def present(self, text: str) -> Set[str]:
+        """Termos que ocorrem ao menos uma vez no texto."""
+        return {term for _, _, term in self.finditer(text)}
+
+
+@lru_cache(maxsize=32)
+def term_matcher(terms: Tuple[str, ...], ignore_case: bool = False, whole_word: bool = False) -> TermMatcher:
+    """Retorna um ``TermMatcher`` compilado, reaproveitado entre chamadas."""
+    return TermMatcher(terms, ignore_case=ignore_case, whole_word=whole_word)
+
+
+# Termos padrão, usados quando nenhum arquivo de terminologia é configurado
+
+DEFAULT_CONSISTENCY_TERMS: Dict[str, List[str]] = {
+    "Teoria da Emoção Construída": ["TCE", "teoria da emoção construída"],
+    "Modelo VIP": ["VIP", "modelo VIP"],
+}
+
+DEFAULT_GLOSSARY: Dict[str, str] = {
+    "Teoria da Emoção Construída": "Teoria neurocientífica que propõe que emoções são construções ativas do cérebro, não reações automáticas a estímulos.",
+    "TCE": "Sigla para Teoria da Emoção Construída.",
+    "Interocepção": "Percepção do estado interno do corpo, incluindo sinais de órgãos internos.",
+    "Predição": "Processo pelo qual o cérebro antecipa eventos futuros baseado em experiências passadas.",
+    "Orçamento Corporal": "Sistema de gerenciamento de recursos do corpo (energia, água, glicose, etc.).",
+    "Granularidade Emocional": "Capacidade de fazer distinções precisas entre diferentes estados emocionais.",
+    "Conceito Emocional": "Representação mental que o cérebro usa para categorizar experiências como emoções específicas.",
+    "Modelo Preditivo": "Framework teórico que entende o cérebro como um órgão que constantemente gera predições sobre o mundo.",
+}
+
+DEFAULT_INDEX_TERMS: List[str] = [
+    "emoção", "cérebro", "predição", "interocepção",
+    "terapia", "modelo", "teoria", "prática",
+    "cliente", "terapeuta", "vínculo", "palavra", "imagem"
+]
+
+
+@dataclass
+class Terminology:
+    """Dicionários de termos da casa editorial."""
+
+    # Termo preferido -> variações que indicam uso inconsistente
+    consistency: Dict[str, List[str]] = field(default_factory=lambda: {
+        term: list(variations) for term, variations in DEFAULT_CONSISTENCY_TERMS.items()
+    })
+    # Termo -> definição
+    glossary: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_GLOSSARY))
+    # Termos do índice remissivo
+    index: List[str] = field(default_factory=lambda: list(DEFAULT_INDEX_TERMS))
+
+    def consistency_terms(self) -> Tuple[str, ...]:
+        """Termos preferidos e variações, sem repetição."""
+        terms = []
+        for term, variations in self.consistency.items():
+            terms.append(term)
+            terms.extend(variations)
+        return tuple(dict.fromkeys(terms))
+
+    def digest(self) -> str:
+        """Hash do conteúdo, para compor chaves de cache."""
+        payload = json.dumps(asdict(self), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_terminology(path: Optional[str] = None) -> Terminology:
+    """
+    Carrega dicionários de termos de um arquivo YAML ou JSON.
+
+    O arquivo pode ter as seções ``consistency`` (termo -> lista de
+    variações), ``glossary`` (termo -> definição) e ``index`` (lista de
+    termos); seções ausentes mantêm os termos padrão.
+
+    Args:
+        path: Caminho do arquivo (None usa apenas os termos padrão)
+
+    Returns:
+        Terminologia carregada
+
+    Raises:
+        ValueError: Se o arquivo não tiver o formato esperado
+    """
+    terminology = Terminology()
+    if not path:
+        return terminology
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if Path(path).suffix.lower() == '.json':
+            data = json.load(f)
+        else:
+            data = yaml.safe_load(f)
+    data = data or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"Arquivo de terminologia inválido: {path}")
+
+    if 'consistency' in data:
+        terminology.consistency = {
+            str(term): [str(v) for v in (variations or []) if v]
+            for term, variations in data['consistency'].items() if term
+        }
+    if 'glossary' in data:
+        terminology.glossary = {
+            str(term): str(definition) for term, definition in data['glossary'].items() if term
+        }
+    if 'index' in data:
+        terminology.index = [str(term) for term in data['index'] if term]
+    return terminology
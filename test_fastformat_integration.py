@@ -309,6 +309,455 @@ def test_backward_compatibility():
         traceback.print_exc()
         return False
 
+def test_compiled_mode():
+    """Testa se o modo compilado produz saída idêntica ao clássico."""
+    print_header("TESTE 7: Modo Compilado")
+    
+    try:
+        from fastformat import apply_fastformat, compile_fastformat
+        from modules.fastformat_utils import (
+            get_default_options,
+            get_ptbr_options,
+            get_academic_options
+        )
+        
+        samples = [
+            '- Olá... disse ela.\n\n\n\n"Vamos"? perguntou ( baixinho ) .',
+            "Ele disse 'sim' e d'água , de 10 - 20 anos....",
+            '* item\r\n- outro  item\u2028— fala\n\n',
+            '  "aspas" "" \' \' …… [ ref ]  \n\n',
+            '',
+        ]
+        presets = [get_default_options(), get_ptbr_options(), get_academic_options()]
+        
+        for options in presets:
+            program = compile_fastformat(options)
+            for text in samples:
+                classic = apply_fastformat(text, options)
+                assert program.apply(text) == classic, f"Divergência em {text!r}"
+                assert apply_fastformat(text, options, mode="compiled") == classic
+        
+        print_success(f"{len(samples) * len(presets)} combinações idênticas ao modo clássico")
+        
+        try:
+            apply_fastformat("texto", get_ptbr_options(), mode="inexistente")
+            print_error("Modo inválido deveria gerar ValueError")
+            return False
+        except ValueError:
+            print_success("Modo inválido rejeitado")
+        
+        print("\n📊 Resultado: Modo compilado funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no modo compilado: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_streaming():
+    """Testa se o streaming reproduz a chamada sobre o texto inteiro."""
+    print_header("TESTE 8: Streaming")
+    
+    try:
+        import io
+        from fastformat import apply_fastformat, iter_fastformat
+        from modules.fastformat_utils import get_ptbr_options, apply_fastformat_stream
+        
+        options = get_ptbr_options()
+        text = (
+            '- Olá... disse ela.\n\n\n\n"Vamos"? perguntou.\n\n'
+            '(Nota entre parênteses.)\n\nDe 10\n\n- 20 anos.\n\n'
+            "Fim 'mesmo'\n\n\n"
+        ) * 50
+        expected = apply_fastformat(text, options)
+        
+        chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+        assert "".join(iter_fastformat(chunks, options, chunk_size=0)) == expected
+        print_success("Pedaços arbitrários: resultado idêntico")
+        
+        streamed = "".join(apply_fastformat_stream(io.StringIO(text), options))
+        assert streamed == expected
+        print_success("Arquivo em modo texto: resultado idêntico")
+        
+        print("\n📊 Resultado: Streaming funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no streaming: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_parallel_mode():
+    """Testa se o modo paralelo reproduz o resultado serial."""
+    print_header("TESTE 9: Modo Paralelo")
+    
+    try:
+        from fastformat import apply_fastformat, apply_fastformat_parallel
+        from modules.fastformat_utils import get_ptbr_options
+        
+        options = get_ptbr_options()
+        text = (
+            '  - Olá... disse ela.\n\n"Vamos"? perguntou.\n\n\n\n'
+            '(Nota.)\n\nCapítulo 10\n\n- 20 anos.\n\n'
+        ) * 40 + "Fim  \n\n\n"
+        expected = apply_fastformat(text, options)
+        
+        result = apply_fastformat_parallel(text, options, max_workers=2, min_parallel_size=0)
+        assert result == expected, "Resultado paralelo difere do serial"
+        print_success("Resultado paralelo idêntico ao serial (strip e quebra final incluídos)")
+        
+        assert apply_fastformat(text, options, mode="parallel", max_workers=1) == expected
+        print_success("max_workers=1 formata no próprio processo")
+        
+        print("\n📊 Resultado: Modo paralelo funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no modo paralelo: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_incremental_cache():
+    """Testa o formatador incremental com cache de parágrafos."""
+    print_header("TESTE 10: Formatação Incremental")
+    
+    try:
+        from fastformat import apply_fastformat, IncrementalFastFormatter
+        from modules.fastformat_utils import get_ptbr_options
+        
+        options = get_ptbr_options()
+        paragraphs = ['- Parágrafo %d... disse ela.' % i for i in range(20)]
+        text = "\n\n".join(paragraphs)
+        formatter = IncrementalFastFormatter(options)
+        
+        assert formatter.format(text) == apply_fastformat(text, options)
+        assert formatter.stats["misses"] == 20 and formatter.stats["hits"] == 0
+        print_success("Primeira formatação idêntica ao apply_fastformat")
+        
+        paragraphs[7] = '- Parágrafo   editado... "sim"?'
+        edited = "\n\n".join(paragraphs)
+        assert formatter.format(edited) == apply_fastformat(edited, options)
+        assert formatter.stats["misses"] == 21 and formatter.stats["hits"] == 19
+        print_success("Após editar um parágrafo só ele é reformatado")
+        
+        small = IncrementalFastFormatter(options, max_entries=5)
+        assert small.format(text) == apply_fastformat(text, options)
+        assert small.stats["entries"] == 20 and small.stats["evictions"] == 0
+        assert small.format(edited) == apply_fastformat(edited, options)
+        assert small.stats["misses"] == 21 and small.stats["hits"] == 19
+        print_success("Texto maior que o limite continua todo em cache entre edições")
+        
+        book = ['Capítulo %d... "disse" ela.' % i for i in range(12000)]
+        large = IncrementalFastFormatter(options)
+        large.format("\n\n".join(book))
+        misses = large.stats["misses"]
+        book[6000] = 'Capítulo   editado... "sim"?'
+        assert large.format("\n\n".join(book)) == apply_fastformat("\n\n".join(book), options)
+        assert large.stats["misses"] == misses + 1
+        print_success(f"Livro com {len(book)} parágrafos (> {large.max_entries}): edição reformata só 1")
+        
+        short = "\n\n".join(paragraphs[:3])
+        assert small.format(short) == apply_fastformat(short, options)
+        assert small.stats["entries"] == 5 and small.stats["evictions"] == 17
+        print_success("Cache LRU volta ao limite sem remover os parágrafos em uso")
+        
+        print("\n📊 Resultado: Formatação incremental funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro na formatação incremental: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_edit_spans():
+    """Testa o registro de alterações (trechos) e o diff montado a partir deles."""
+    print_header("TESTE 11: Registro de Alterações")
+    
+    try:
+        from fastformat import apply_fastformat, apply_fastformat_with_edits, make_edits_diff, describe_edits
+        from modules.fastformat_utils import get_ptbr_options, format_with_diff
+        
+        options = get_ptbr_options()
+        text = 'Ela disse... "Vamos"?\n\n- Sim  , entre 10-20 anos.\n'
+        changes = apply_fastformat_with_edits(text, options)
+        assert changes.text == apply_fastformat(text, options)
+        print_success("Texto formatado idêntico ao apply_fastformat")
+        
+        rebuilt, pos = [], 0
+        for edit in changes.edits:
+            assert text[edit.offset:edit.end] == edit.old
+            rebuilt.append(text[pos:edit.offset] + edit.new)
+            pos = edit.end
+        assert "".join(rebuilt) + text[pos:] == changes.text
+        print_success(f"{len(changes.edits)} trechos reconstroem a saída")
+        
+        ellipsis = [e for e in changes.edits if e.old == "..."]
+        assert ellipsis and ellipsis[0].new == " …" and ellipsis[0].rule == "normalize_ellipsis"
+        assert changes.rule_counts["normalize_number_ranges"] == 1
+        print_info(f"Alterações por regra: {changes.rule_counts}")
+        print_success("Regras e contagens registradas")
+        
+        diff = make_edits_diff(text, changes.edits)
+        assert diff.startswith("--- antes.txt\n+++ depois.txt\n@@ -1,3 +1,3 @@\n")
+        assert "+— Sim, entre 10–20 anos.\n" in diff
+        assert format_with_diff(text, options) == (changes.text, diff)
+        print_success("Diff unificado gerado sem difflib")
+        
+        rows = describe_edits(text, changes.edits)
+        assert rows[-1]["line"] == 3 and rows[-1]["rule"] == "normalize_number_ranges"
+        print_success("Linha e coluna de cada alteração")
+
+        from fastformat import IncrementalFastFormatter
+        book = "\n\n".join(f'Capítulo {i}... "Fala"?\n- Item  , de {i}-{i + 5} anos.' for i in range(30))
+        incremental = IncrementalFastFormatter(options)
+        inc = incremental.format_with_edits(book)
+        full = apply_fastformat_with_edits(book, options)
+        assert inc.text == full.text and inc.edits == full.edits and inc.rule_counts == full.rule_counts
+        edited = book.replace("Capítulo 7...", "Capítulo sete...")
+        misses = incremental.misses
+        inc = incremental.format_with_edits(edited)
+        assert incremental.misses == misses + 1
+        assert inc.edits == apply_fastformat_with_edits(edited, options).edits
+        print_success("Alterações da formatação incremental iguais às da passada completa")
+
+        print("\n📊 Resultado: Registro de alterações funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no registro de alterações: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_benchmark_suite():
+    """Testa o gerador de corpus e o executor do benchmark."""
+    print_header("TESTE 12: Benchmark")
+    
+    try:
+        import json
+        from benchmark_fastformat import generate_corpus, parse_size, run_benchmark
+        
+        fiction = generate_corpus(parse_size("10KB"), "fiction", seed=7)
+        assert fiction == generate_corpus(10 * 1024, "fiction", seed=7)
+        assert len(fiction.encode("utf-8")) >= 10 * 1024
+        for feature in ("\n- ", '"', "...", "\n* "):
+            assert feature in fiction, feature
+        academic = generate_corpus(10 * 1024, "academic", seed=7)
+        assert "p. " in academic and "\"" in academic and "..." in academic
+        print_success("Corpus determinístico com diálogos, aspas, reticências e marcadores")
+        
+        report = run_benchmark([4 * 1024], ["fiction"], ["ptbr", "default"], ["classic", "compiled"],
+                               repeats=1, verbose=False)
+        results = report["results"]
+        assert len(results) == 4
+        for entry in results:
+            assert entry["mb_per_s"] > 0 and entry["peak_memory_mb"] >= 0
+        by_mode = {(r["preset"], r["mode"]): r["output_hash"] for r in results}
+        assert by_mode[("ptbr", "classic")] == by_mode[("ptbr", "compiled")]
+        json.loads(json.dumps(report))
+        print_success("Relatório JSON com MB/s e pico de memória")
+        
+        print("\n📊 Resultado: Benchmark funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no benchmark: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_rule_profiling():
+    """Testa o perfil por regra (ganchos e FastFormatProfiler)."""
+    print_header("TESTE 13: Perfil por Regra")
+    
+    try:
+        import json
+        from fastformat import apply_fastformat, add_fastformat_hook, remove_fastformat_hook
+        from modules.fastformat_utils import FastFormatProfiler, get_ptbr_options
+        
+        options = get_ptbr_options()
+        text = '- Olá... disse ela.\n\n"Vamos"? Entre 10-20 anos  .\n'
+        expected = apply_fastformat(text, options)
+        
+        with FastFormatProfiler() as profiler:
+            assert apply_fastformat(text, options) == expected
+            assert apply_fastformat(text, options, mode="compiled") == expected
+        rules = profiler.summary()["rules"]
+        assert rules["normalize_ellipsis"]["calls"] == 2
+        assert rules["normalize_ellipsis"]["matches"] == 2 * 2
+        assert rules["normalize_number_ranges"]["matches"] == 2
+        assert rules["to_curly_quotes"]["bytes_changed"] > 0
+        print_success("Clássico e compilado registram as mesmas contagens")
+        
+        data = json.loads(profiler.to_json())
+        assert set(data) == {"total_seconds", "rules"}
+        print_success("Estatísticas exportadas em JSON")
+        
+        calls = []
+        hook = lambda rule, seconds, matches, changed: calls.append(rule)
+        add_fastformat_hook(hook)
+        apply_fastformat(text, options, mode="compiled")
+        remove_fastformat_hook(hook)
+        apply_fastformat(text, options, mode="compiled")
+        assert "smart_ptbr_punctuation" in calls and len(calls) == len(set(calls))
+        print_success("Gancho chamado uma vez por regra e removido em seguida")
+        
+        print("\n📊 Resultado: Perfil por regra funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no perfil por regra: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_preserve_markdown():
+    """Testa preserve_markdown: código, títulos e tabelas ficam intactos."""
+    print_header("TESTE 14: Preservação de Markdown")
+    
+    try:
+        from dataclasses import replace
+        from fastformat import (apply_fastformat, apply_fastformat_with_edits,
+                                iter_fastformat, IncrementalFastFormatter)
+        from modules.fastformat_utils import get_academic_options
+        
+        options = get_academic_options()
+        assert options.preserve_markdown
+        code = '```python\nprint("a-b")  # 10-20 ...\n\n\nx = [1 , 2]\n```'
+        table = '| Nome "x" | Faixa |\n|---|---|\n| "a" | 10-20 |'
+        text = ('# Título "citado"\n\n'
+                'Texto "citado" com `x = "1-2"` e [link](http://exemplo.com/a-b.html)...\n\n'
+                + code + '\n\n' + table + '\n\n'
+                '- item "um" de 1-3 páginas\n')
+        
+        result = apply_fastformat(text, options)
+        for protected in ('# Título "citado"', '`x = "1-2"`', '(http://exemplo.com/a-b.html)', code, table):
+            assert protected in result, protected
+        assert '“citado”' in result and '…' in result and '1–3' in result
+        assert result.endswith('- item “um” de 1–3 páginas\n')
+        print_success("Código, títulos, tabelas e links preservados; prosa formatada")
+        
+        for mode in ("compiled", "parallel"):
+            assert apply_fastformat(text, options, mode=mode) == result, mode
+        assert "".join(iter_fastformat(text, options, chunk_size=1)) == result
+        assert IncrementalFastFormatter(options).format(text) == result
+        print_success("Todos os modos dão o mesmo resultado (sem cortar blocos de código)")
+        
+        changes = apply_fastformat_with_edits(text, options)
+        assert changes.text == result
+        for edit in changes.edits:
+            assert text[edit.offset:edit.end] == edit.old
+            assert not text[edit.offset:edit.end].startswith('```')
+        print_success(f"{len(changes.edits)} alterações, todas fora dos trechos protegidos")
+        
+        plain = replace(options, preserve_markdown=False)
+        assert '# Título “citado”' in apply_fastformat(text, plain)
+        print_success("Sem a opção, o markdown é formatado como antes")
+        
+        print("\n📊 Resultado: preserve_markdown funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro em preserve_markdown: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_options_cache():
+    """Testa opções imutáveis e o cache de programas compilados."""
+    print_header("TESTE 15: Cache de Programas Compilados")
+    
+    try:
+        from dataclasses import FrozenInstanceError, replace
+        from fastformat import apply_fastformat, compile_fastformat
+        from modules.fastformat_utils import get_ptbr_options
+        
+        options = get_ptbr_options()
+        try:
+            options.quotes_style = "straight"
+            raise AssertionError("FastFormatOptions deveria ser imutável")
+        except FrozenInstanceError:
+            pass
+        assert hash(options) == hash(get_ptbr_options())
+        print_success("FastFormatOptions imutável e hashável")
+        
+        assert compile_fastformat(options) is compile_fastformat(get_ptbr_options())
+        straight = replace(options, quotes_style="straight")
+        assert compile_fastformat(straight) is not compile_fastformat(options)
+        before = compile_fastformat.cache_info().hits
+        for _ in range(10):
+            apply_fastformat('"Olá"... disse.', get_ptbr_options(), mode="compiled")
+        assert compile_fastformat.cache_info().hits >= before + 10
+        print_success("Opções iguais reutilizam o programa compilado")
+        
+        assert apply_fastformat('"Olá"', straight) == '"Olá"\n'
+        print_success("replace() cria variações de um preset")
+        
+        print("\n📊 Resultado: Cache de programas funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no cache de programas: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_batch_cli():
+    """Testa a formatação em lote (python -m fastformat)."""
+    print_header("TESTE 16: Lote em Diretórios")
+    
+    try:
+        import json
+        import tempfile
+        from fastformat import FASTFORMAT_MANIFEST_NAME, apply_fastformat, format_tree, main as fastformat_main
+        from modules.fastformat_utils import get_ptbr_options
+        
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "capitulos", ".git"))
+            files = {
+                "capitulos/um.md": '- Olá... disse ela.\n\n"Vamos"?\n',
+                "capitulos/.git/ignorado.md": '"x"',
+                "notas.txt": "Já normalizado.\n",
+                "script.py": 'print("x")',
+            }
+            for name, content in files.items():
+                with open(os.path.join(root, name), "w", encoding="utf-8") as f:
+                    f.write(content)
+            
+            manifest = format_tree(root, get_ptbr_options(), max_workers=1)
+            assert set(manifest["files"]) == {"capitulos/um.md", "notas.txt"}
+            assert manifest["files"]["capitulos/um.md"]["status"] == "formatted"
+            assert manifest["files"]["capitulos/um.md"]["changes"] > 0
+            assert manifest["files"]["notas.txt"]["status"] == "unchanged"
+            with open(os.path.join(root, "capitulos/um.md"), encoding="utf-8") as f:
+                assert f.read() == apply_fastformat(files["capitulos/um.md"], get_ptbr_options())
+            print_success("Arquivos .md/.txt formatados; ocultos e outras extensões ignorados")
+            
+            with open(os.path.join(root, FASTFORMAT_MANIFEST_NAME), encoding="utf-8") as f:
+                saved = json.load(f)
+            assert saved["summary"]["formatted"] == 1 and "seconds" in saved["files"]["notas.txt"]
+            print_success("Manifesto JSON com tempo e alterações por arquivo")
+            
+            again = format_tree(root, get_ptbr_options(), max_workers=1)
+            assert again["summary"]["skipped"] == 2
+            assert fastformat_main([root, "--set", "quotes_style=straight", "--workers", "1"]) == 0
+            with open(os.path.join(root, "capitulos/um.md"), encoding="utf-8") as f:
+                assert '"Vamos"' in f.read()
+            print_success("Manifesto pula arquivos inalterados; opções novas reformatam tudo")
+        
+        print("\n📊 Resultado: Lote funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no lote: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def main():
     """Executa todos os testes."""
     print("\n" + "=" * 70)
@@ -322,6 +771,16 @@ def main():
         ("Importações App Streamlit", test_streamlit_app_imports),
         ("Exemplos Práticos", test_formatting_examples),
         ("Compatibilidade Legada", test_backward_compatibility),
+        ("Modo Compilado", test_compiled_mode),
+        ("Streaming", test_streaming),
+        ("Modo Paralelo", test_parallel_mode),
+        ("Formatação Incremental", test_incremental_cache),
+        ("Registro de Alterações", test_edit_spans),
+        ("Benchmark", test_benchmark_suite),
+        ("Perfil por Regra", test_rule_profiling),
+        ("Preservação de Markdown", test_preserve_markdown),
+        ("Cache de Programas", test_options_cache),
+        ("Lote em Diretórios", test_batch_cli),
     ]
     
     results = []
@@ -272,6 +272,750 @@ def test_file_structure():
     print(f"\n📊 Resultado: {success_count}/{len(required_files)} arquivos encontrados")
     return success_count == len(required_files)
 
+def test_document_model():
+    """Testa o modelo de documento usado pelo analisador."""
+    print_header("TESTE 10: Modelo de Documento")
+    
+    try:
+        import re
+        from modules.analyzer import ManuscriptAnalyzer
+        from modules.config import Config
+        from modules.document_model import DocumentModel
+        
+        text = (
+            "# Título do Livro\n\nAutor: Fulano\n\n"
+            "Capítulo 1: Início\n\nEra uma vez... Um texto curto! Fim?\n\n"
+            "## Seção\n\n   \n\n### Subseção\n#\n\nCorpo final.  \n"
+        )
+        document = DocumentModel(text)
+        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        
+        assert list(document.iter_paragraphs()) == paragraphs
+        assert list(document.sentence_lengths) == [len(s.split()) for s in sentences]
+        assert document.word_count == len(text.split())
+        assert [text[a:b] for a, b in document.iter_word_spans()] == text.split()
+        print_success(f"{document.paragraph_count} parágrafos, {document.sentence_count} sentenças")
+        
+        analyzer = ManuscriptAnalyzer(Config())
+        structure = analyzer._analyze_structure(text, document)
+        assert [c["title"] for c in structure["chapters"]] == ["Título do Livro", "Início", "Corpo final."]
+        assert [s["level"] for s in structure["sections"]] == [2, 3]
+        assert analyzer._find_chapters(text) == structure["chapters"]
+        print_success(f"{structure['chapter_count']} capítulos, {structure['section_count']} seções")
+        
+        # Capítulos sem linha em branco ou ponto final antes do título
+        sharded = (text + "Sem ponto\n# Outro\nsegue. E mais\nCapítulo 9: Fim\n\nFim.") * 3
+        parallel = DocumentModel(sharded, max_workers=2, min_parallel_size=0)
+        serial = DocumentModel(sharded)
+        for name in ("paragraph_starts", "paragraph_ends", "paragraph_lengths",
+                     "sentence_starts", "sentence_ends", "sentence_lengths"):
+            assert getattr(parallel, name) == getattr(serial, name), name
+        print_success("Tokenização por capítulos em paralelo idêntica à serial")
+        
+        print("\n📊 Resultado: Modelo de Documento funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Modelo de Documento: {e!r}")
+        return False
+
+def test_analysis_cache():
+    """Testa o cache de análises em disco."""
+    print_header("TESTE 11: Cache de Análises")
+    
+    try:
+        import tempfile
+        from modules.analyzer import ManuscriptAnalyzer
+        from modules.config import Config
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            manuscript = Path(tmp) / "manuscrito.md"
+            manuscript.write_text("# Título\n\nUm parágrafo curto. Outro!\n", encoding="utf-8")
+            config = Config(cache_dir=str(Path(tmp) / ".cache"))
+            
+            analyzer = ManuscriptAnalyzer(config)
+            first = analyzer.analyze(str(manuscript))
+            assert len(analyzer.cache._entries()) == 1
+            assert analyzer.analyze(str(manuscript)) == first
+            print_success("Segunda análise recuperada do cache")
+            
+            manuscript.write_text("# Título\n\nTexto alterado.\n", encoding="utf-8")
+            changed = analyzer.analyze(str(manuscript))
+            assert changed["word_count"] != first["word_count"]
+            assert len(analyzer.cache._entries()) == 2
+            print_success("Conteúdo alterado gera nova entrada")
+            
+            analyzer.cache.max_bytes = 0
+            assert analyzer.cache.evict() == 2
+            assert analyzer.cache.clear() == 0
+            print_success("Limite de tamanho remove entradas")
+        
+        print("\n📊 Resultado: Cache de Análises funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Cache de Análises: {e!r}")
+        return False
+
+def test_docx_streaming():
+    """Testa a leitura incremental de DOCX."""
+    print_header("TESTE 12: Leitura de DOCX")
+    
+    try:
+        import io
+        import zipfile
+        from modules.extractors import extract_docx_text
+        
+        w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        styles = (
+            f'<w:styles {w}><w:style w:styleId="Ttulo1"><w:name w:val="heading 1"/></w:style>'
+            f'<w:style w:styleId="Heading2"><w:name w:val="heading 2"/></w:style></w:styles>'
+        )
+        document = (
+            f'<w:document {w}><w:body>'
+            '<w:p><w:pPr><w:pStyle w:val="Ttulo1"/></w:pPr><w:r><w:t>Capítulo 1</w:t></w:r></w:p>'
+            '<w:p><w:r><w:t>Era</w:t><w:tab/><w:t>uma vez</w:t><w:br/></w:r>'
+            '<w:hyperlink><w:r><w:t>link</w:t></w:r></w:hyperlink></w:p>'
+            '<w:p><w:r><w:t>  </w:t></w:r></w:p>'
+            '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>célula</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+            '<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr><w:r><w:t>Seção</w:t></w:r></w:p>'
+            '<w:sectPr/></w:body></w:document>'
+        )
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('word/document.xml', document)
+            archive.writestr('word/styles.xml', styles)
+        
+        buffer.seek(0)
+        assert extract_docx_text(buffer) == "# Capítulo 1\n\nEra\tuma vez\nlink\n\n## Seção"
+        print_success("Parágrafos e títulos extraídos")
+        
+        buffer.seek(0)
+        assert extract_docx_text(buffer, headings=False) == "Capítulo 1\n\nEra\tuma vez\nlink\n\nSeção"
+        print_success("Extração sem marcadores de título")
+        
+        print("\n📊 Resultado: Leitura de DOCX funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro na Leitura de DOCX: {e!r}")
+        return False
+
+def test_mapped_manuscript():
+    """Testa a leitura mapeada em memória de .md/.txt."""
+    print_header("TESTE 13: Leitura Mapeada")
+    
+    try:
+        import tempfile
+        from modules.analyzer import ManuscriptAnalyzer
+        from modules.config import Config
+        from modules.mapped_manuscript import MappedManuscript
+        from modules.reviewer import EditorialReviewer
+        
+        text = (
+            "# Introdução\n\nAção e reação.\n\n## Contexto\n\n"
+            "CAPÍTULO 2: Meio\n\nTexto com ![figura](f.png).\n\n#### Salto\n\n#\n\nFim"
+        )
+        config = Config(analysis_cache=False)
+        analyzer = ManuscriptAnalyzer(config)
+        reviewer = EditorialReviewer(config)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "manuscrito.md"
+            path.write_text(text, encoding="utf-8")
+            
+            with MappedManuscript(str(path)) as manuscript:
+                assert manuscript.chapters == analyzer._find_chapters(text)
+                assert manuscript.sections == analyzer._find_sections(text)
+                assert manuscript.length == len(text)
+                assert [view.text.split("\n")[0] for _, view in manuscript.chapter_views()] == [
+                    "# Introdução", "CAPÍTULO 2: Meio", "#"]
+                assert list(manuscript.iter_paragraphs()) == [p.strip() for p in text.split("\n\n") if p.strip()]
+                assert reviewer._review_structure(manuscript) == reviewer._review_structure(text)
+                print_success(f"{len(manuscript.chapters)} capítulos indexados sem decodificar o texto")
+            
+            assert analyzer.analyze_structure(str(path)) == analyzer._analyze_structure(text)
+            print_success("Estrutura idêntica à análise completa")
+            
+            path.write_bytes(text.replace("\n", "\r\n").encode("utf-8"))
+            with MappedManuscript(str(path)) as manuscript:
+                assert manuscript.text() == text
+                assert manuscript.chapters == analyzer._find_chapters(text)
+            print_success("Quebras de linha Windows normalizadas")
+        
+        print("\n📊 Resultado: Leitura Mapeada funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro na Leitura Mapeada: {e!r}")
+        return False
+
+def test_terminology():
+    """Testa o localizador de termos e os dicionários carregados de arquivo."""
+    print_header("TESTE 14: Terminologia")
+    
+    try:
+        import re
+        import tempfile
+        from modules.config import Config
+        from modules.elements import ElementsGenerator
+        from modules.terminology import TermMatcher, load_terminology
+        
+        text = "O Modelo VIP e o modelo VIP. VIPs, TCE e tce; Emoção, emoções e EMOÇÃO_ no cérebro."
+        terms = ["VIP", "Modelo VIP", "TCE", "emoção", "cérebro", "ção"]
+        for ignore_case in (False, True):
+            for whole_word in (False, True):
+                flags = re.IGNORECASE if ignore_case else 0
+                edge = r"\b" if whole_word else ""
+                expected = {t: len(re.findall(edge + re.escape(t) + edge, text, flags)) for t in terms}
+                assert TermMatcher(terms, ignore_case, whole_word).count(text) == expected
+        print_success("Contagens idênticas a re.findall (caixa e fronteira de palavra)")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "termos.yaml"
+            path.write_text("glossary:\n  VIP: Modelo de atendimento.\nindex:\n  - modelo\n", encoding="utf-8")
+            terminology = load_terminology(str(path))
+            assert terminology.glossary == {"VIP": "Modelo de atendimento."}
+            assert "Modelo VIP" in terminology.consistency
+            
+            generator = ElementsGenerator(Config(terminology_file=str(path)))
+            assert "**VIP**" in generator._generate_glossary(text)
+            assert "**Modelo** (2 referências)" in generator._generate_index(text)
+        print_success("Dicionários de termos carregados de arquivo")
+        
+        print("\n📊 Resultado: Terminologia funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro na Terminologia: {e!r}")
+        return False
+
+def test_length_stats():
+    """Testa as estatísticas de comprimento compartilhadas por analisador e revisor."""
+    print_header("TESTE 15: Estatísticas de Comprimento")
+    
+    try:
+        import re
+        from modules.analyzer import ManuscriptAnalyzer
+        from modules.config import Config
+        from modules.document_model import DocumentModel
+        from modules.length_stats import LengthStats, NUMPY_AVAILABLE
+        from modules.reviewer import EditorialReviewer
+        
+        text = (
+            "# Parte Um\n\nUma frase curta. Outra frase um pouco maior aqui!\n\n"
+            "Capítulo 2: Meio\n\n" + "palavra " * 45 + ".\n\nFim? Sim."
+        )
+        lengths = LengthStats.from_document(DocumentModel(text))
+        sentences = [len(s.split()) for s in re.split(r'[.!?]+', text) if s.strip()]
+        
+        summary = lengths.summary()
+        assert summary["sentences"]["mean"] == round(sum(sentences) / len(sentences), 1)
+        assert sum(summary["sentences"]["histogram"]["counts"]) == len(sentences)
+        assert summary["sentences"]["percentiles"]["p50"] == sorted(sentences)[len(sentences) // 2]
+        assert lengths.sentences_longer_than(40) == 1
+        assert list(lengths.body_paragraph_lengths()) == [9, 3, 46, 2]
+        print_success(f"Distribuições calculadas ({'NumPy' if NUMPY_AVAILABLE else 'sem NumPy'})")
+        
+        chapters = lengths.chapter_breakdown()
+        assert [c["title"] for c in chapters] == ["Parte Um", "Meio"]
+        assert sum(c["word_count"] for c in chapters) == len(text.split())
+        assert LengthStats.from_dict(lengths.to_dict()) == lengths
+        print_success(f"{len(chapters)} capítulos no recorte por capítulo")
+        
+        config = Config(analysis_cache=False)
+        content_analysis = ManuscriptAnalyzer(config)._analyze_content(text)
+        assert content_analysis["length_distribution"] == summary
+        reviewer = EditorialReviewer(config)
+        assert reviewer._review_style(text, lengths) == reviewer._review_style(text)
+        print_success("Analisador e revisor leem os mesmos arrays")
+        
+        print("\n📊 Resultado: Estatísticas de Comprimento funcionais")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro nas Estatísticas de Comprimento: {e!r}")
+        return False
+
+def test_issue_locations():
+    """Testa a localização (capítulo, linha e coluna) das questões reportadas."""
+    print_header("TESTE 16: Localização de Ocorrências")
+    
+    try:
+        from modules.analyzer import ManuscriptAnalyzer
+        from modules.config import Config
+        from modules.document_model import DocumentModel, TextIndex
+        from modules.reviewer import EditorialReviewer
+        
+        text = (
+            "Prefácio curto.\n\n# Capítulo Um\n\nTexto inicial.\n\n"
+            "# Capítulo Dois\n\nAqui há erro .\n\n#### Detalhe\n\n##Sem espaço\n"
+        )
+        index = DocumentModel(text).text_index
+        for offset in (0, 5, len(text) // 2, len(text)):
+            before = text[:offset]
+            location = index.locate(offset)
+            assert location.line == before.count("\n") + 1
+            assert location.column == offset - before.rfind("\n")
+        assert index.locate(0).chapter == 0
+        assert index.locate(text.index("Aqui")).chapter_title == "Capítulo Dois"
+        assert str(index.locate(text.index("Aqui"))) == "cap. 2 (Capítulo Dois), linha 9, coluna 1"
+        print_success(f"{index.line_count} linhas indexadas por busca binária")
+        
+        config = Config(analysis_cache=False)
+        formatting = ManuscriptAnalyzer(config)._check_formatting(text, TextIndex(text))
+        assert len(formatting["locations"]) == len(formatting["issues"]) == 1
+        assert formatting["locations"][0]["offset"] == text.index(" .")
+        print_success("Analisador localiza problemas de formatação")
+        
+        review = EditorialReviewer(config).review({"content": text}, {}, {})
+        issues = [
+            issue
+            for key in ("structure", "content", "style", "consistency", "references", "technical")
+            for issue in review[key]["issues"]
+        ]
+        assert all("location" in issue for issue in issues)
+        by_category = {i["category"]: i for i in issues if i["location"]}
+        assert by_category["technical"]["location"]["offset"] == text.index("####")
+        jump = by_category["structure"]["location"]
+        assert (jump["line"], jump["chapter"]) == (11, 2)
+        print_success(f"{len(by_category)} questões da revisão com capítulo, linha e coluna")
+        
+        print("\n📊 Resultado: Localização de Ocorrências funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro na Localização de Ocorrências: {e!r}")
+        return False
+
+def test_reference_index():
+    """Testa o índice de referências compartilhado por analisador, revisor e elementos."""
+    print_header("TESTE 17: Índice de Referências")
+    
+    try:
+        from modules.analyzer import ManuscriptAnalyzer
+        from modules.config import Config
+        from modules.elements import ElementsGenerator
+        from modules import references
+        from modules.references import reference_index
+        from modules.reviewer import EditorialReviewer
+        
+        text = (
+            "# Capítulo Um\n\nComo mostrou (Silva, 2020), e depois (Souza et al., 2019),"
+            " o tema segue aberto (Lima, 2018).\n\n"
+            "## Referências\n\n"
+            "SILVA, J. (2020). Título do livro.\n"
+            "Souza, M. (2019). Artigo sem ponto final\n"
+            "Nota sem ano.\n"
+            "Costa, A. (2015). Obra não citada.\n"
+        )
+        index = reference_index(text)
+        assert index is reference_index(text)
+        assert index is reference_index("".join(list(text)))
+        assert all(len(key) == 64 for key in references._index_cache)
+        assert text not in vars(index).values()  # o índice não guarda o manuscrito
+        assert index.found and text[index.start:].startswith("Referências")
+        assert [e.year for e in index.entries] == ["2020", "2019", "2015"]
+        assert len(index.complete_entries()) == 2
+        assert all(text[e.position:].startswith(e.text) for e in index.entries)
+        print_success(f"{len(index.entries)} entradas e {len(index.citations)} citações indexadas")
+        
+        check = index.cross_check()
+        assert [c.author for c in check["unmatched_citations"]] == ["Lima"]
+        assert [e.year for e in check["uncited_entries"]] == ["2015"]
+        print_success("Citações e referências cruzadas")
+        
+        config = Config(analysis_cache=False)
+        content_analysis = ManuscriptAnalyzer(config)._analyze_content(text)
+        assert content_analysis["reference_count"] == 2
+        assert content_analysis["citation_count"] == 3
+        assert content_analysis["unmatched_citations"][0]["citation"] == "(Lima, 2018)"
+        review = EditorialReviewer(config)._review_references(text)
+        assert any("(Lima, 2018)" in issue["description"] for issue in review["issues"])
+        assert review["score"] == 9.5  # só "poucas referências" pesa na nota
+        generated = ElementsGenerator(config)._extract_references(text)
+        assert "SILVA, J. (2020). Título do livro." in generated
+        assert "Artigo sem ponto final" not in generated
+        print_success("Analisador, revisor e elementos leem o mesmo índice")
+        
+        print("\n📊 Resultado: Índice de Referências funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Índice de Referências: {e!r}")
+        return False
+
+def test_async_enhancement():
+    """Testa o aprimoramento com IA concorrente, sem chamar a API."""
+    print_header("TESTE 18: Aprimoramento Assíncrono")
+    
+    try:
+        import asyncio
+        from modules.config import Config
+        from modules.enhancer import ContentEnhancer, _run_async
+        from modules.llm_client import LLMError
+        
+        config = Config(max_workers=3, openai_requests_per_minute=0, llm_cache=False)
+        enhancer = ContentEnhancer(config)
+        active = {"now": 0, "peak": 0}
+        
+        async def fake_complete(paragraph):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01 * (len(paragraph) % 3))
+            active["now"] -= 1
+            if paragraph == "falha":
+                raise LLMError("erro simulado")
+            if paragraph == "defeito":
+                raise KeyError(paragraph)
+            return paragraph.upper()
+        
+        paragraphs = [f"parágrafo {i}" for i in range(20)] + ["falha"]
+        results = _run_async(enhancer._enhance_paragraphs_async(paragraphs, fake_complete))
+        assert results == [p.upper() for p in paragraphs[:-1]] + [None]
+        assert active["peak"] == 3
+        print_success(f"{len(paragraphs)} parágrafos em ordem, no máximo {active['peak']} simultâneos")
+        
+        try:
+            _run_async(enhancer._enhance_paragraphs_async(["parágrafo", "defeito"], fake_complete))
+            raise AssertionError("erro inesperado deveria se propagar")
+        except KeyError:
+            pass
+        print_success("Só falhas da IA são toleradas; outros erros se propagam")
+        
+        async def fake_client(originals):
+            return [f"[{p[:4]}]" if i % 2 == 0 else p for i, p in enumerate(originals)]
+        
+        enhancer._enhance_with_async_client = fake_client
+        long_paragraph = "palavra " * 12
+        content = f"# Título\n\n{long_paragraph.strip()}\n\n\ncurto\n\n  {long_paragraph}\n\n{long_paragraph}"
+        enhanced, changes = enhancer._enhance_with_ai(content, {})
+        assert enhanced == "# Título\n\n[pala]\n\n\ncurto\n\n  " + long_paragraph + "\n\n[pala] "
+        assert [c["paragraph"] for c in changes] == [1, 4]
+        print_success("Parágrafos aprimorados substituídos no lugar, sem alterar o restante")
+        
+        print("\n📊 Resultado: Aprimoramento Assíncrono funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Aprimoramento Assíncrono: {e!r}")
+        return False
+
+def test_llm_cache():
+    """Testa o cache de respostas da IA em disco."""
+    print_header("TESTE 19: Cache de Respostas da IA")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        import time
+        from modules.config import Config
+        from modules.enhancer import AI_SYSTEM_PROMPT, ContentEnhancer
+        from modules.llm_cache import LLMResponseCache
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMResponseCache(tmp)
+            cache.put("modelo", 0.7, "sistema", "parágrafo", "resposta")
+            assert cache.get("modelo", 0.7, "sistema", "parágrafo") == "resposta"
+            assert cache.get("modelo", 0.5, "sistema", "parágrafo") is None
+            assert cache.get("outro", 0.7, "sistema", "parágrafo") is None
+            assert cache.get("modelo", 0.7, "", "parágrafo") is None
+            assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+            print_success("Chave por modelo, temperatura, prompt de sistema e conteúdo")
+            
+            path = cache._path(cache.key_for("modelo", 0.7, "sistema", "parágrafo"))
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            entry["created"] -= 31 * 86400
+            path.write_text(json.dumps(entry), encoding="utf-8")
+            assert cache.get("modelo", 0.7, "sistema", "parágrafo") is None
+            assert not path.exists()
+            
+            cache.put("modelo", 0.7, "", "antigo", "x")
+            old = cache._path(cache.key_for("modelo", 0.7, "", "antigo"))
+            os.utime(old, (time.time() - 40 * 86400,) * 2)
+            assert cache.evict() == 1
+            print_success("Respostas expiradas descartadas")
+            
+            cache.max_bytes = 600
+            for i in range(10):
+                cache.put("modelo", 0.7, "", f"p{i}", "r" * 100)
+            assert sum(e.stat().st_size for e in cache._entries()) <= 600
+            assert cache.get("modelo", 0.7, "", "p9") == "r" * 100
+            print_success(f"Limite de tamanho aplicado ({cache.stats()['evictions']} remoções)")
+            
+            config = Config(cache_dir=tmp, openai_requests_per_minute=0)
+            enhancer = ContentEnhancer(config)
+            paragraphs = [f"parágrafo número {i} " + "palavra " * 10 for i in range(3)]
+            enhancer._store_response(paragraphs[1].strip(), "já aprimorado")
+            sent = []
+            
+            async def fake_client(originals):
+                sent.extend(originals)
+                return [p.upper() for p in originals]
+            
+            enhancer._enhance_with_async_client = fake_client
+            enhanced, changes = enhancer._enhance_with_ai("\n\n".join(paragraphs), {})
+            assert sent == [paragraphs[0].strip(), paragraphs[2].strip()]
+            assert "já aprimorado" in enhanced and len(changes) == 3
+            print_success("Só parágrafos sem resposta guardada vão à API")
+            
+            misses = enhancer.llm_cache.misses
+            enhancer._store_response("vindo de um lote", "aprimorado em lote", enhancer._batch_cache_system())
+            assert enhancer._cached_response("vindo de um lote") == "aprimorado em lote"
+            assert enhancer._cached_response("nunca enviado") is None
+            assert enhancer.llm_cache.misses == misses + 1
+            assert enhancer.llm_cache.get(config.openai_model, 0.7, AI_SYSTEM_PROMPT, "vindo de um lote") is None
+            enhancer.config.openai_max_tokens += 1
+            assert enhancer._cached_response("vindo de um lote") is None
+            print_success("Respostas de lote guardadas sob o prompt e o limite de tokens do lote")
+        
+        print("\n📊 Resultado: Cache de Respostas da IA funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Cache de Respostas da IA: {e!r}")
+        return False
+
+def test_paragraph_packing():
+    """Testa o agrupamento de parágrafos em lotes por orçamento de tokens."""
+    print_header("TESTE 20: Agrupamento de Parágrafos")
+    
+    try:
+        from modules.config import Config
+        from modules.enhancer import ContentEnhancer, _run_async
+        from modules.paragraph_packer import (
+            MARKER_TOKENS, estimate_tokens, pack_paragraphs, render_batch, split_batch
+        )
+        
+        paragraphs = [f"Parágrafo {i}: " + "palavra " * (20 + i % 60) for i in range(200)]
+        budget = 2000
+        batches = pack_paragraphs(paragraphs, budget)
+        assert [i for batch in batches for i in batch] == list(range(200))
+        assert all(sum(estimate_tokens(paragraphs[i]) + MARKER_TOKENS for i in batch) <= budget for batch in batches)
+        assert pack_paragraphs(["x" * 40000, "curto"], budget) == [[0], [1]]
+        assert max(len(b) for b in pack_paragraphs(paragraphs, budget, max_items=5)) == 5
+        print_success(f"200 parágrafos em {len(batches)} lotes de até {budget} tokens")
+        
+        rendered = render_batch(paragraphs[:3])
+        assert split_batch(rendered, 3) == [p.strip() for p in paragraphs[:3]]
+        assert split_batch(rendered, 4) is None
+        assert split_batch(rendered.replace("[[§2]]", "[[§3]]"), 3) is None
+        assert split_batch("Claro! " + rendered, 3) is None
+        assert split_batch("[[§1]]\na\n[[§2]]\n\n", 2) is None
+        print_success("Marcadores separam a resposta de volta em parágrafos")
+        
+        config = Config(max_workers=2, openai_requests_per_minute=0, llm_cache=False, openai_max_tokens=3000)
+        enhancer = ContentEnhancer(config)
+        calls = {"batch": 0, "single": 0}
+        
+        async def complete_batch(batch):
+            calls["batch"] += 1
+            if calls["batch"] == 2:
+                return None  # resposta sem os marcadores esperados
+            return [p.upper() for p in batch]
+        
+        async def complete(paragraph):
+            calls["single"] += 1
+            return paragraph.upper()
+        
+        results = _run_async(enhancer._enhance_packed_async(paragraphs, complete_batch, complete))
+        assert results == [p.upper() for p in paragraphs]
+        requests = calls["batch"] + calls["single"]
+        assert calls["single"] > 0 and requests * 5 < len(paragraphs)
+        print_success(f"{requests} requisições para {len(paragraphs)} parágrafos (um lote reenviado por parágrafo)")
+        
+        print("\n📊 Resultado: Agrupamento de Parágrafos funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Agrupamento de Parágrafos: {e!r}")
+        return False
+
+def test_llm_client():
+    """Testa o cliente compartilhado da IA, sem chamar a API."""
+    print_header("TESTE 21: Cliente Compartilhado da IA")
+    
+    try:
+        import asyncio
+        import threading
+        import time
+        from modules.llm_client import LLMClient, LLMError, TokenBucket, shared_client
+        
+        bucket = TokenBucket(600, burst=1)  # uma requisição a cada 0,1 s
+        
+        async def tasks():
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+        
+        start = time.perf_counter()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(tasks())
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        assert elapsed >= 0.45
+        print_success(f"Threads e tarefas assíncronas dividem a mesma cota (6 requisições em {elapsed:.2f}s)")
+        
+        assert shared_client("chave-teste") is shared_client("chave-teste")
+        assert shared_client("chave-teste") is not shared_client("outra-chave")
+        print_success("Mesma chave, mesmo cliente (e mesma cota)")
+        
+        # Porta sem servidor: cada tentativa falha por conexão recusada
+        client = LLMClient("chave-teste", "http://127.0.0.1:9/v1", requests_per_minute=0,
+                           max_retries=2, timeout=2, backoff_base=0.01)
+        try:
+            client.chat("olá", model="gpt-4o-mini", purpose="teste")
+            raise AssertionError("chamada deveria falhar")
+        except LLMError:
+            pass
+        
+        async def failing():
+            try:
+                await client.achat("olá", model="gpt-4o-mini", purpose="teste")
+            except LLMError:
+                return True
+            finally:
+                await client.aclose()
+        
+        assert asyncio.run(failing())
+        usage = client.usage.summary()
+        assert usage["calls"] == 2 and usage["failures"] == 2 and usage["retries"] == 4
+        assert usage["by_purpose"]["teste"]["latency_max"] > 0
+        print_success(f"Erros de conexão repetidos e contabilizados ({usage['retries']} novas tentativas)")
+        
+        print("\n📊 Resultado: Cliente Compartilhado da IA funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Cliente Compartilhado da IA: {e!r}")
+        return False
+
+def test_llm_standin():
+    """Testa o aprimoramento com IA contra o servidor substituto local."""
+    print_header("TESTE 22: Servidor Substituto da IA")
+    
+    try:
+        from modules.config import Config
+        from modules.enhancer import ContentEnhancer
+        from modules.llm_client import shared_client
+        from modules.llm_standin import LLMStandIn, StandInSettings
+        
+        settings = StandInSettings(latency=0.01, error_rate=0.5, error_status=503, seed=7)
+        paragraphs = [f"Parágrafo {i}  com   espaços repetidos e palavras suficientes para a IA." for i in range(12)]
+        content = "# Título\n\n" + "\n\n".join(paragraphs) + "\n"
+        
+        with LLMStandIn(settings) as standin:
+            for pack in (False, True):
+                config = Config(openai_api_key=f"standin-{pack}", openai_base_url=standin.base_url,
+                                max_workers=4, openai_requests_per_minute=0, openai_max_retries=30,
+                                openai_pack_paragraphs=pack, llm_cache=False)
+                enhancer = ContentEnhancer(config)
+                enhancer.client.backoff_base = enhancer.client.backoff_max = 0.01
+                enhanced, changes = enhancer._enhance_with_ai(content, {})
+                expected = "# Título\n\n" + "\n\n".join(" ".join(p.split()) for p in paragraphs) + "\n"
+                assert enhanced == expected and len(changes) == len(paragraphs)
+            stats = standin.stats()
+        
+        assert stats["errors"] > 0 and stats["peak_concurrency"] > 1
+        retries = sum(shared_client(f"standin-{pack}", standin.base_url).usage.summary()["retries"]
+                      for pack in (False, True))
+        assert retries == stats["errors"]
+        print_success(f"{stats['chat_completions']} respostas, {stats['errors']} erros simulados repetidos "
+                      f"pelo cliente, até {stats['peak_concurrency']} requisições simultâneas")
+        
+        print("\n📊 Resultado: Servidor Substituto da IA funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro no Servidor Substituto da IA: {e!r}")
+        return False
+
+def test_pdf_extraction():
+    """Testa a extração de PDF em blocos paralelos com um PyPDF2 substituto."""
+    print_header("TESTE 23: Extração de PDF")
+    
+    import tempfile
+    from unittest import mock
+    
+    # PyPDF2 é opcional: um pacote mínimo com a mesma interface (páginas
+    # separadas por \f) é posto no sys.path, visível também nos workers
+    fake = (
+        "import os\n"
+        "class _Page:\n"
+        "    def __init__(self, text):\n"
+        "        self._text = text\n"
+        "    def extract_text(self):\n"
+        "        return self._text\n"
+        "class PdfReader:\n"
+        "    def __init__(self, path):\n"
+        "        with open(path, encoding='utf-8') as f:\n"
+        "            self.pages = [_Page(t) for t in f.read().split('\\f')]\n"
+        "        with open(path + '.opens', 'a') as log:\n"
+        "            log.write(f'{os.getpid()}\\n')\n"
+    )
+    saved_module = sys.modules.pop("PyPDF2", None)
+    saved_path = list(sys.path)
+    try:
+        from modules.extractors import PDF_PARALLEL_MIN_PAGES, _pdf_tasks, extract_pdf_text, iter_pdf_pages
+        
+        assert _pdf_tasks("a.pdf", 50, 16) == [("a.pdf", 0, 16), ("a.pdf", 16, 32), ("a.pdf", 32, 48),
+                                                ("a.pdf", 48, 50)]
+        assert _pdf_tasks("a.pdf", 48, 16)[-1] == ("a.pdf", 32, 48)
+        assert _pdf_tasks("a.pdf", 5, 100) == [("a.pdf", 0, 5)]
+        assert _pdf_tasks("a.pdf", 0, 16) == []
+        print_success("Blocos de páginas cobrem o documento, inclusive o último parcial")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            package = Path(tmp) / "PyPDF2"
+            package.mkdir()
+            (package / "__init__.py").write_text(fake, encoding="utf-8")
+            sys.path.insert(0, tmp)
+            
+            def make_pdf(name, count):
+                pages = [f"Página {i}\ncom texto." if i % 7 else "" for i in range(count)]
+                path = Path(tmp) / name
+                path.write_text("\f".join(pages), encoding="utf-8")
+                return str(path), pages
+            
+            def opens(path):
+                log = Path(path + ".opens")
+                pids = log.read_text().split() if log.exists() else []
+                log.unlink(missing_ok=True)
+                return pids
+            
+            path, pages = make_pdf("grande.pdf", PDF_PARALLEL_MIN_PAGES + 2)
+            assert list(iter_pdf_pages(path, max_workers=1)) == pages
+            assert opens(path) == [str(os.getpid())]
+            with mock.patch("os.cpu_count", return_value=4):
+                for pages_per_task in (16, 100):
+                    assert list(iter_pdf_pages(path, max_workers=4, pages_per_task=pages_per_task)) == pages
+                    pids = opens(path)
+                    assert len(pids) == 1 + len(_pdf_tasks(path, len(pages), pages_per_task))
+                    assert str(os.getpid()) not in pids[1:]
+                assert extract_pdf_text(path, max_workers=4) == '\n\n'.join(pages)
+                opens(path)
+                print_success(f"{len(pages)} páginas extraídas em paralelo, na ordem do documento")
+                
+                path, pages = make_pdf("curto.pdf", PDF_PARALLEL_MIN_PAGES - 1)
+                assert extract_pdf_text(path, max_workers=4) == '\n\n'.join(pages)
+                assert opens(path) == [str(os.getpid())]
+                print_success("PDF curto extraído no processo atual")
+        
+        print("\n📊 Resultado: Extração de PDF funcional")
+        return True
+        
+    except Exception as e:
+        print_error(f"Erro na Extração de PDF: {e!r}")
+        return False
+    finally:
+        sys.path[:] = saved_path
+        sys.modules.pop("PyPDF2", None)
+        if saved_module is not None:
+            sys.modules["PyPDF2"] = saved_module
+
 def main():
     """Executa todos os testes."""
     print("\n" + "=" * 70)
@@ -288,6 +1032,20 @@ def main():
         ("Production Pipeline", test_pipeline),
         ("Dependências", test_dependencies),
         ("Estrutura de Arquivos", test_file_structure),
+        ("Modelo de Documento", test_document_model),
+        ("Cache de Análises", test_analysis_cache),
+        ("Leitura de DOCX", test_docx_streaming),
+        ("Leitura Mapeada", test_mapped_manuscript),
+        ("Terminologia", test_terminology),
+        ("Estatísticas de Comprimento", test_length_stats),
+        ("Localização de Ocorrências", test_issue_locations),
+        ("Índice de Referências", test_reference_index),
+        ("Aprimoramento Assíncrono", test_async_enhancement),
+        ("Cache de Respostas da IA", test_llm_cache),
+        ("Agrupamento de Parágrafos", test_paragraph_packing),
+        ("Cliente Compartilhado da IA", test_llm_client),
+        ("Servidor Substituto da IA", test_llm_standin),
+        ("Extração de PDF", test_pdf_extraction),
     ]
     
     results = []